@@ -58,11 +58,10 @@ logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger('asadm')
 logger.setLevel(logging.INFO)
 
+# Log analyser, collectinfo analyser and TLS support are imported only when
+# used, they are not needed for most 'asadm -e' runs.
 from lib.client import info
-from lib.client.ssl_context import SSLContext
 from lib.basiccontroller import BasicRootController
-from lib.logcontroller import LogRootController
-from lib.collectinfocontroller import CollectinfoRootController
 from lib.view import terminal
 
 __version__ = '$$__version__$$'
@@ -79,7 +78,9 @@ class AerospikeShell(cmd.Cmd):
 
     def __init__(self, seed, user=None, password=None, use_services_alumni=False, use_services_alt=False,
                  log_path="", log_analyser=False, collectinfo=False,
-                 ssl_context=None, only_connect_seed=False, execute_only_mode=False):
+                 ssl_context=None, only_connect_seed=False, execute_only_mode=False,
+                 use_info_loop=False, thread_pool_size=None, socket_pool_size=None,
+                 command_timeout=None, hedge_delay=None, snapshot_ttl=None):
 
         if log_analyser:
             self.name = 'Aerospike Log Analyzer Shell'
@@ -98,6 +99,7 @@ class AerospikeShell(cmd.Cmd):
             if log_analyser:
                 if not log_path:
                     log_path = " "
+                from lib.logcontroller import LogRootController
                 self.ctrl = LogRootController(__version__, log_path)
 
                 self.prompt = "Log-analyzer> "
@@ -108,6 +110,7 @@ class AerospikeShell(cmd.Cmd):
                     self.do_exit('')
                     exit(1)
 
+                from lib.collectinfocontroller import CollectinfoRootController
                 self.ctrl = CollectinfoRootController(__version__,
                                                       clinfo_path=log_path)
 
@@ -123,7 +126,13 @@ class AerospikeShell(cmd.Cmd):
                 self.ctrl = BasicRootController(seed_nodes=[seed], user=user,
                                                 password=password, use_services_alumni=use_services_alumni, use_services_alt=use_services_alt,
                                                 ssl_context=ssl_context, asadm_version=__version__,
-                                                only_connect_seed=only_connect_seed)
+                                                only_connect_seed=only_connect_seed,
+                                                use_info_loop=use_info_loop,
+                                                thread_pool_size=thread_pool_size,
+                                                socket_pool_size=socket_pool_size,
+                                                command_timeout=command_timeout,
+                                                hedge_delay=hedge_delay,
+                                                snapshot_ttl=snapshot_ttl)
 
                 if not self.ctrl.cluster.get_live_nodes():
                     logger.error("Not able to connect any cluster.")
@@ -233,14 +242,27 @@ class AerospikeShell(cmd.Cmd):
                                           terminal.reset())
 
             sys.stdout.write(terminal.reset())
+            self._pop_timed_out_nodes()
             try:
                 response = self.ctrl.execute(line)
                 if response == "EXIT":
                     return "exit"
             except Exception as e:
                 logger.error(e)
+
+            timed_out_nodes = self._pop_timed_out_nodes()
+            if timed_out_nodes:
+                print terminal.fg_red() + "Timed out waiting for node(s) %s, output is partial." % (
+                    ", ".join(timed_out_nodes)) + terminal.fg_clear()
         return ""  # line was handled by execute
 
+    def _pop_timed_out_nodes(self):
+        try:
+            return self.ctrl.cluster.pop_timed_out_nodes()
+        except Exception:
+            # log and collectinfo modes have no cluster
+            return []
+
     def _listdir(self, root):
         "List directory 'root' appending the path separator to subdirs."
         res = []
@@ -423,7 +445,11 @@ def do_ctrl_c(*args, **kwargs):
 
 
 def parse_tls_input(cli_args):
+    if not cli_args.enable_tls:
+        return None
+
     try:
+        from lib.client.ssl_context import SSLContext
         return SSLContext(enable_tls=cli_args.enable_tls,
                           encrypt_only=cli_args.encrypt_only, cafile=cli_args.cafile,
                           capath=cli_args.capath, keyfile=cli_args.keyfile,
@@ -438,7 +464,7 @@ def parse_tls_input(cli_args):
         exit(1)
 
 
-def main():
+def parse_cli_args(argv=None):
     try:
         import argparse
         parser = argparse.ArgumentParser(
@@ -476,6 +502,18 @@ def main():
                             help="Path of cluster collectinfo file or directory containing collectinfo and system info files.")
         parser.add_argument("--single_node_cluster", dest="only_connect_seed", action="store_true",
                             help="Enable asadm mode to connect only seed node. By default asadm connects to all nodes in cluster.")
+        parser.add_argument("--async_info", dest="use_info_loop", action="store_true",
+                            help="Send asinfo requests to all nodes from a single thread using non-blocking sockets, instead of a thread per node. Other commands still use worker threads.")
+        parser.add_argument("--max_threads", dest="thread_pool_size", type=int,
+                            help="Maximum number of worker threads used to send requests to cluster nodes. Default: 32")
+        parser.add_argument("--socket_pool_size", dest="socket_pool_size", type=int,
+                            help="Maximum number of idle connections kept per node for reuse. Default: 3")
+        parser.add_argument("--command_timeout", dest="command_timeout", type=float,
+                            help="Seconds to wait for nodes in a command. Output is shown for nodes which responded in time. By default commands wait for all nodes.")
+        parser.add_argument("--hedge_delay", dest="hedge_delay", type=float,
+                            help="Seconds after which a read request still pending on a node is sent again on another connection. Needs --command_timeout.")
+        parser.add_argument("--snapshot_ttl", dest="snapshot_ttl", type=float,
+                            help="Seconds for which fetched statistics and configs are reused by later commands. Default: 0, data is shared only within a command.")
         parser.add_argument("--tls_enable", dest="enable_tls", action="store_true",
                             help="Enable TLS on connections. By default TLS is disabled.")
         parser.add_argument("--tls_encrypt_only", dest="encrypt_only", action="store_true",
@@ -506,7 +544,7 @@ def main():
         parser.add_argument("--tls_crl_check_all", dest="crl_check_all", action="store_true",
                             help="Enable CRL checking for entire certificate chain. An error occurs if a valid CRL files cannot be found in tls_capath.")
 
-        cli_args = parser.parse_args()
+        cli_args = parser.parse_args(argv)
     except Exception:
         import optparse
         usage = "usage: %prog [options]"
@@ -544,6 +582,18 @@ def main():
                           help="Path of cluster collectinfo file or directory containing collectinfo and system info files.")
         parser.add_option("--single_node_cluster", dest="only_connect_seed", action="store_true",
                           help="Enable asadm mode to connect only seed node. By default asadm connects to all nodes in cluster.")
+        parser.add_option("--async_info", dest="use_info_loop", action="store_true",
+                          help="Send asinfo requests to all nodes from a single thread using non-blocking sockets, instead of a thread per node. Other commands still use worker threads.")
+        parser.add_option("--max_threads", dest="thread_pool_size", type=int,
+                          help="Maximum number of worker threads used to send requests to cluster nodes. Default: 32")
+        parser.add_option("--socket_pool_size", dest="socket_pool_size", type=int,
+                          help="Maximum number of idle connections kept per node for reuse. Default: 3")
+        parser.add_option("--command_timeout", dest="command_timeout", type=float,
+                          help="Seconds to wait for nodes in a command. Output is shown for nodes which responded in time. By default commands wait for all nodes.")
+        parser.add_option("--hedge_delay", dest="hedge_delay", type=float,
+                          help="Seconds after which a read request still pending on a node is sent again on another connection. Needs --command_timeout.")
+        parser.add_option("--snapshot_ttl", dest="snapshot_ttl", type=float,
+                          help="Seconds for which fetched statistics and configs are reused by later commands. Default: 0, data is shared only within a command.")
         parser.add_option("--tls_enable", dest="enable_tls", action="store_true",
                           help="Enable TLS on connections. By default TLS is disabled.")
         parser.add_option("--tls_encrypt_only", dest="encrypt_only", action="store_true",
@@ -574,7 +624,13 @@ def main():
         parser.add_option("--tls_crl_check_all", dest="crl_check_all", action="store_true",
                           help="Enable CRL checking for entire certificate chain. An error occurs if a valid CRL files cannot be found in tls_capath.")
 
-        (cli_args, args) = parser.parse_args()
+        (cli_args, args) = parser.parse_args(argv)
+
+    return parser, cli_args
+
+
+def main():
+    parser, cli_args = parse_cli_args()
 
     if cli_args.help:
         parser.print_help()
@@ -614,7 +670,13 @@ def main():
                            collectinfo=cli_args.collectinfo,
                            ssl_context=ssl_context,
                            only_connect_seed=cli_args.only_connect_seed,
-                           execute_only_mode=execute_only_mode)
+                           execute_only_mode=execute_only_mode,
+                           use_info_loop=cli_args.use_info_loop,
+                           thread_pool_size=cli_args.thread_pool_size,
+                           socket_pool_size=cli_args.socket_pool_size,
+                           command_timeout=cli_args.command_timeout,
+                           hedge_delay=cli_args.hedge_delay,
+                           snapshot_ttl=cli_args.snapshot_ttl)
 
     use_yappi = False
     if cli_args.profile:
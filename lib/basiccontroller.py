@@ -43,6 +43,10 @@ class BasicCommandController(CommandController):
     def __init__(self, cluster):
         BasicCommandController.cluster = cluster
 
+    @property
+    def snapshot(self):
+        return self.cluster.snapshot
+
 @CommandHelp('Aerospike Admin')
 class BasicRootController(BaseController):
 
@@ -51,14 +55,22 @@ class BasicRootController(BaseController):
 
     def __init__(self, seed_nodes=[('127.0.0.1', 3000, None)], user=None,
                  password=None, use_services_alumni=False, use_services_alt=False, ssl_context=None,
-                 asadm_version='', only_connect_seed=False):
+                 asadm_version='', only_connect_seed=False, use_info_loop=False,
+                 thread_pool_size=None, socket_pool_size=None,
+                 command_timeout=None, hedge_delay=None, snapshot_ttl=None):
 
         super(BasicRootController, self).__init__(asadm_version)
 
         # Create static instance of cluster
         BasicRootController.cluster = Cluster(seed_nodes, user, password,
                                               use_services_alumni, use_services_alt,
-                                              ssl_context, only_connect_seed)
+                                              ssl_context, only_connect_seed,
+                                              use_info_loop=use_info_loop,
+                                              thread_pool_size=thread_pool_size,
+                                              socket_pool_size=socket_pool_size,
+                                              command_timeout=command_timeout,
+                                              hedge_delay=hedge_delay,
+                                              snapshot_ttl=snapshot_ttl)
 
         # Create Basic Command Controller Object
         BasicRootController.command = BasicCommandController(self.cluster)
@@ -80,6 +92,11 @@ class BasicRootController(BaseController):
         except Exception:
             pass
 
+    def execute(self, line):
+        # controllers running for this command share fetched cluster data
+        with self.cluster.snapshot.command():
+            return super(BasicRootController, self).execute(line)
+
     # This function is a hack for autocomplete
     @CommandHelp('Terminate session')
     def do_exit(self, line):
@@ -124,19 +141,19 @@ class InfoController(BasicCommandController):
 
     @CommandHelp('Displays network information for Aerospike.')
     def do_network(self, line):
-        stats = util.Future(self.cluster.info_statistics,
+        stats = util.Future(self.snapshot.info_statistics,
                             nodes=self.nodes).start()
 
-        cluster_configs = util.Future(self.cluster.info_get_config,
+        cluster_configs = util.Future(self.snapshot.info_get_config,
                                       nodes=self.nodes,
                                       stanza='cluster').start()
 
         cluster_names = util.Future(
-            self.cluster.info, 'cluster-name', nodes=self.nodes).start()
+            self.snapshot.info, 'cluster-name', nodes=self.nodes).start()
         builds = util.Future(
-            self.cluster.info, 'build', nodes=self.nodes).start()
+            self.snapshot.info, 'build', nodes=self.nodes).start()
         versions = util.Future(
-            self.cluster.info, 'version', nodes=self.nodes).start()
+            self.snapshot.info, 'version', nodes=self.nodes).start()
 
         stats = stats.result()
         cluster_configs = cluster_configs.result()
@@ -157,22 +174,22 @@ class InfoController(BasicCommandController):
 
     @CommandHelp('Displays summary information for each set.')
     def do_set(self, line):
-        stats = self.cluster.info_set_statistics(nodes=self.nodes)
+        stats = self.snapshot.info_set_statistics(nodes=self.nodes)
         return util.Future(self.view.info_set, stats, self.cluster, **self.mods)
 
     @CommandHelp('Displays summary information for each namespace.')
     def do_namespace(self, line):
-        stats = self.cluster.info_all_namespace_statistics(nodes=self.nodes)
+        stats = self.snapshot.info_all_namespace_statistics(nodes=self.nodes)
         return util.Future(self.view.info_namespace, stats, self.cluster,
                            **self.mods)
 
     @CommandHelp('Displays summary information for Cross Datacenter',
                  'Replication (XDR).')
     def do_xdr(self, line):
-        stats = util.Future(self.cluster.info_XDR_statistics,
+        stats = util.Future(self.snapshot.info_XDR_statistics,
                             nodes=self.nodes).start()
 
-        builds = util.Future(self.cluster.info_XDR_build_version,
+        builds = util.Future(self.snapshot.info_XDR_build_version,
                              nodes=self.nodes).start()
 
         xdr_enable = util.Future(self.cluster.is_XDR_enabled,
@@ -187,10 +204,10 @@ class InfoController(BasicCommandController):
     @CommandHelp('Displays summary information for each datacenter.')
     def do_dc(self, line):
 
-        stats = util.Future(self.cluster.info_all_dc_statistics,
+        stats = util.Future(self.snapshot.info_all_dc_statistics,
                             nodes=self.nodes).start()
 
-        configs = util.Future(self.cluster.info_dc_get_config,
+        configs = util.Future(self.snapshot.info_dc_get_config,
                               nodes=self.nodes).start()
 
         stats = stats.result()
@@ -215,7 +232,7 @@ class InfoController(BasicCommandController):
 
     @CommandHelp('Displays summary information for Secondary Indexes (SIndex).')
     def do_sindex(self, line):
-        sindex_stats = get_sindex_stats(self.cluster, self.nodes)
+        sindex_stats = get_sindex_stats(self.snapshot, self.nodes)
         return util.Future(self.view.info_sindex, sindex_stats, self.cluster,
                            **self.mods)
 
@@ -284,7 +301,8 @@ class ShowController(BasicCommandController):
             'latency': ShowLatencyController,
             'distribution': ShowDistributionController,
             'mapping': ShowMappingController,
-            'pmap': ShowPmapController
+            'pmap': ShowPmapController,
+            'cache': ShowCacheController
         }
 
         self.modifiers = set()
@@ -432,7 +450,7 @@ class ShowConfigController(BasicCommandController):
 
     def __init__(self):
         self.modifiers = set(['with', 'like', 'diff'])
-        self.getter = GetConfigController(self.cluster)
+        self.getter = GetConfigController(self.snapshot)
 
     @CommandHelp('Displays service, network, and namespace configuration',
                  '  Options:',
@@ -555,12 +573,39 @@ class ShowMappingController(BasicCommandController):
                 node_to_ip_map, **self.mods)
 
 
+@CommandHelp('Displays hit and miss counters of the asadm info response cache,',
+             'and queue depth and task latencies of the asadm worker pool.')
+class ShowCacheController(BasicCommandController):
+
+    def __init__(self):
+        self.modifiers = set(['with', 'like'])
+
+    def _do_default(self, line):
+        futures = []
+        cache_stats = self.cluster.info_cache_statistics(nodes=self.nodes)
+        futures.append(util.Future(self.view.show_stats,
+                "Info Cache Statistics", cache_stats, self.cluster,
+                **self.mods))
+
+        if self.cluster.ssl_context:
+            tls_stats = self.cluster.info_tls_statistics(nodes=self.nodes)
+            futures.append(util.Future(self.view.show_stats,
+                    "TLS Handshake Statistics", tls_stats, self.cluster,
+                    **self.mods))
+
+        pool_stats = self.cluster.get_worker_pool_statistics()
+        futures.append(util.Future(self.view.show_worker_pool_stats,
+                "Worker Pool Statistics", pool_stats, **self.mods))
+
+        return futures
+
+
 @CommandHelp('Displays statistics for Aerospike components.')
 class ShowStatisticsController(BasicCommandController):
 
     def __init__(self):
         self.modifiers = set(['with', 'like', 'for'])
-        self.getter = GetStatisticsController(self.cluster)
+        self.getter = GetStatisticsController(self.snapshot)
 
     @CommandHelp('Displays service statistics')
     def do_service(self, line):
@@ -1203,10 +1248,11 @@ class CollectinfoController(BasicCommandController):
 
     def _get_as_data_json(self):
         as_map = {}
-        getter = GetStatisticsController(self.cluster)
+        self.snapshot.fetch_all(nodes=self.nodes)
+        getter = GetStatisticsController(self.snapshot)
         stats = getter.get_all(nodes=self.nodes)
 
-        getter = GetConfigController(self.cluster)
+        getter = GetConfigController(self.snapshot)
         config = getter.get_all(nodes=self.nodes)
 
         # All these section have have nodeid in inner level
@@ -1764,7 +1810,7 @@ class FeaturesController(BasicCommandController):
 
     def __init__(self):
         self.modifiers = set(['with', 'like'])
-        self.getter = GetStatisticsController(self.cluster)
+        self.getter = GetStatisticsController(self.snapshot)
 
     def _do_default(self, line):
 
@@ -1802,35 +1848,37 @@ class PagerController(BasicCommandController):
 class HealthCheckController(BasicCommandController):
     last_snapshot_collection_time = 0
     last_snapshot_count = 0
+    last_snapshot_stanzas = set()
+    last_snapshot_sys_cmds = set()
 
     def __init__(self):
         self.modifiers = set()
 
     def _get_asstat_data(self, stanza):
         if stanza == "service":
-            return self.cluster.info_statistics(nodes=self.nodes)
+            return self.snapshot.info_statistics(nodes=self.nodes)
         elif stanza == "namespace":
-            return self.cluster.info_all_namespace_statistics(nodes=self.nodes)
+            return self.snapshot.info_all_namespace_statistics(nodes=self.nodes)
         elif stanza == "sets":
-            return self.cluster.info_set_statistics(nodes=self.nodes)
+            return self.snapshot.info_set_statistics(nodes=self.nodes)
         elif stanza == "bins":
-            return self.cluster.info_bin_statistics(nodes=self.nodes)
+            return self.snapshot.info_bin_statistics(nodes=self.nodes)
         elif stanza == "xdr":
-            return self.cluster.info_XDR_statistics(nodes=self.nodes)
+            return self.snapshot.info_XDR_statistics(nodes=self.nodes)
         elif stanza == "dc":
-            return self.cluster.info_all_dc_statistics(nodes=self.nodes)
+            return self.snapshot.info_all_dc_statistics(nodes=self.nodes)
         elif stanza == "sindex":
-            return get_sindex_stats(cluster=self.cluster, nodes=self.nodes)
+            return get_sindex_stats(cluster=self.snapshot, nodes=self.nodes)
         elif stanza == "udf":
-            return self.cluster.info_udf_list(nodes=self.nodes)
+            return self.snapshot.info_udf_list(nodes=self.nodes)
 
     def _get_asconfig_data(self, stanza):
         if stanza == "xdr":
-            return self.cluster.info_XDR_get_config(nodes=self.nodes)
+            return self.snapshot.info_XDR_get_config(nodes=self.nodes)
         elif stanza == "dc":
-            return self.cluster.info_dc_get_config(nodes=self.nodes)
+            return self.snapshot.info_dc_get_config(nodes=self.nodes)
         else:
-            return self.cluster.info_get_config(nodes=self.nodes, stanza=stanza)
+            return self.snapshot.info_get_config(nodes=self.nodes, stanza=stanza)
 
     @CommandHelp(
         'Displays health summary. If remote server System credentials provided, then it will collect remote system stats',
@@ -1841,6 +1889,7 @@ class HealthCheckController(BasicCommandController):
         '                      This parameter works if Query file path provided, otherwise health command will work in interactive mode.',
         '    -v              - Enable to display extra details of assert errors.',
         '    -d              - Enable to display extra details of exceptions.',
+        '    -p, --profile   - Enable to display time, values read and cache hits of slowest queries and per category.',
         '    -n <int>        - Number of snapshots. Default: 3',
         '    -s <int>        - Sleep time in seconds between each snapshot. Default: 1 sec',
         '    -U <string>     - Default user id for remote servers. This is System user id (not Aerospike user id).',
@@ -1879,6 +1928,13 @@ class HealthCheckController(BasicCommandController):
         debug = util.check_arg_and_delete_from_mods(line=line, arg="-d",
                 default=False, modifiers=self.modifiers, mods=self.mods)
 
+        profile = util.check_arg_and_delete_from_mods(line=line, arg="-p",
+                default=False, modifiers=self.modifiers, mods=self.mods)
+
+        profile = util.check_arg_and_delete_from_mods(line=line,
+                arg="--profile", default=False, modifiers=self.modifiers,
+                mods=self.mods) or profile
+
         credential_file = util.get_arg_and_delete_from_mods(line=line,
                 arg="-cf", return_type=str, default=None,
                 modifiers=self.modifiers, mods=self.mods)
@@ -1925,86 +1981,116 @@ class HealthCheckController(BasicCommandController):
             output_filter_warning_level = util.strip_string(
                 output_filter_warning_level).upper()
 
-        if (time.time() - HealthCheckController.last_snapshot_collection_time > 60) or HealthCheckController.last_snapshot_count != snap_count:
-            # There is possibility of different cluster-names in old
-            # heartbeat protocol. As asadm works with single cluster,
-            # so we are setting one static cluster-name.
-            cluster_name = "C1"
-
-            stanza_dict = {
-                "statistics": (self._get_asstat_data, [
-                    ("service", "SERVICE", False, False,
-                     [("CLUSTER", cluster_name), ("NODE", None)]),
-                    ("namespace", "NAMESPACE", False, False, [
-                     ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("NAMESPACE", None)]),
-                    ("sets", "SET", False, False, [("CLUSTER", cluster_name), ("NODE", None), (
-                        None, None), ("NAMESPACE", ("ns_name", "ns",)), ("SET", ("set_name", "set",))]),
-                    ("bins", "BIN", False, False, [
-                     ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("NAMESPACE", None)]),
-                    ("xdr", "XDR", False, False, [
-                     ("CLUSTER", cluster_name), ("NODE", None)]),
-                    ("dc", "DC", False, False, [
-                     ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("DC", None)]),
-                    ("sindex", "SINDEX", True, False, [("CLUSTER", cluster_name), ("NODE", None), (
-                        None, None), ("NAMESPACE", ("ns",)), ("SET", ("set",)), ("SINDEX", ("indexname",))])
-                ]),
-                "config": (self._get_asconfig_data, [
-                    ("service", "SERVICE", True, True,
-                     [("CLUSTER", cluster_name), ("NODE", None)]),
-                    ("xdr", "XDR", True, True, [
-                     ("CLUSTER", cluster_name), ("NODE", None)]),
-                    ("network", "NETWORK", True, True,
-                     [("CLUSTER", cluster_name), ("NODE", None)]),
-                    ("dc", "DC", False, False, [
-                     ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("DC", None)]),
-                    ("namespace", "NAMESPACE", True, True, [
-                     ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("NAMESPACE", None)])
-                ]),
-                "cluster": (self.cluster.info, [
-                    ("build", "METADATA", False, False, [
-                     ("CLUSTER", cluster_name), ("NODE", None), ("KEY", "version")]),
-                ]),
-                "metadata": (self._get_asstat_data, [
-                    ("udf", "UDF", False, False, [
-                     ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("FILENAME", None)]),
-                ]),
-            }
-            sys_cmd_dict = {
-                "sys_stats": (util.restructure_sys_data, [
-                    ("free-m", "SYSTEM", "FREE", True,
-                     [(None, None), ("CLUSTER", cluster_name), ("NODE", None)]),
-                    ("top", "SYSTEM", "TOP", True, [
-                     (None, None), ("CLUSTER", cluster_name), ("NODE", None)]),
-                    ("iostat", "SYSTEM", "IOSTAT", False, [
-                     (None, None), ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("DEVICE", None)]),
-                    ("meminfo", "SYSTEM", "MEMINFO", True,
-                     [("CLUSTER", cluster_name), ("NODE", None)]),
-                    ("interrupts", "SYSTEM", "INTERRUPTS", False, [(None, None), ("CLUSTER", cluster_name), ("NODE", None), (None, None),
-                                                                   ("INTERRUPT_TYPE", None), (None, None), ("INTERRUPT_ID", None), (None, None), ("INTERRUPT_DEVICE", None)]),
-                    ("df", "SYSTEM", "DF", True, [
-                     ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("FILE_SYSTEM", None)])
-                ]),
-            }
+        # There is possibility of different cluster-names in old
+        # heartbeat protocol. As asadm works with single cluster,
+        # so we are setting one static cluster-name.
+        cluster_name = "C1"
+
+        stanza_dict = {
+            "statistics": (self._get_asstat_data, [
+                ("service", "SERVICE", False, False,
+                 [("CLUSTER", cluster_name), ("NODE", None)]),
+                ("namespace", "NAMESPACE", False, False, [
+                 ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("NAMESPACE", None)]),
+                ("sets", "SET", False, False, [("CLUSTER", cluster_name), ("NODE", None), (
+                    None, None), ("NAMESPACE", ("ns_name", "ns",)), ("SET", ("set_name", "set",))]),
+                ("bins", "BIN", False, False, [
+                 ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("NAMESPACE", None)]),
+                ("xdr", "XDR", False, False, [
+                 ("CLUSTER", cluster_name), ("NODE", None)]),
+                ("dc", "DC", False, False, [
+                 ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("DC", None)]),
+                ("sindex", "SINDEX", True, False, [("CLUSTER", cluster_name), ("NODE", None), (
+                    None, None), ("NAMESPACE", ("ns",)), ("SET", ("set",)), ("SINDEX", ("indexname",))])
+            ]),
+            "config": (self._get_asconfig_data, [
+                ("service", "SERVICE", True, True,
+                 [("CLUSTER", cluster_name), ("NODE", None)]),
+                ("xdr", "XDR", True, True, [
+                 ("CLUSTER", cluster_name), ("NODE", None)]),
+                ("network", "NETWORK", True, True,
+                 [("CLUSTER", cluster_name), ("NODE", None)]),
+                ("dc", "DC", False, False, [
+                 ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("DC", None)]),
+                ("namespace", "NAMESPACE", True, True, [
+                 ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("NAMESPACE", None)])
+            ]),
+            "cluster": (self.snapshot.info, [
+                ("build", "METADATA", False, False, [
+                 ("CLUSTER", cluster_name), ("NODE", None), ("KEY", "version")]),
+            ]),
+            "metadata": (self._get_asstat_data, [
+                ("udf", "UDF", False, False, [
+                 ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("FILENAME", None)]),
+            ]),
+        }
+        sys_cmd_dict = {
+            "sys_stats": (util.restructure_sys_data, [
+                ("free-m", "SYSTEM", "FREE", True,
+                 [(None, None), ("CLUSTER", cluster_name), ("NODE", None)]),
+                ("top", "SYSTEM", "TOP", True, [
+                 (None, None), ("CLUSTER", cluster_name), ("NODE", None)]),
+                ("iostat", "SYSTEM", "IOSTAT", False, [
+                 (None, None), ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("DEVICE", None)]),
+                ("meminfo", "SYSTEM", "MEMINFO", True,
+                 [("CLUSTER", cluster_name), ("NODE", None)]),
+                ("interrupts", "SYSTEM", "INTERRUPTS", False, [(None, None), ("CLUSTER", cluster_name), ("NODE", None), (None, None),
+                                                               ("INTERRUPT_TYPE", None), (None, None), ("INTERRUPT_ID", None), (None, None), ("INTERRUPT_DEVICE", None)]),
+                ("df", "SYSTEM", "DF", True, [
+                 ("CLUSTER", cluster_name), ("NODE", None), (None, None), ("FILE_SYSTEM", None)])
+            ]),
+        }
+
+        # Collect only data which queries select from
+        query_plan = self.health_checker.create_query_plan(query_file=query_file)
+        planned_snap_count = query_plan.snapshot_count(snap_count)
+
+        fetch_list = []
+        for _key, (info_function, stanza_list) in stanza_dict.iteritems():
+            for stanza_item in stanza_list:
+                if query_plan.needs([stanza_item[1], _key.upper()]):
+                    fetch_list.append((_key, stanza_item[0], info_function))
+
+        sys_cmds = set()
+        for cmd_key, (sys_function, sys_cmd_list) in sys_cmd_dict.iteritems():
+            for cmd_item in sys_cmd_list:
+                if query_plan.needs([cmd_item[1], cmd_item[2]]):
+                    sys_cmds.add(cmd_item[0])
+
+        stanzas = set((_key, stanza) for _key, stanza, _ in fetch_list)
+
+        if ((time.time() - HealthCheckController.last_snapshot_collection_time > 60)
+                or HealthCheckController.last_snapshot_count != planned_snap_count
+                or not stanzas <= HealthCheckController.last_snapshot_stanzas
+                or not sys_cmds <= HealthCheckController.last_snapshot_sys_cmds):
             health_input = {}
 
             sn_ct = 0
             sleep = sleep_tm * 1.0
 
-            self.logger.info("Collecting " + str(snap_count) +
-                             " collectinfo snapshot. Use -n to set number of snapshots.")
+            if planned_snap_count < snap_count:
+                self.logger.info("Queries use latest snapshot only, collecting "
+                                 + str(planned_snap_count) + " collectinfo snapshot.")
+            else:
+                self.logger.info("Collecting " + str(snap_count) +
+                                 " collectinfo snapshot. Use -n to set number of snapshots.")
+            snap_count = planned_snap_count
+
             while sn_ct < snap_count:
-                fetched_as_val = {}
+                # Each health snapshot needs fresh data, fetch needed
+                # sections in one parallel pass
+                self.snapshot.invalidate()
+                fetched = self.cluster.worker_pool.map(
+                    lambda item: item[2](item[1]), fetch_list)
+                fetched_as_val = dict(((_key, stanza), d) for (_key, stanza, _), d
+                                      in zip(fetch_list, fetched) if d is not None)
 
                 # Collecting data
-                sys_stats = self.cluster.info_system_statistics(nodes=self.nodes, default_user=default_user, default_pwd=default_pwd, default_ssh_port=default_ssh_port,
-                                                              credential_file=credential_file)
-
-                for _key, (info_function, stanza_list) in stanza_dict.iteritems():
-
-                    for stanza_item in stanza_list:
-
-                        stanza = stanza_item[0]
-                        fetched_as_val[(_key, stanza)] = info_function(stanza)
+                if sys_cmds:
+                    sys_stats = self.cluster.info_system_statistics(nodes=self.nodes, default_user=default_user, default_pwd=default_pwd, default_ssh_port=default_ssh_port,
+                                                                  credential_file=credential_file, commands=list(sys_cmds))
+                else:
+                    sys_stats = {}
 
                 # Creating health input model
                 for _key, (info_function, stanza_list) in stanza_dict.iteritems():
@@ -2076,17 +2162,21 @@ class HealthCheckController(BasicCommandController):
 
                 sn_ct += 1
                 self.logger.info("Snapshot " + str(sn_ct))
-                time.sleep(sleep)
+                if sn_ct < snap_count:
+                    time.sleep(sleep)
 
             health_input = h_eval(health_input)
             self.health_checker.set_health_input_data(health_input)
             HealthCheckController.last_snapshot_collection_time = time.time()
             HealthCheckController.last_snapshot_count = snap_count
+            HealthCheckController.last_snapshot_stanzas = stanzas
+            HealthCheckController.last_snapshot_sys_cmds = sys_cmds
 
         else:
             self.logger.info("Using previous collected snapshot data since it is not older than 1 minute.")
 
-        health_summary = self.health_checker.execute(query_file=query_file)
+        health_summary = self.health_checker.execute(query_file=query_file,
+                profile=profile)
 
         if health_summary:
             try:
@@ -2135,13 +2225,13 @@ class SummaryController(BasicCommandController):
                 arg="-sp", return_type=int, default=None,
                 modifiers=self.modifiers, mods=self.mods)
 
-        service_stats = util.Future(self.cluster.info_statistics, nodes=self.nodes).start()
-        namespace_stats = util.Future(self.cluster.info_all_namespace_statistics, nodes=self.nodes).start()
-        set_stats = util.Future(self.cluster.info_set_statistics, nodes=self.nodes).start()
+        service_stats = util.Future(self.snapshot.info_statistics, nodes=self.nodes).start()
+        namespace_stats = util.Future(self.snapshot.info_all_namespace_statistics, nodes=self.nodes).start()
+        set_stats = util.Future(self.snapshot.info_set_statistics, nodes=self.nodes).start()
 
         os_version = self.cluster.info_system_statistics(nodes=self.nodes, default_user=default_user, default_pwd=default_pwd, default_ssh_port=default_ssh_port,
                                                               credential_file=credential_file, commands=["lsb"])
-        server_version = util.Future(self.cluster.info, 'build', nodes=self.nodes).start()
+        server_version = util.Future(self.snapshot.info, 'build', nodes=self.nodes).start()
 
         service_stats = service_stats.result()
         namespace_stats = namespace_stats.result()
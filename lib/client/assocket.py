@@ -12,35 +12,57 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import errno
 import socket
 import warnings
+from time import time
 
 from lib.client.info import authenticate, info
+from lib.client.resolver import get_resolver
 
-try:
+
+def _import_ssl():
+    # pyOpenSSL is slow to import, it is loaded only when a TLS connection
+    # is made
     with warnings.catch_warnings():
         warnings.filterwarnings("ignore", category=DeprecationWarning)
         from OpenSSL import SSL
-    HAVE_PYOPENSSL = True
-except ImportError:
-    HAVE_PYOPENSSL = False
+    return SSL
+
+
+DEFAULT_POOL_SIZE = 3
+# Server closes idle info connections (proto-fd-idle-ms, 60 sec by default),
+# do not reuse pooled sockets close to that age
+DEFAULT_IDLE_TIMEOUT = 55
+
+
+def _session_reused(sock):
+    try:
+        SSL = _import_ssl()
+        return bool(SSL._lib.SSL_session_reused(sock._ssl))
+    except Exception:
+        return False
 
 
 class ASSocket:
 
-    def __init__(self, node, ip, port, pool_size=3):
+    def __init__(self, node, ip, port, pool_size=DEFAULT_POOL_SIZE,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
         self.sock = None
         self.node = node
         self.ip = ip
         self.port = port
         self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.last_used = time()
 
     def _wrap_socket(self, sock, ctx):
         if ctx:
-            if HAVE_PYOPENSSL:
-                sock = SSL.Connection(ctx, sock)
-            else:
+            try:
+                SSL = _import_ssl()
+            except ImportError:
                 raise ImportError("No module named pyOpenSSL")
+            sock = SSL.Connection(ctx, sock)
 
         return sock
 
@@ -61,7 +83,7 @@ class ASSocket:
             if ssl_context:
                 try:
                     sock.set_app_data(tls_name)
-                    sock.do_handshake()
+                    self._tls_handshake(sock)
                 except Exception as tlse:
                     print "TLS connection exception: " + str(tlse)
                     if sock:
@@ -79,12 +101,46 @@ class ASSocket:
             pass
         return sock
 
+    def _tls_handshake(self, sock):
+        """
+        Handshake offering node's last TLS session, so that server can resume
+        it and skip certificate exchange and verification.
+        """
+        session, generation = self._tls_offer_session(sock)
+        start_time = time()
+        sock.do_handshake()
+        self._tls_handshake_done(sock, session, generation,
+                                 time() - start_time)
+
+    def _tls_offer_session(self, sock):
+        # CRL or blacklist reload invalidates sessions verified before it
+        try:
+            generation = sock.get_context().get_app_data().generation
+        except Exception:
+            generation = None
+
+        session = getattr(self.node, "tls_session", None)
+        if (session is not None
+                and self.node.tls_session_generation != generation):
+            session = None
+        if session is not None:
+            try:
+                sock.set_session(session)
+            except Exception:
+                session = None
+        return session, generation
+
+    def _tls_handshake_done(self, sock, session, generation, handshake_time):
+        resumed = session is not None and _session_reused(sock)
+        if self.node is not None:
+            self.node._update_tls_session(sock, handshake_time, resumed,
+                                          generation)
+
     def _create_socket(self, host, port, tls_name=None, user=None,
                        password=None, ssl_context=None):
 
         sock = None
-        for addrinfo in socket.getaddrinfo(host, port, socket.AF_UNSPEC,
-                                           socket.SOCK_STREAM):
+        for addrinfo in get_resolver().getaddrinfo(host, port):
             # for DNS it will try all possible addresses
             try:
                 sock = self._create_socket_for_addrinfo(addrinfo, tls_name,
@@ -109,12 +165,31 @@ class ASSocket:
         return True
 
     def is_connected(self):
+        """
+        Cheap liveness check for pooled sockets, without an info round-trip.
+        Socket is considered dead if it was idle for more than idle_timeout
+        or if peer has closed it (or left unread data on it).
+        """
         if not self.sock:
             return False
-        result = self.execute("node")
-        if result is None or result == -1:
+        if self.idle_timeout and time() - self.last_used > self.idle_timeout:
+            return False
+
+        # peek on raw socket, for TLS connection close_notify also shows up
+        # as pending data
+        raw_sock = getattr(self.sock, "_socket", self.sock)
+        try:
+            raw_sock.setblocking(0)
+            try:
+                raw_sock.recv(1, socket.MSG_PEEK)
+                # closed by peer or stale response data
+                return False
+            except socket.error as e:
+                return e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK)
+            finally:
+                raw_sock.setblocking(1)
+        except Exception:
             return False
-        return True
 
     def close(self, force=False):
         if self.sock:
@@ -124,6 +199,7 @@ class ASSocket:
                              < self.pool_size)):
 
                     self.sock.settimeout(None)
+                    self.last_used = time()
                     self.node.socket_pool[self.port].add(self)
                 else:
                     self.sock.close()
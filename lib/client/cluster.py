@@ -13,18 +13,44 @@
 # limitations under the License.
 
 import copy
+import Queue
 import re
 import threading
 from time import time
 
 from lib.client import util
-from lib.client.node import Node
+from lib.client.assocket import DEFAULT_POOL_SIZE
+from lib.client.infoloop import InfoLoop, NodeTimeoutError
+from lib.client.node import Node, is_read_only_info_command
+from lib.client.resolver import get_resolver
+from lib.client.snapshot import ClusterSnapshot, DEFAULT_SNAPSHOT_TTL
 # TODO - how to get this dependency sorted out
 from lib.utils.prefixdict import PrefixDict
+from lib.utils import workerpool
 
 # interval time in second for cluster refreshing
 CLUSTER_REFRESH_INTERVAL = 3
 
+# node methods which are expected to run long (remote shell commands), not
+# bound by command deadline
+NO_DEADLINE_METHODS = set(['info_system_statistics'])
+# Seconds a deadline bound call waits for a worker to pick up its node
+# calls before running one itself
+PENDING_TASK_WAIT = 0.05
+# Node methods which only send read-only info commands, safe to hedge
+HEDGEABLE_METHODS = set([
+    'info_alternative_peers_list', 'info_alumni_peers_list',
+    'info_all_dc_statistics', 'info_all_namespace_statistics',
+    'info_all_sindex_statistics', 'info_bin_statistics',
+    'info_cache_statistics', 'info_dc_get_config', 'info_dc_statistics',
+    'info_dcs', 'info_get_config', 'info_histogram', 'info_latency',
+    'info_namespace_statistics', 'info_namespaces', 'info_node',
+    'info_peers_list', 'info_service', 'info_services',
+    'info_services_alt', 'info_services_alumni', 'info_set_statistics',
+    'info_sindex', 'info_sindex_statistics', 'info_statistics',
+    'info_tls_statistics', 'info_udf_list', 'info_XDR_build_version',
+    'info_XDR_get_config', 'info_XDR_statistics'])
+
 
 class Cluster(object):
     # Kinda like a singleton... All instantiated classes will share the same
@@ -35,10 +61,20 @@ class Cluster(object):
     crawl_lock = threading.Lock()
 
     def __init__(self, seed_nodes, user=None, password=None, use_services_alumni=False, use_services_alt=False,
-                 ssl_context=None, only_connect_seed=False):
+                 ssl_context=None, only_connect_seed=False, use_info_loop=False,
+                 thread_pool_size=None, socket_pool_size=None,
+                 command_timeout=None, hedge_delay=None, snapshot_ttl=None):
         """
         Want to be able to support multiple nodes on one box (for testing)
         seed_nodes should be the form (address,port,tls) address can be fqdn or ip.
+
+        command_timeout -- seconds to wait for nodes in a single node method
+                           call, stragglers get NodeTimeoutError result
+        hedge_delay -- seconds after which a read-only call still running on
+                       a node is sent again on another connection, first
+                       response wins. Used only with command_timeout.
+        snapshot_ttl -- seconds for which cluster data in self.snapshot is
+                        reused across commands
         """
 
         self.__dict__ = self.cluster_state
@@ -65,6 +101,33 @@ class Cluster(object):
         self._seed_nodes = set(seed_nodes)
         self._live_nodes = set()
         self.ssl_context = ssl_context
+        self.socket_pool_size = socket_pool_size or DEFAULT_POOL_SIZE
+
+        # long lived worker threads shared by node calls, crawl and
+        # util.Future
+        self.worker_pool = workerpool.WorkerPool(
+            thread_pool_size or workerpool.DEFAULT_MAX_WORKERS)
+        workerpool.set_shared_pool(self.worker_pool)
+
+        # single threaded non-blocking engine for plain info requests
+        self.info_loop = None
+        if use_info_loop:
+            if command_timeout:
+                self.info_loop = InfoLoop(timeout=command_timeout)
+            else:
+                self.info_loop = InfoLoop()
+
+        self.command_timeout = command_timeout
+        self.hedge_delay = hedge_delay
+        # keys of nodes which missed deadline since last
+        # pop_timed_out_nodes call
+        self._timed_out_nodes = set()
+        self._timed_out_nodes_lock = threading.Lock()
+
+        # cluster data shared by controllers
+        if snapshot_ttl is None:
+            snapshot_ttl = DEFAULT_SNAPSHOT_TTL
+        self.snapshot = ClusterSnapshot(self, ttl=snapshot_ttl)
 
         # crawl the cluster search for nodes in addition to the seed nodes.
         self.last_cluster_refresh_time = 0
@@ -181,9 +244,10 @@ class Cluster(object):
         peers = []
         aliases = {}
         if self.nodes:
+            self.worker_pool.map(lambda node: node.refresh_connection(),
+                                 self.nodes.values())
             for node_key in self.nodes.keys():
                 node = self.nodes[node_key]
-                node.refresh_connection()
                 if node.key != node_key:
                     # change in service list
                     self.nodes.pop(node_key)
@@ -224,7 +288,10 @@ class Cluster(object):
 
             while unvisited - visited:
                 l_unvisited = list(unvisited)
-                nodes = util.concurrent_map(self._register_node, l_unvisited)
+                # resolve all new endpoints at once, node creation then
+                # hits resolver cache
+                get_resolver().prefetch(l_unvisited, pool=self.worker_pool)
+                nodes = self.worker_pool.map(self._register_node, l_unvisited)
                 live_nodes = [node
                               for node in nodes
                               if (node is not None and node.alive
@@ -233,7 +300,7 @@ class Cluster(object):
                 unvisited.clear()
 
                 if not self.only_connect_seed:
-                    services_list = util.concurrent_map(
+                    services_list = self.worker_pool.map(
                         self._get_services, live_nodes)
                     for node, services in zip(live_nodes, services_list):
                         if isinstance(services, Exception):
@@ -329,6 +396,9 @@ class Cluster(object):
                     "instead it is of type %s and str value of %s" % (
                         type(addr_port_tls), str(addr_port_tls))
                 return None
+        if not force and get_resolver().is_unreachable(addr, port):
+            # Failed recently, check other endpoints
+            return None
         try:
             if self.is_present_as_alias(addr, port):
                 # Alias entry already added for this endpoint
@@ -346,13 +416,15 @@ class Cluster(object):
                             password=self.password,
                             consider_alumni=Cluster.use_services_alumni,
                             use_services_alt=Cluster.use_services_alt,
-                            ssl_context=self.ssl_context)
+                            ssl_context=self.ssl_context,
+                            socket_pool_size=self.socket_pool_size)
 
             if not new_node:
                 return new_node
             if not new_node.alive:
                 if not force:
                     # Check other endpoints
+                    get_resolver().mark_unreachable(addr, port)
                     new_node.close()
                     return None
             self.update_node(new_node)
@@ -414,12 +486,160 @@ class Cluster(object):
                 "nodes should be 'all' or list found %s" % type(nodes))
         if len(use_nodes) == 0:
             raise IOError('Unable to find any Aerospike nodes')
+        # only raw asinfo commands go through the loop, info_* getters
+        # parse and combine several requests on a worker thread
+        if (self.info_loop and method_name in ('info', 'xdr_info')
+                and len(args) == 1 and not kwargs):
+            results = self.info_loop.run(
+                [(node.key, node, args[0],
+                  node.xdr_port if method_name == 'xdr_info' else node.port)
+                 for node in use_nodes])
+            self._add_timed_out_nodes(
+                [k for k, v in results.iteritems()
+                 if isinstance(v, NodeTimeoutError)])
+            return results
+        if self.command_timeout and method_name not in NO_DEADLINE_METHODS:
+            return self._call_node_method_with_deadline(
+                use_nodes, method_name, args, kwargs)
         return dict(
-            util.concurrent_map(
+            self.worker_pool.map(
                 lambda node:
                 (node.key, getattr(node, method_name)(*args, **kwargs)),
                 use_nodes))
 
+    @staticmethod
+    def _is_hedgeable(method_name, args):
+        if method_name in HEDGEABLE_METHODS:
+            return True
+        if method_name in ('info', 'xdr_info'):
+            return bool(args) and is_read_only_info_command(args[0])
+        if method_name == 'info_many':
+            return (bool(args) and isinstance(args[0], (list, tuple))
+                    and all(is_read_only_info_command(c) for c in args[0]))
+        return False
+
+    def _call_node_method_with_deadline(self, nodes, method_name, args,
+                                        kwargs):
+        """
+        Same as call_node_method, but returns once all nodes responded or
+        command_timeout expired, whichever comes first.
+        """
+        responses = Queue.Queue()
+
+        def call(node):
+            try:
+                result = getattr(node, method_name)(*args, **kwargs)
+            except Exception as e:
+                result = e
+            responses.put((node.key, result))
+
+        deadline = time() + self.command_timeout
+        hedge_time = None
+        if (self.hedge_delay is not None
+                and self._is_hedgeable(method_name, args)):
+            hedge_time = time() + self.hedge_delay
+
+        tasks = []
+        in_flight = {}
+        for node in nodes:
+            tasks.append(self.worker_pool.submit(call, node))
+            in_flight[node.key] = 1
+
+        results = {}
+        failures = {}
+        while len(results) < len(nodes):
+            now = time()
+            if now >= deadline:
+                break
+
+            if hedge_time is not None and now >= hedge_time:
+                for node in nodes:
+                    if node.key not in results:
+                        tasks.append(self.worker_pool.submit(call, node))
+                        in_flight[node.key] += 1
+                hedge_time = None
+
+            wait_time = deadline - now
+            if hedge_time is not None:
+                wait_time = min(wait_time, hedge_time - now)
+            pending = any(task.is_pending() for task in tasks)
+            if pending:
+                wait_time = min(wait_time, PENDING_TASK_WAIT)
+            try:
+                key, result = responses.get(timeout=wait_time)
+            except Queue.Empty:
+                if pending:
+                    # No worker picked up our calls, pool may be held by
+                    # callers waiting on us. Run one call here, as
+                    # Task.wait does on the non deadline path.
+                    for task in tasks:
+                        if task.run():
+                            break
+                continue
+
+            in_flight[key] -= 1
+            if key in results:
+                # slower copy of a hedged call
+                continue
+            if isinstance(result, Exception) and in_flight[key] > 0:
+                # hedged copy is still running, it may succeed
+                failures[key] = result
+                continue
+            results[key] = result
+
+        timed_out = []
+        for node in nodes:
+            if node.key in results:
+                continue
+            if node.key in failures:
+                results[node.key] = failures[node.key]
+                continue
+            timed_out.append(node.key)
+            results[node.key] = NodeTimeoutError(
+                "Timed out waiting for node %s " % (node.ip))
+
+        # free worker slots held by calls which never started
+        for task in tasks:
+            task.cancel()
+
+        self._add_timed_out_nodes(timed_out)
+        return results
+
+    def _add_timed_out_nodes(self, node_keys):
+        if not node_keys:
+            return
+        with self._timed_out_nodes_lock:
+            self._timed_out_nodes.update(node_keys)
+
+    def pop_timed_out_nodes(self):
+        """
+        Returns:
+        list -- keys of nodes which missed command deadline since last call
+        """
+        with self._timed_out_nodes_lock:
+            node_keys = sorted(self._timed_out_nodes)
+            self._timed_out_nodes.clear()
+        return node_keys
+
+    def get_worker_pool_statistics(self):
+        """
+        Get queue depth and task latency counters of the worker pool shared
+        by node calls. Times are in milliseconds.
+
+        Returns:
+        dict -- {stat_name : stat_value, ...}
+        """
+        stats = self.worker_pool.get_stats()
+        return {'max_workers': str(stats['max_workers']),
+                'workers': str(stats['workers']),
+                'queue_depth': str(stats['queue_depth']),
+                'submitted': str(stats['submitted']),
+                'completed': str(stats['completed']),
+                'avg_wait_ms': "%.3f" % (stats['avg_wait_time'] * 1000),
+                'max_wait_ms': "%.3f" % (stats['max_wait_time'] * 1000),
+                'avg_run_ms': "%.3f" % (stats['avg_run_time'] * 1000),
+                'max_run_ms': "%.3f" % (stats['max_run_time'] * 1000)}
+
     def is_XDR_enabled(self, nodes='all'):
         return self.call_node_method(nodes, 'is_XDR_enabled')
 
@@ -477,3 +697,6 @@ class Cluster(object):
                 pass
         self.nodes = None
         self.node_lookup = None
+        self.worker_pool.close()
+        if workerpool.get_shared_pool() is self.worker_pool:
+            workerpool.set_shared_pool(None)
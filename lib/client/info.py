@@ -90,15 +90,39 @@ except:
 
 
 def receivedata(sock, sz):
+    # read into one preallocated buffer instead of concatenating chunks,
+    # which is quadratic for multi-megabyte responses
+    buf = bytearray(sz)
+    view = memoryview(buf)
+    recv_into = getattr(sock, "recv_into", None)
     pos = 0
     while pos < sz:
-        chunk = sock.recv(sz - pos)
-        if pos == 0:
-            data = chunk
+        if recv_into:
+            n = recv_into(view[pos:], sz - pos)
         else:
-            data += chunk
-        pos += len(chunk)
-    return data
+            chunk = sock.recv(sz - pos)
+            n = len(chunk)
+            buf[pos:pos + n] = chunk
+        if not n:
+            raise IOError("Connection closed by peer")
+        pos += n
+    return str(buf)
+
+
+def iter_fields(data, delimiter):
+    """
+    Lazily split data on delimiter, avoids building the full list of fields
+    for large responses.
+    """
+    start = 0
+    step = len(delimiter)
+    while True:
+        end = data.find(delimiter, start)
+        if end == -1:
+            yield data[start:]
+            return
+        yield data[start:end]
+        start = end + step
 
 
 def hashpassword(password):
@@ -146,15 +170,19 @@ def buffer_to_string(buf):
     return buf_str
 
 
-def authenticate(sock, user, password):
+def _authenticate_request_buffer(user, password):
     sz = len(user) + len(password) + 34  # 2 * 5 + 24
     send_buf = admin_write_header(sz, 0, 2)
     fmt_str = "! I B %ds I B %ds" % (len(user), len(password))
     struct.pack_into(fmt_str, send_buf, 24, len(
         user) + 1, 0, user, len(password) + 1, 3, password)
+    # OpenSSL wrapper doesn't support ctypes
+    return buffer_to_string(send_buf)
+
+
+def authenticate(sock, user, password):
     try:
-        # OpenSSL wrapper doesn't support ctypes
-        send_buf = buffer_to_string(send_buf)
+        send_buf = _authenticate_request_buffer(user, password)
         sock.sendall(send_buf)
         recv_buff = receivedata(sock, 24)
         rv = admin_parse_header(recv_buff)
@@ -171,8 +199,7 @@ def _info_request(sock, buf):
         sock.send(buf)
         # get response
         rsp_hdr = sock.recv(8)
-        q = struct.unpack_from("! Q", rsp_hdr, 0)
-        sz = q[0] & 0xFFFFFFFFFFFF
+        sz = _info_response_size(rsp_hdr)
         if sz > 0:
             rsp_data = receivedata(sock, sz)
     except Exception as ex:
@@ -186,9 +213,7 @@ def _info_request(sock, buf):
     return(rsp_data)
 
 
-def info(sock, names=None):
-    if not sock:
-        return -1
+def _info_request_buffer(names=None):
     # Passed a set of names: created output buffer
 
     if names == None:
@@ -215,8 +240,15 @@ def info(sock, names=None):
         fmt_str = "! Q %ds" % len(namestr)
         buf = struct.pack(fmt_str, q, namestr)
 
-    rsp_data = _info_request(sock, buf)
+    return buf
+
+
+def _info_response_size(rsp_hdr):
+    q = struct.unpack_from("! Q", rsp_hdr, 0)
+    return q[0] & 0xFFFFFFFFFFFF
 
+
+def _parse_info_response(names, rsp_data):
     if rsp_data == -1 or rsp_data is None:
         return -1
 
@@ -232,10 +264,20 @@ def info(sock, names=None):
 
     else:
         rdict = dict()
-        for line in rsp_data.split("\n"):
+        for line in iter_fields(rsp_data, "\n"):
             if len(line) < 1:
                 # this accounts for the trailing '\n' - cheaper than chomp
                 continue
             name, sep, value = g_partition(line, "\t")
             rdict[name] = value
         return rdict
+
+
+def info(sock, names=None):
+    if not sock:
+        return -1
+
+    buf = _info_request_buffer(names)
+    rsp_data = _info_request(sock, buf)
+
+    return _parse_info_response(names, rsp_data)
@@ -0,0 +1,351 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import errno
+import select
+import socket
+import sys
+from time import time
+
+from lib.client.assocket import ASSocket
+from lib.client.info import (_authenticate_request_buffer,
+                             _info_request_buffer, _info_response_size,
+                             _parse_info_response, admin_parse_header)
+from lib.client.resolver import get_resolver
+
+PROTO_HEADER_SIZE = 8
+ADMIN_HEADER_SIZE = 24
+
+# request states
+CONNECTING = 0
+HANDSHAKING = 1
+SENDING = 2
+RECEIVING = 3
+
+# direction a request waits for
+WANT_READ = 0
+WANT_WRITE = 1
+
+
+class NodeTimeoutError(IOError):
+
+    """
+    Node did not respond before command deadline.
+    """
+    pass
+
+
+def _tls_want_errors():
+    # pyOpenSSL is loaded only once TLS is in use (see assocket), no TLS
+    # socket can exist before that
+    SSL = sys.modules.get("OpenSSL.SSL")
+    if SSL is None:
+        return (), ()
+    return (SSL.WantReadError,), (SSL.WantWriteError,)
+
+
+class _InfoRequest(object):
+
+    """
+    State of a single info request driven by InfoLoop. New connections are
+    made non-blocking, connect, TLS handshake and authentication all run in
+    the loop. wants is the direction the request waits for, TLS may need to
+    read while sending or write while receiving.
+    """
+
+    def __init__(self, key, node, command, port):
+        self.key = key
+        self.node = node
+        self.command = command
+        self.port = port
+        self.sock = None
+        self.addrinfos = []
+        self.tls_session = None
+        self.state = None
+        self.wants = WANT_WRITE
+        self.authenticating = False
+        self.buf = _info_request_buffer(command)
+        self.out = None
+        self.sent = 0
+        self.header_size = PROTO_HEADER_SIZE
+        self.header = ""
+        self.size = None
+        self.chunks = []
+        self.received = 0
+        self.result = None
+        self.done = False
+
+    def fileno(self):
+        return self.sock.sock.fileno()
+
+    def start(self):
+        self.sock = self.node._get_pooled_connection(self.port)
+        if self.sock:
+            try:
+                self.sock.sock.setblocking(0)
+            except Exception:
+                self.fail()
+                return False
+            self._send(self.buf)
+            return True
+
+        self.sock = ASSocket(self.node, self.node.ip, self.port,
+                             pool_size=self.node.socket_pool_size,
+                             idle_timeout=self.node.socket_idle_timeout)
+        try:
+            self.addrinfos = list(
+                get_resolver().getaddrinfo(self.node.ip, self.port))
+        except Exception:
+            self.addrinfos = []
+        return self._connect_next()
+
+    def _connect_next(self):
+        # for DNS it will try all possible addresses
+        while self.addrinfos:
+            # sock_info format : (family, socktype, proto, canonname, sockaddr)
+            addrinfo = self.addrinfos.pop(0)
+            raw_sock = None
+            try:
+                raw_sock = socket.socket(addrinfo[0], socket.SOCK_STREAM)
+                raw_sock.setblocking(0)
+                rc = raw_sock.connect_ex(addrinfo[4])
+            except Exception:
+                rc = None
+            if rc in (0, errno.EINPROGRESS, errno.EAGAIN, errno.EWOULDBLOCK):
+                self.sock.sock = raw_sock
+                self.state = CONNECTING
+                self.wants = WANT_WRITE
+                return True
+            if raw_sock:
+                raw_sock.close()
+        self.fail()
+        return False
+
+    def on_ready(self):
+        want_read_errors, want_write_errors = _tls_want_errors()
+        try:
+            if self.state == CONNECTING:
+                self._connected()
+            if self.state == HANDSHAKING:
+                self._handshake()
+            if self.state == SENDING:
+                self._send_some()
+            if self.state == RECEIVING:
+                self._receive_some()
+        except want_read_errors:
+            self.wants = WANT_READ
+        except want_write_errors:
+            self.wants = WANT_WRITE
+        except socket.error as e:
+            if e.args[0] not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                self.fail()
+        except Exception:
+            self.fail()
+
+    def _connected(self):
+        raw_sock = self.sock.sock
+        if raw_sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR):
+            raw_sock.close()
+            self.sock.sock = None
+            self._connect_next()
+            return
+
+        if not self.node.ssl_context:
+            self._authenticate()
+            return
+
+        sock = self.sock._wrap_socket(raw_sock, self.node.ssl_context)
+        self.sock.sock = sock
+        sock.set_app_data(self.node.tls_name)
+        sock.set_connect_state()
+        session, generation = self.sock._tls_offer_session(sock)
+        self.tls_session = (session, generation, time())
+        self.state = HANDSHAKING
+
+    def _handshake(self):
+        self.wants = WANT_READ
+        self.sock.sock.do_handshake()
+        session, generation, start_time = self.tls_session
+        self.sock._tls_handshake_done(self.sock.sock, session, generation,
+                                      time() - start_time)
+        self._authenticate()
+
+    def _authenticate(self):
+        if self.node.user is None:
+            self._send(self.buf)
+            return
+        self.authenticating = True
+        self._send(_authenticate_request_buffer(self.node.user,
+                                                self.node.password))
+
+    def _send(self, buf):
+        self.out = buf
+        self.sent = 0
+        self.state = SENDING
+        self.wants = WANT_WRITE
+
+    def _send_some(self):
+        self.wants = WANT_WRITE
+        while self.sent < len(self.out):
+            self.sent += self.sock.sock.send(self.out[self.sent:])
+        self.header_size = (ADMIN_HEADER_SIZE if self.authenticating
+                            else PROTO_HEADER_SIZE)
+        self.header = ""
+        self.size = None
+        self.state = RECEIVING
+        self.wants = WANT_READ
+
+    def _receive_some(self):
+        self.wants = WANT_READ
+        while self.state == RECEIVING and not self.done:
+            if self.size is None:
+                data = self.sock.sock.recv(self.header_size - len(self.header))
+            else:
+                data = self.sock.sock.recv(self.size - self.received)
+            if not data:
+                # peer closed the connection
+                self.fail()
+                return
+            self._consume(data)
+
+    def _consume(self, data):
+        if self.size is None:
+            self.header += data
+            if len(self.header) < self.header_size:
+                return
+            if self.authenticating:
+                self.authenticating = False
+                if admin_parse_header(self.header)[2] != 0:
+                    self.fail(reason="Authentication failed for node")
+                    return
+                self._send(self.buf)
+                return
+            self.size = _info_response_size(self.header)
+            if self.size == 0:
+                self.finish(None)
+            return
+
+        self.chunks.append(data)
+        self.received += len(data)
+        if self.received >= self.size:
+            self.finish("".join(self.chunks))
+
+    def finish(self, rsp_data):
+        result = _parse_info_response(self.command, rsp_data)
+        if result == -1 or result is None:
+            self.fail()
+            return
+        self.result = result
+        self.done = True
+        self.release()
+
+    def fail(self, reason="Invalid command or Could not connect to node"):
+        self.result = IOError("%s %s " % (reason, self.node.ip))
+        self.node.alive = False
+        self.done = True
+        self.release(force=True)
+
+    def timeout(self):
+        # slow node is not necessarily dead, leave alive to cluster refresh
+        self.result = NodeTimeoutError("Timed out waiting for node %s " %
+                                       (self.node.ip))
+        self.done = True
+        self.release(force=True)
+
+    def release(self, force=False):
+        if not self.sock:
+            return
+        if self.sock.sock:
+            try:
+                self.sock.sock.setblocking(1)
+            except Exception:
+                force = True
+            self.sock.close(force=force)
+        self.sock = None
+
+
+class InfoLoop(object):
+
+    """
+    Drives info requests for many nodes from a single thread using
+    non-blocking sockets, instead of one thread per node.
+    """
+
+    def __init__(self, max_requests_per_node=2, timeout=5.0):
+        """
+        max_requests_per_node -- max concurrent connections used per node
+        timeout -- deadline in seconds for all requests of a single run
+        """
+        self.max_requests_per_node = max_requests_per_node
+        self.timeout = timeout
+
+    def run(self, requests):
+        """
+        requests -- list of (key, node, command, port)
+
+        Returns:
+        dict -- key -> response or exception
+        """
+        queues = {}
+        order = []
+        for key, node, command, port in requests:
+            if node.key not in queues:
+                queues[node.key] = []
+                order.append(node.key)
+            queues[node.key].append(_InfoRequest(key, node, command, port))
+
+        all_requests = [r for node_key in order for r in queues[node_key]]
+        active = []
+        in_flight = dict((node_key, 0) for node_key in order)
+
+        def schedule(node_key):
+            queue = queues[node_key]
+            while queue and in_flight[node_key] < self.max_requests_per_node:
+                request = queue.pop(0)
+                if request.start():
+                    in_flight[node_key] += 1
+                    active.append(request)
+
+        # connects are part of the deadline
+        deadline = time() + self.timeout
+        for node_key in order:
+            schedule(node_key)
+
+        while active:
+            remaining = deadline - time()
+            if remaining <= 0:
+                break
+            rlist = [r for r in active if r.wants == WANT_READ]
+            wlist = [r for r in active if r.wants == WANT_WRITE]
+            try:
+                readable, writable, _ = select.select(rlist, wlist, [],
+                                                      remaining)
+            except select.error as e:
+                if e.args[0] == errno.EINTR:
+                    continue
+                raise
+
+            for request in writable + readable:
+                request.on_ready()
+
+            for request in [r for r in active if r.done]:
+                active.remove(request)
+                in_flight[request.node.key] -= 1
+                schedule(request.node.key)
+
+        for request in all_requests:
+            if not request.done:
+                request.timeout()
+
+        return dict((r.key, r.result) for r in all_requests)
@@ -14,16 +14,15 @@
 
 import copy
 import re
-import socket
 from telnetlib import Telnet
 from time import time
 import threading
 import logging
 import lib
 from distutils.version import LooseVersion
-from lib.client.assocket import ASSocket
+from lib.client.assocket import ASSocket, DEFAULT_POOL_SIZE, DEFAULT_IDLE_TIMEOUT
 from lib.client import util
-from lib.collectinfo_parser.full_parser import parse_system_live_command
+from lib.client.resolver import get_resolver
 
 #### Remote Server connection module
 
@@ -45,22 +44,54 @@ except ImportError:
 
 COMMAND_PROMPT = '[#$] '
 
-def getfqdn(address, timeout=0.5):
-    # note: cannot use timeout lib because signal must be run from the
-    #       main thread
-
-    result = [address]
+# Info responses which do not change while node is up, cached till node
+# gets reconnected (see Node.connect)
+INFO_CACHE_SESSION_COMMANDS = set(["build", "build_os", "build_time",
+                                   "edition", "features", "node", "version"])
+# Info commands which change server state
+INFO_MUTATING_PREFIXES = ("set-config", "log-set", "sindex-create",
+                          "sindex-delete", "truncate")
+# Info commands which only read server state, matched on the command name
+# (the part before ':' or '/'). Only these may be sent twice by a hedged call.
+INFO_READ_ONLY_COMMANDS = frozenset([
+    "alumni-clear-std", "alumni-tls-std", "bins", "build", "build_os",
+    "build_time", "cluster-key", "cluster-name", "dc", "dcs", "edition",
+    "features", "get-config", "get-dc-config", "hist-dump", "latency", "logs",
+    "namespace", "namespaces", "node", "peers-clear-alt", "peers-clear-std",
+    "peers-generation", "peers-tls-alt", "peers-tls-std", "service",
+    "service-clear-alt", "service-clear-std", "service-tls-alt",
+    "service-tls-std", "services", "services-alternate", "services-alumni",
+    "sets", "sindex", "sindex-list", "statistics", "udf-list", "version"])
+# Info commands which should always go to server
+INFO_CACHE_DISABLED_PREFIXES = ("latency", "peers-generation",
+                                "cluster-key") + INFO_MUTATING_PREFIXES
+INFO_CACHE_DEFAULT_TTL = 0.5
+
+
+def is_read_only_info_command(command):
+    if not isinstance(command, str):
+        return False
+    return re.split("[:/]", command, 1)[0] in INFO_READ_ONLY_COMMANDS
 
-    def helper():
-        result[0] = socket.getfqdn(address)
 
-    t = threading.Thread(target=helper)
+def _info_cache_ttl(args):
+    """
+    TTL policy for cached info calls, args are (node, command, ...)
+    """
+    command = args[1] if len(args) > 1 else None
+    if isinstance(command, tuple):
+        commands = command
+    else:
+        commands = (command,)
 
-    t.start()
+    for c in commands:
+        if not c or c.startswith(INFO_CACHE_DISABLED_PREFIXES):
+            return 0
 
-    t.join(timeout)
+    if all(c in INFO_CACHE_SESSION_COMMANDS for c in commands):
+        return None
 
-    return result[0]
+    return INFO_CACHE_DEFAULT_TTL
 
 
 def return_exceptions(func):
@@ -75,15 +106,18 @@ def return_exceptions(func):
 
 
 class Node(object):
-    dns_cache = {}
     pool_lock = threading.Lock()
 
     def __init__(self, address, port=3000, tls_name=None, timeout=3, user=None,
-                 password=None,  ssl_context=None, consider_alumni=False, use_services_alt=False):
+                 password=None,  ssl_context=None, consider_alumni=False, use_services_alt=False,
+                 socket_pool_size=DEFAULT_POOL_SIZE, socket_idle_timeout=DEFAULT_IDLE_TIMEOUT):
         """
         address -- ip or fqdn for this node
         port -- info port for this node
         timeout -- number of seconds to wait before giving up on the node
+        socket_pool_size -- max idle sockets kept per port for reuse
+        socket_idle_timeout -- seconds after which an idle pooled socket is
+                               not reused
         If address is ip then get fqdn else get ip
         store ip in self.ip
         store fqdn in self.fqdn
@@ -136,18 +170,30 @@ class Node(object):
 
         self._key = hash(self.create_key(address, self.port))
         self.peers_generation = -1
+        self.cluster_key = None
         self.service_addresses = []
         self.socket_pool = {}
         self.socket_pool[self.port] = set()
         self.socket_pool[self.xdr_port] = set()
+        self.socket_pool_size = socket_pool_size
+        self.socket_idle_timeout = socket_idle_timeout
+        # hits: pooled socket reused, misses: new socket needed,
+        # reconnects: pooled socket found dead and discarded
+        self.socket_pool_stats = {'hits': 0, 'misses': 0, 'reconnects': 0}
+        # Session of last full TLS handshake, offered to server by new
+        # connections for resumption
+        self.tls_session = None
+        self.tls_session_generation = None
+        self.tls_handshake_stats = {'full': 0, 'resumed': 0,
+                                    'total_time': 0.0, 'max_time': 0.0}
         self.connect(address, port)
         self.localhost = False
         try:
             if address.lower() == "localhost":
                 self.localhost = True
             else:
-                o, e = util.shell_command(["hostname -I"])
-                self.localhost = self._is_any_my_ip(o.split())
+                self.localhost = self._is_any_my_ip(
+                    util.get_local_addresses())
         except Exception:
             pass
 
@@ -160,6 +206,9 @@ class Node(object):
         return False
 
     def connect(self, address, port):
+        # (re)connecting, so drop responses cached for this node and for
+        # any older Node object with same address
+        self._invalidate_info_cache()
         try:
             self.node_id = self.info_node()
             if isinstance(self.node_id, Exception):
@@ -222,8 +271,35 @@ class Node(object):
             self.peers = []
             self.alive = False
 
+    def _invalidate_info_cache(self):
+        util.cached.invalidate_all(
+            lambda key: key and isinstance(key[0], Node) and key[0] == self)
+
     def refresh_connection(self):
-        self.connect(self.ip, self.port)
+        """
+        Poll node id, peers-generation and cluster-key in a single request
+        and reconnect (re-read services, features and peers) only if any of
+        them changed. Old servers (< 3.10) without peers-generation are
+        always reconnected.
+        """
+        if not self.alive or not self.use_peers_list:
+            self.connect(self.ip, self.port)
+            return
+
+        responses = self.info_many(["node", "peers-generation",
+                                    "cluster-key"])
+        if (isinstance(responses, Exception)
+                or any(isinstance(v, Exception) for v in responses.values())):
+            self.connect(self.ip, self.port)
+            return
+
+        cluster_key = responses["cluster-key"]
+        if (responses["node"] != self.node_id
+                or responses["peers-generation"] != self.peers_generation
+                or (self.cluster_key is not None
+                    and cluster_key != self.cluster_key)):
+            self.connect(self.ip, self.port)
+        self.cluster_key = cluster_key
 
     @property
     def key(self):
@@ -244,12 +320,7 @@ class Node(object):
         return self._key == other._key
 
     def _update_IP(self, address, port):
-        if address not in self.dns_cache:
-            self.dns_cache[address] = (socket.getaddrinfo(address, port,
-                                                          socket.AF_UNSPEC, socket.SOCK_STREAM)[0][4][0],
-                                       getfqdn(address))
-
-        self.ip, self.fqdn = self.dns_cache[address]
+        self.ip, self.fqdn = get_resolver().resolve(address, port)
 
     def sock_name(self, use_fqdn=False):
         if use_fqdn:
@@ -303,7 +374,7 @@ class Node(object):
     # issues in future process.
 
     @return_exceptions
-    @util.cached
+    @util.cached_with_policy(_info_cache_ttl)
     def _info_telnet(self, command, ip=None, port=None):
         # TODO: Handle socket failures
         if ip == None:
@@ -327,6 +398,20 @@ class Node(object):
         return result
 
     def _get_connection(self, ip, port):
+        sock = self._get_pooled_connection(port)
+        if sock:
+            return sock
+        sock = ASSocket(self, ip, port, pool_size=self.socket_pool_size,
+                        idle_timeout=self.socket_idle_timeout)
+        if sock.connect():
+            return sock
+        return None
+
+    def _get_pooled_connection(self, port):
+        """
+        Returns an idle connected socket from the pool, or None. Never blocks
+        on the network.
+        """
         sock = None
         with Node.pool_lock:
             try:
@@ -336,16 +421,33 @@ class Node(object):
                         if not self.ssl_context:
                             sock.settimeout(5.0)
                         break
+                    self.socket_pool_stats['reconnects'] += 1
                     sock.close(force=True)
+                    sock = None
             except Exception:
                 pass
-        if sock:
-            return sock
-        sock = ASSocket(self, ip, port)
-        if sock.connect():
-            return sock
+            if sock:
+                self.socket_pool_stats['hits'] += 1
+                return sock
+            self.socket_pool_stats['misses'] += 1
         return None
 
+    def _update_tls_session(self, sock, handshake_time, resumed,
+                            generation=None):
+        with Node.pool_lock:
+            stats = self.tls_handshake_stats
+            if resumed:
+                stats['resumed'] += 1
+            else:
+                stats['full'] += 1
+                try:
+                    self.tls_session = sock.get_session()
+                    self.tls_session_generation = generation
+                except Exception:
+                    self.tls_session = None
+            stats['total_time'] += handshake_time
+            stats['max_time'] = max(stats['max_time'], handshake_time)
+
     def close(self):
         try:
             while True:
@@ -363,7 +465,7 @@ class Node(object):
         self.socket_pool = None
 
     @return_exceptions
-    @util.cached
+    @util.cached_with_policy(_info_cache_ttl)
     def _info_cinfo(self, command, ip=None, port=None):
         # TODO: citrusleaf.py does not support passing a timeout default is
         # 0.5s
@@ -388,6 +490,52 @@ class Node(object):
             raise IOError(
                 "Invalid command or Could not connect to node %s " % ip)
 
+    @return_exceptions
+    def info_cache_statistics(self):
+        """
+        Get info response cache counters for this node.
+
+        Returns:
+        dict -- {stat_name : stat_value, ...}
+        """
+        hits = misses = entries = 0
+        for cache in util.cached.instances:
+            stats = cache.get_stats(owner=self)
+            hits += stats['hits']
+            misses += stats['misses']
+            entries += stats['entries']
+
+        hit_pct = 0.0
+        if hits + misses:
+            hit_pct = 100.0 * hits / (hits + misses)
+
+        return {'hits': str(hits), 'misses': str(misses),
+                'entries': str(entries), 'hit_pct': "%.2f" % (hit_pct)}
+
+    @return_exceptions
+    def info_tls_statistics(self):
+        """
+        Get TLS handshake counters for this node. Times are in milliseconds.
+
+        Returns:
+        dict -- {stat_name : stat_value, ...}
+        """
+        with Node.pool_lock:
+            stats = dict(self.tls_handshake_stats)
+
+        handshakes = stats['full'] + stats['resumed']
+        avg_time = 0.0
+        resumed_pct = 0.0
+        if handshakes:
+            avg_time = stats['total_time'] / handshakes
+            resumed_pct = 100.0 * stats['resumed'] / handshakes
+
+        return {'full_handshakes': str(stats['full']),
+                'resumed_handshakes': str(stats['resumed']),
+                'resumed_pct': "%.2f" % (resumed_pct),
+                'avg_handshake_ms': "%.3f" % (avg_time * 1000),
+                'max_handshake_ms': "%.3f" % (stats['max_time'] * 1000)}
+
     @return_exceptions
     def info(self, command):
         """
@@ -402,7 +550,39 @@ class Node(object):
             return self._info_cinfo(command, self.ip)
 
     @return_exceptions
-    @util.cached
+    def info_many(self, commands):
+        """
+        asinfo function equivalent for multiple commands, all commands are
+        sent to the node in a single request.
+
+        Arguments:
+        commands -- list of info commands to execute on this node
+
+        Returns:
+        dict -- command -> response, missing responses are set to an exception
+        """
+        commands = tuple(commands)
+        if not commands:
+            return {}
+
+        if self._use_telnet:
+            return dict((command, self.info(command)) for command in commands)
+
+        results = self._info_cinfo(commands, self.ip)
+        if isinstance(results, Exception):
+            return dict((command, results) for command in commands)
+
+        responses = {}
+        for command in commands:
+            if command in results:
+                responses[command] = results[command]
+            else:
+                responses[command] = IOError(
+                    "Invalid command or Could not connect to node %s " % self.ip)
+        return responses
+
+    @return_exceptions
+    @util.cached_with_policy(_info_cache_ttl)
     def xdr_info(self, command):
         """
         asinfo -p [xdr-port] equivalent
@@ -655,9 +835,16 @@ class Node(object):
         if isinstance(namespaces, Exception):
             return namespaces
 
+        commands = ["namespace/%s" % ns for ns in namespaces]
+        responses = self.info_many(commands)
+
         stats = {}
-        for ns in namespaces:
-            stats[ns] = self.info_namespace_statistics(ns)
+        for ns, command in zip(namespaces, commands):
+            response = responses[command]
+            if isinstance(response, Exception):
+                stats[ns] = response
+            else:
+                stats[ns] = util.info_to_dict(response)
 
         return stats
 
@@ -741,11 +928,14 @@ class Node(object):
             else:
                 namespace_configs = {}
                 namespaces = self.info_namespaces()
-                for index, namespace in enumerate(namespaces):
-                    namespace_config = self.info_get_config(
-                        'namespace', namespace, namespace_id=index)
-                    namespace_config = namespace_config['namespace'][namespace]
-                    namespace_configs[namespace] = namespace_config
+                commands = ["get-config:context=namespace;id=%s" % ns
+                            for ns in namespaces]
+                responses = self.info_many(commands)
+                for index, ns in enumerate(namespaces):
+                    namespace_config = util.info_to_dict(
+                        responses[commands[index]])
+                    namespace_config["nsid"] = str(index)
+                    namespace_configs[ns] = namespace_config
                 config['namespace'] = namespace_configs
 
         elif stanza == '':
@@ -911,9 +1101,19 @@ class Node(object):
         if isinstance(dcs, Exception):
             return {}
 
+        if self.is_feature_present('xdr'):
+            commands = ["dc/%s" % dc for dc in dcs]
+            responses = self.info_many(commands)
+
         stats = {}
-        for dc in dcs:
-            stat = self.info_dc_statistics(dc)
+        for index, dc in enumerate(dcs):
+            if self.is_feature_present('xdr'):
+                stat = responses[commands[index]]
+                if not isinstance(stat, Exception):
+                    stat = util.info_to_dict(stat)
+            else:
+                # old XDR (< 3.8) info port does not serve batched requests
+                stat = self.info_dc_statistics(dc)
             if not stat or isinstance(stat, Exception):
                 stat = {}
             stats[dc] = stat
@@ -978,12 +1178,16 @@ class Node(object):
     @return_exceptions
     def info_histogram(self, histogram):
         namespaces = self.info_namespaces()
+        commands = ["hist-dump:ns=%s;hist=%s" % (namespace, histogram)
+                    for namespace in namespaces]
+        responses = self.info_many(commands)
 
         data = {}
-        for namespace in namespaces:
+        for namespace, command in zip(namespaces, commands):
             try:
-                datum = self.info("hist-dump:ns=%s;hist=%s" %
-                                  (namespace, histogram))
+                datum = responses[command]
+                if isinstance(datum, Exception):
+                    raise datum
                 datum = datum.split(',')
                 datum.pop(0)  # don't care about ns, hist_name, or length
                 width = int(datum.pop(0))
@@ -1011,6 +1215,35 @@ class Node(object):
         """
         return util.info_to_dict(self.info("sindex/%s/%s" % (namespace, indexname)))
 
+    @return_exceptions
+    def info_all_sindex_statistics(self):
+        """
+        Get statistics for all sindexes.
+
+        Returns:
+        list -- [{stat_name : stat_value, ...}, ...] where each sindex's
+                statistics are merged with its "sindex" info entry. If the
+                statistics request failed, the entry only has the "sindex"
+                info fields and 'error' is set to the exception.
+        """
+        sindexes = [s for s in self.info_sindex()
+                    if s and s.get('ns') and s.get('indexname')]
+        commands = ["sindex/%s/%s" % (s['ns'], s['indexname'])
+                    for s in sindexes]
+        responses = self.info_many(commands)
+
+        stats = []
+        for sindex, command in zip(sindexes, commands):
+            response = responses[command]
+            if isinstance(response, Exception):
+                stat = {'error': response}
+            else:
+                stat = util.info_to_dict(response)
+            stat.update(sindex)
+            stats.append(stat)
+
+        return stats
+
     @return_exceptions
     def info_XDR_build_version(self):
         """
@@ -1137,6 +1370,7 @@ class Node(object):
 
     @return_exceptions
     def _get_localhost_system_statistics(self, commands):
+        from lib.collectinfo_parser.full_parser import parse_system_live_command
         sys_stats = {}
 
         for _key, cmds in self.sys_cmds:
@@ -1253,6 +1487,7 @@ class Node(object):
 
     @return_exceptions
     def _get_remote_host_system_statistics(self, commands):
+        from lib.collectinfo_parser.full_parser import parse_system_live_command
         sys_stats = {}
 
         if PEXPECT_VERSION == NO_MODULE:
@@ -0,0 +1,177 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+import threading
+from time import time
+
+DEFAULT_TTL = 300
+# failed lookups and unreachable endpoints are retried sooner
+DEFAULT_NEGATIVE_TTL = 30
+
+
+def getfqdn(address, timeout=0.5):
+    # note: cannot use timeout lib because signal must be run from the
+    #       main thread
+
+    result = [address]
+
+    def helper():
+        result[0] = socket.getfqdn(address)
+
+    t = threading.Thread(target=helper)
+    t.daemon = True
+
+    t.start()
+
+    t.join(timeout)
+
+    return result[0]
+
+
+def _flatten_endpoints(endpoints):
+    for endpoint in endpoints:
+        if not endpoint or not isinstance(endpoint, tuple):
+            continue
+        if isinstance(endpoint[0], tuple):
+            # list of alternate addresses of a single node
+            for e in _flatten_endpoints(endpoint):
+                yield e
+        else:
+            yield endpoint[0], endpoint[1]
+
+
+class Resolver(object):
+
+    """
+    TTL bounded cache of DNS lookups shared by Cluster, Node and ASSocket.
+    Failed lookups and endpoints found unreachable are remembered for
+    negative_ttl seconds.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        # (host, port) -> (expiry, addrinfo list or exception)
+        self._addrinfo = {}
+        # address -> (expiry, fqdn)
+        self._fqdn = {}
+        # (address, port) -> expiry
+        self._unreachable = {}
+
+    def _get(self, cache, key):
+        with self._lock:
+            entry = cache.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] > time():
+                return True, entry[1]
+            cache.pop(key, None)
+        return False, None
+
+    def _put(self, cache, key, value, ttl):
+        with self._lock:
+            cache[key] = (time() + ttl, value)
+
+    def getaddrinfo(self, host, port):
+        """
+        Cached socket.getaddrinfo for stream sockets of any address family.
+        """
+        found, result = self._get(self._addrinfo, (host, port))
+        if not found:
+            try:
+                result = socket.getaddrinfo(host, port, socket.AF_UNSPEC,
+                                            socket.SOCK_STREAM)
+                self._put(self._addrinfo, (host, port), result, self.ttl)
+            except socket.gaierror as e:
+                self._put(self._addrinfo, (host, port), e,
+                          self.negative_ttl)
+                raise
+
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def getfqdn(self, address):
+        found, result = self._get(self._fqdn, address)
+        if not found:
+            result = getfqdn(address)
+            # lookup failed or timed out if we got address back
+            if result == address:
+                self._put(self._fqdn, address, result, self.negative_ttl)
+            else:
+                self._put(self._fqdn, address, result, self.ttl)
+        return result
+
+    def resolve(self, address, port):
+        """
+        Returns:
+        tuple -- (ip, fqdn) for address
+        """
+        ip = self.getaddrinfo(address, port)[0][4][0]
+        return ip, self.getfqdn(address)
+
+    def prefetch(self, endpoints, pool=None):
+        """
+        Resolve endpoints in parallel so that later lookups hit the cache.
+
+        endpoints -- list of (addr, port[, tls_name]) tuples or tuples of
+                     alternate endpoints
+        pool -- WorkerPool to resolve with, a thread per endpoint otherwise
+        """
+        addr_ports = list(set(_flatten_endpoints(endpoints)))
+
+        def _resolve(addr_port):
+            try:
+                self.resolve(*addr_port)
+            except Exception:
+                pass
+
+        if pool:
+            pool.map(_resolve, addr_ports)
+            return
+
+        threads = [threading.Thread(target=_resolve, args=(addr_port,))
+                   for addr_port in addr_ports]
+        for t in threads:
+            t.daemon = True
+            t.start()
+        for t in threads:
+            t.join()
+
+    def mark_unreachable(self, address, port):
+        self._put(self._unreachable, (address, port), True,
+                  self.negative_ttl)
+
+    def is_unreachable(self, address, port):
+        return self._get(self._unreachable, (address, port))[0]
+
+    def clear(self):
+        with self._lock:
+            self._addrinfo.clear()
+            self._fqdn.clear()
+            self._unreachable.clear()
+
+
+_shared_resolver = Resolver()
+
+
+def get_resolver():
+    return _shared_resolver
+
+
+def set_resolver(resolver):
+    global _shared_resolver
+    _shared_resolver = resolver
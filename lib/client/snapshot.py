@@ -0,0 +1,187 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import threading
+from contextlib import contextmanager
+from time import time
+
+from lib.client.node import INFO_CACHE_DISABLED_PREFIXES
+
+# Read-only cluster methods whose results are kept in snapshot
+SNAPSHOT_METHODS = set([
+    'info_statistics', 'info_namespaces', 'info_namespace_statistics',
+    'info_all_namespace_statistics', 'info_set_statistics',
+    'info_bin_statistics', 'info_sindex', 'info_all_sindex_statistics',
+    'info_XDR_statistics', 'info_dcs', 'info_dc_statistics',
+    'info_all_dc_statistics', 'info_get_config', 'info_XDR_get_config',
+    'info_dc_get_config', 'info_XDR_build_version', 'info_udf_list',
+])
+
+# Calls made by fetch_all, (method_name, kwargs)
+SNAPSHOT_SECTIONS = [
+    ('info_statistics', {}),
+    ('info_namespaces', {}),
+    ('info_all_namespace_statistics', {}),
+    ('info_set_statistics', {}),
+    ('info_bin_statistics', {}),
+    ('info_all_sindex_statistics', {}),
+    ('info_XDR_statistics', {}),
+    ('info_all_dc_statistics', {}),
+    ('info_get_config', {'stanza': 'service'}),
+    ('info_get_config', {'stanza': 'network'}),
+    ('info_get_config', {'stanza': 'network.heartbeat'}),
+    ('info_get_config', {'stanza': 'network.info'}),
+    ('info_get_config', {'stanza': 'namespace'}),
+    ('info_XDR_get_config', {}),
+    ('info_dc_get_config', {}),
+]
+
+# Seconds for which data is reused across commands, by default data is
+# shared only by calls made while running the same command
+DEFAULT_SNAPSHOT_TTL = 0
+
+
+def _freeze(value):
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+class _Entry(object):
+
+    def __init__(self, command_id):
+        self.command_id = command_id
+        self.fetch_time = None
+        self.result = None
+        self.exc = None
+        self.ready = threading.Event()
+
+
+class ClusterSnapshot(object):
+
+    """
+    Cluster data shared by controllers. Results of read-only cluster calls
+    are reused for the rest of the running command, and by later commands
+    while younger than ttl seconds. Callers get their own copy of the data
+    and are free to modify it.
+    """
+
+    def __init__(self, cluster, ttl=DEFAULT_SNAPSHOT_TTL):
+        self.cluster = cluster
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._command_id = None
+        self._last_command_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    @contextmanager
+    def command(self):
+        """
+        Scope of a single command, nested commands (for ex. watch) get their
+        own scope and fetch fresh data.
+        """
+        with self._lock:
+            outer_command_id = self._command_id
+            self._last_command_id += 1
+            self._command_id = self._last_command_id
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._command_id = outer_command_id
+                self._expire()
+
+    def _is_valid(self, entry):
+        if self._command_id is not None and entry.command_id == self._command_id:
+            return True
+        if not entry.ready.is_set():
+            # still being fetched
+            return True
+        return bool(self.ttl and time() - entry.fetch_time <= self.ttl)
+
+    def _expire(self):
+        for key in [k for k, e in self._entries.iteritems()
+                    if e.ready.is_set() and not self._is_valid(e)]:
+            del self._entries[key]
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, method_name, *args, **kwargs):
+        """
+        Call cluster method_name, or return result kept from earlier call
+        with same arguments.
+        """
+        kwargs.setdefault('nodes', 'all')
+        key = (method_name, tuple(_freeze(a) for a in args),
+               tuple(sorted((k, _freeze(v)) for k, v in kwargs.iteritems())))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_valid(entry):
+                fetch = False
+                self.hits += 1
+            else:
+                entry = _Entry(self._command_id)
+                self._entries[key] = entry
+                fetch = True
+                self.misses += 1
+
+        if fetch:
+            try:
+                entry.result = getattr(self.cluster, method_name)(*args,
+                                                                  **kwargs)
+            except Exception as e:
+                entry.exc = e
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+            finally:
+                entry.fetch_time = time()
+                entry.ready.set()
+        else:
+            entry.ready.wait()
+
+        if entry.exc is not None:
+            raise entry.exc
+        return copy.deepcopy(entry.result)
+
+    def fetch_all(self, nodes='all'):
+        """
+        Fetch statistics and configs of all sections in one parallel pass,
+        so that later calls of controllers are served from snapshot.
+        """
+        self.cluster.worker_pool.map(
+            lambda section: self.get(section[0], nodes=nodes, **section[1]),
+            SNAPSHOT_SECTIONS)
+
+    def __getattr__(self, name):
+        if name in SNAPSHOT_METHODS:
+            def snapshot_func(*args, **kwargs):
+                return self.get(name, *args, **kwargs)
+            return snapshot_func
+
+        if name == 'info':
+            def info_func(command, **kwargs):
+                if command.startswith(INFO_CACHE_DISABLED_PREFIXES):
+                    return self.cluster.info(command, **kwargs)
+                return self.get('info', command, **kwargs)
+            return info_func
+
+        # not kept in snapshot, go to cluster
+        return getattr(self.cluster, name)
@@ -16,7 +16,9 @@
 
 from lib.client.ssl_util import dnsname_match
 from os import listdir
-from os.path import isfile, join
+from os.path import getmtime, isfile, join
+import threading
+from time import sleep
 import warnings
 
 try:
@@ -114,6 +116,11 @@ if HAVE_PYASN1:
         sizeSpec = univ.SequenceOf.sizeSpec + \
             constraint.ValueSizeConstraint(1, MAX)
 
+# Max number of certificate verification results remembered by SSLContext
+MAX_VERIFIED_CERTS = 1024
+# Seconds between checks for modified CRL and blacklist files
+INDEX_RELOAD_INTERVAL = 30
+
 
 class SSLContext(object):
 
@@ -123,6 +130,13 @@ class SSLContext(object):
                  crl_check_all=False):
 
         self.ctx = None
+        # certificate fingerprint -> result of blacklist and CRL checks
+        self._verified_certs = {}
+        self._verified_certs_lock = threading.Lock()
+        # bumped whenever CRL or blacklist index is reloaded, TLS sessions
+        # established with an older generation must not be resumed
+        self.generation = 0
+        self._reloader = None
         if not enable_tls:
             return
         if not HAVE_PYOPENSSL:
@@ -132,17 +146,86 @@ class SSLContext(object):
                                  encrypt_only=encrypt_only, cafile=cafile, capath=capath,
                                  keyfile=keyfile, certfile=certfile, protocols=protocols,
                                  cipher_suite=cipher_suite)
+        self.ctx.set_app_data(self)
 
         self._crl_check = crl_check
         self._crl_check_all = crl_check_all
+        self._crl_path = None
+        self._blacklist_path = None
+        self._crl_mtimes = None
+        self._blacklist_mtime = None
         if enable_tls and not encrypt_only and (crl_check or crl_check_all):
-            self._crl_checklist = self._parse_crl_cert(capath)
+            self._crl_path = capath
+            self._crl_mtimes = self._get_crl_mtimes(capath)
+            self._crl_index = self._parse_crl_cert(capath)
         else:
-            self._crl_checklist = []
+            self._crl_index = set()
         if enable_tls and not encrypt_only:
+            self._blacklist_path = cert_blacklist
+            self._blacklist_mtime = self._get_mtime(cert_blacklist)
             self._cert_blacklist = self._parse_blacklist_cert(cert_blacklist)
         else:
-            self._cert_blacklist = []
+            self._cert_blacklist = set()
+
+        if self._crl_path or self._blacklist_path:
+            self._reloader = threading.Thread(target=self._reload_loop)
+            self._reloader.daemon = True
+            self._reloader.start()
+
+    def _get_mtime(self, path):
+        try:
+            return getmtime(path)
+        except Exception:
+            return None
+
+    def _get_crl_mtimes(self, crl_dir_path):
+        try:
+            return (self._get_mtime(crl_dir_path),
+                    tuple(sorted((f, self._get_mtime(join(crl_dir_path, f)))
+                                 for f in listdir(crl_dir_path))))
+        except Exception:
+            return None
+
+    def _reload_loop(self):
+        while True:
+            sleep(INDEX_RELOAD_INTERVAL)
+            try:
+                self.reload_if_changed()
+            except Exception:
+                pass
+
+    def reload_if_changed(self):
+        """
+        Rebuild CRL and blacklist indexes whose files changed on disk since
+        last load. Indexes are swapped in whole, verification never sees a
+        partially built index. On parse failure old index is kept.
+
+        Returns:
+        bool -- True if any index was reloaded
+        """
+        reloaded = False
+        if self._crl_path:
+            mtimes = self._get_crl_mtimes(self._crl_path)
+            if mtimes != self._crl_mtimes:
+                try:
+                    self._crl_index = self._parse_crl_cert(self._crl_path)
+                    reloaded = True
+                except Exception:
+                    pass
+                self._crl_mtimes = mtimes
+
+        if self._blacklist_path:
+            mtime = self._get_mtime(self._blacklist_path)
+            if mtime != self._blacklist_mtime:
+                self._cert_blacklist = self._parse_blacklist_cert(
+                    self._blacklist_path)
+                self._blacklist_mtime = mtime
+                reloaded = True
+
+        if reloaded:
+            self.generation += 1
+            self.clear_verified_certs()
+        return reloaded
 
     def _parse_crl_cert(self, crl_dir_path):
         if not crl_dir_path:
@@ -153,7 +236,8 @@ class SSLContext(object):
         except Exception:
             raise ValueError("Wrong or empty capath provided to CRL check.")
 
-        crl_checklist = []
+        # (issuer, serial number), issuer is None if not known
+        crl_index = set()
         for f in files:
             fs = None
             try:
@@ -162,22 +246,28 @@ class SSLContext(object):
                 revoked = crl.get_revoked()
                 if not revoked:
                     continue
+                try:
+                    issuer = self._get_issuer_key(crl.get_issuer())
+                except Exception:
+                    issuer = None
                 for r in revoked:
                     try:
                         r_serial = int(r.get_serial(), 16)
-                        crl_checklist.append(r_serial)
+                        crl_index.add((issuer, r_serial))
                     except Exception:
                         pass
             except Exception:
                 # Directory can have other files also
                 pass
-        if crl_checklist:
-            return crl_checklist
+        if crl_index:
+            return crl_index
         else:
             raise ValueError("No valid CRL found at capath")
 
     def _parse_blacklist_cert(self, file):
-        blacklist = []
+        # (issuer, serial number), issuer is None to blacklist serial number
+        # for any issuer
+        blacklist = set()
         try:
             for line in open(file, 'r').readlines():
                 if not line or not line.strip():
@@ -193,7 +283,7 @@ class SSLContext(object):
                     reminder = tokens[1]
                     if reminder:
                         issuer = self._parse_issuer(reminder.strip())
-                blacklist.append((serial_number_int, issuer))
+                blacklist.add((issuer, serial_number_int))
             return blacklist
         except Exception:
             return blacklist
@@ -216,20 +306,21 @@ class SSLContext(object):
                 return None
             comp_list.append((key, value))
         if comp_list:
-            comp_list = sorted(comp_list, key=lambda x: x[0])
+            comp_list = tuple(sorted(comp_list, key=lambda x: x[0]))
         else:
             comp_list = None
         return comp_list
 
+    def _get_issuer_key(self, x509_name):
+        issuer = x509_name.get_components()
+        if not issuer:
+            return None
+        return tuple(sorted(issuer, key=lambda x: x[0]))
+
     def _verify_none_cb(self, conn, cert, errnum, depth, ok):
         return ok
 
-    def _cert_blacklist_check(self, cert=None):
-        if not cert:
-            raise ValueError(
-                "Empty or no Server Certificate for authentication")
-        if not self._cert_blacklist:
-            return
+    def _get_cert_serial_number(self, cert):
         try:
             serial_number = cert.get_serial_number()
             if serial_number is None:
@@ -239,45 +330,49 @@ class SSLContext(object):
                 "Wrong Server Certificate: not able to extract Serial Number.")
 
         try:
-            issuer = cert.get_issuer().get_components()
-            issuer = sorted(issuer, key=lambda x: x[0])
-            if not issuer:
-                raise Exception("Wrong Server Certificate: No Issuer Name.")
+            return int(serial_number)
         except Exception:
             raise Exception(
-                "Wrong Server Certificate: not able to extract Issuer.")
+                "Wrong Server Certificate: not able to extract Serial Number in integer format.")
+
+    def _cert_blacklist_check(self, cert=None):
+        if not cert:
+            raise ValueError(
+                "Empty or no Server Certificate for authentication")
+        cert_blacklist = self._cert_blacklist
+        if not cert_blacklist:
+            return
+        serial_number_int = self._get_cert_serial_number(cert)
+
         try:
-            serial_number_int = int(serial_number)
+            issuer = self._get_issuer_key(cert.get_issuer())
+            if not issuer:
+                raise Exception("Wrong Server Certificate: No Issuer Name.")
         except Exception:
             raise Exception(
-                "Wrong Server Certificate: not able to extract Serial Number in integer format.")
-        if (serial_number_int, None) in self._cert_blacklist:
+                "Wrong Server Certificate: not able to extract Issuer.")
+        if (None, serial_number_int) in cert_blacklist:
             raise Exception(
                 "Server Certificate is in blacklist: (Serial Number: %x)" % (serial_number_int))
-        if (serial_number_int, issuer) in self._cert_blacklist:
+        if (issuer, serial_number_int) in cert_blacklist:
             raise Exception("Server Certificate is in blacklist: (Serial Number: %x, Issuer: %s)" % (
-                serial_number_int, str(issuer)))
+                serial_number_int, str(list(issuer))))
 
     def _cert_crl_check(self, cert):
         if not cert:
             raise ValueError(
                 "empty or no Server Certificate chain for CRL check")
-        if not self._crl_checklist:
+        crl_index = self._crl_index
+        if not crl_index:
             return
-        try:
-            serial_number = cert.get_serial_number()
-            if serial_number is None:
-                raise Exception("Wrong Server Certificate: No Serial Number.")
-        except Exception:
-            raise Exception(
-                "Wrong Server Certificate: not able to extract Serial Number.")
+        serial_number_int = self._get_cert_serial_number(cert)
 
         try:
-            serial_number_int = int(serial_number)
+            issuer = self._get_issuer_key(cert.get_issuer())
         except Exception:
-            raise Exception(
-                "Wrong Server Certificate: not able to extract Serial Number in integer format.")
-        if serial_number in self._crl_checklist:
+            issuer = None
+        if ((issuer, serial_number_int) in crl_index
+                or (None, serial_number_int) in crl_index):
             raise Exception("Server Certificate is in revoked list: (Serial Number: %s)" % (
                 str(hex(serial_number_int))))
 
@@ -351,11 +446,48 @@ class SSLContext(object):
             tls_name = conn.get_app_data()
             self._match_tlsname(cert=cert, tls_name=tls_name)
 
-        self._cert_blacklist_check(cert=cert)
-        if self._crl_check_all or (self._crl_check and depth == 0):
-            self._cert_crl_check(cert=cert)
+        check_crl = self._crl_check_all or (self._crl_check and depth == 0)
+        self._cached_cert_check(cert=cert, check_crl=check_crl)
         return ok
 
+    def _cached_cert_check(self, cert, check_crl):
+        """
+        Run blacklist and CRL checks for cert, reusing the outcome of an
+        earlier check of the same certificate (same sha256 fingerprint).
+        """
+        try:
+            key = (cert.digest("sha256"), check_crl, self.generation)
+        except Exception:
+            key = None
+
+        if key is not None:
+            with self._verified_certs_lock:
+                if key in self._verified_certs:
+                    exc = self._verified_certs[key]
+                    if exc:
+                        raise exc
+                    return
+
+        exc = None
+        try:
+            self._cert_blacklist_check(cert=cert)
+            if check_crl:
+                self._cert_crl_check(cert=cert)
+        except Exception as e:
+            exc = e
+
+        if key is not None:
+            with self._verified_certs_lock:
+                if len(self._verified_certs) >= MAX_VERIFIED_CERTS:
+                    self._verified_certs.clear()
+                self._verified_certs[key] = exc
+        if exc:
+            raise exc
+
+    def clear_verified_certs(self):
+        with self._verified_certs_lock:
+            self._verified_certs.clear()
+
     def _parse_protocols(self, protocols):
         protocols_to_disable = [
             "SSLv2", "SSLv3", "TLSv1", "TLSv1.1", "TLSv1.2"]
@@ -460,6 +592,11 @@ class SSLContext(object):
         method, protocols_to_disable = self._parse_protocols(protocols)
         self.ctx = SSL.Context(method)
         self.ctx = self._set_context_options(self.ctx, protocols_to_disable)
+        try:
+            # keep client sessions so that nodes can resume them
+            self.ctx.set_session_cache_mode(SSL.SESS_CACHE_CLIENT)
+        except Exception:
+            pass
         if encrypt_only:
             self.ctx.set_verify(SSL.VERIFY_NONE, self._verify_none_cb)
         else:
@@ -12,13 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import re
+import binascii
+import collections
 import itertools
+import socket
 import threading
 from time import time
 import subprocess
 import pipes
 
+from lib.client.info import iter_fields
+
 
 def info_to_dict(value, delimiter=';'):
     """
@@ -26,8 +30,8 @@ def info_to_dict(value, delimiter=';'):
     """
 
     stat_dict = {}
-    stat_param = itertools.imap(lambda sp: info_to_tuple(sp, "="),
-                                info_to_list(value, delimiter))
+    stat_param = itertools.imap(lambda sp: tuple(sp.split("=")),
+                                iter_fields(value, delimiter))
     for g in itertools.groupby(stat_param, lambda x: x[0]):
         try:
             value = map(lambda v: v[1], g[1])
@@ -75,7 +79,7 @@ def info_colon_to_dict(value):
 
 
 def info_to_list(value, delimiter=";"):
-    return re.split(delimiter, value)
+    return value.split(delimiter)
 
 
 def info_to_tuple(value, delimiter=":"):
@@ -164,30 +168,116 @@ def concurrent_map(func, data):
     return result
 
 
+DEFAULT_CACHE_SIZE = 4096
+
+
 class cached(object):
     # Doesn't support lists, dicts and other unhashables
     # Also doesn't support kwargs for reason above.
 
-    def __init__(self, func, ttl=0.5):
+    # all caches, used for invalidation and statistics
+    instances = []
+
+    def __init__(self, func, ttl=0.5, ttl_policy=None,
+                 max_size=DEFAULT_CACHE_SIZE):
+        """
+        ttl -- seconds to keep a value
+        ttl_policy -- optional function taking call arguments and returning
+                      ttl for them. None means keep value till it gets
+                      evicted or invalidated, 0 means do not cache.
+        max_size -- max entries, least recently used entries are evicted
+        """
         self.func = func
         self.ttl = ttl
-        self.cache = {}
+        self.ttl_policy = ttl_policy
+        self.max_size = max_size
+        self.cache = collections.OrderedDict()
+        self.lock = threading.Lock()
+        # id(first argument) -> [hits, misses], first argument of a cached
+        # method is its instance
+        self.owner_stats = {}
+        self.evictions = 0
+        cached.instances.append(self)
+
+    def _get_ttl(self, key):
+        if self.ttl_policy:
+            return self.ttl_policy(key)
+        return self.ttl
+
+    def _count(self, key, hit):
+        owner = id(key[0]) if key else None
+        if owner not in self.owner_stats:
+            self.owner_stats[owner] = [0, 0]
+        self.owner_stats[owner][0 if hit else 1] += 1
 
     def __setitem__(self, key, value):
-        self.cache[key] = (value, time() + self.ttl)
+        ttl = self._get_ttl(key)
+        if ttl == 0:
+            return
+        eol = None if ttl is None else time() + ttl
+        with self.lock:
+            self.cache.pop(key, None)
+            self.cache[key] = (value, eol)
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+                self.evictions += 1
 
     def __getitem__(self, key):
-        if key in self.cache:
-            value, eol = self.cache[key]
-            if eol > time():
-                return value
-
-        self[key] = self.func(*key)
-        return self.cache[key][0]
+        with self.lock:
+            if key in self.cache:
+                value, eol = self.cache.pop(key)
+                if eol is None or eol > time():
+                    # reinsert to mark as most recently used
+                    self.cache[key] = (value, eol)
+                    self._count(key, hit=True)
+                    return value
+            self._count(key, hit=False)
+
+        value = self.func(*key)
+        self[key] = value
+        return value
 
     def __call__(self, *args):
         return self[args]
 
+    def invalidate(self, predicate=None):
+        """
+        Remove entries whose arguments match predicate, or all entries.
+        """
+        with self.lock:
+            if predicate is None:
+                self.cache.clear()
+                return
+            for key in self.cache.keys():
+                if predicate(key):
+                    del self.cache[key]
+
+    def get_stats(self, owner=None):
+        with self.lock:
+            if owner is None:
+                hits = sum(s[0] for s in self.owner_stats.itervalues())
+                misses = sum(s[1] for s in self.owner_stats.itervalues())
+                entries = len(self.cache)
+            else:
+                hits, misses = self.owner_stats.get(id(owner), [0, 0])
+                entries = len([k for k in self.cache if k and k[0] is owner])
+            return {'hits': hits, 'misses': misses, 'entries': entries,
+                    'evictions': self.evictions, 'max_size': self.max_size}
+
+    @staticmethod
+    def invalidate_all(predicate=None):
+        for cache in cached.instances:
+            cache.invalidate(predicate)
+
+
+def cached_with_policy(ttl_policy, max_size=DEFAULT_CACHE_SIZE):
+    """
+    Decorator version of cached with a per call ttl policy.
+    """
+    def decorator(func):
+        return cached(func, ttl_policy=ttl_policy, max_size=max_size)
+    return decorator
+
 
 def flatten(list1):
     f_list = []
@@ -240,3 +330,59 @@ def shell_command(command):
         return '', 'error'
     else:
         return out, err
+
+
+def _read_proc_ipv4_addresses(path="/proc/net/fib_trie"):
+    addresses = set()
+    address = None
+    with open(path) as f:
+        for line in f:
+            tokens = line.split()
+            if len(tokens) == 2 and tokens[0] == "|--":
+                address = tokens[1]
+            elif address and tokens[:3] == ["/32", "host", "LOCAL"]:
+                addresses.add(address)
+    return addresses
+
+
+def _read_proc_ipv6_addresses(path="/proc/net/if_inet6"):
+    addresses = set()
+    with open(path) as f:
+        for line in f:
+            tokens = line.split()
+            if tokens and len(tokens[0]) == 32:
+                addresses.add(socket.inet_ntop(socket.AF_INET6,
+                                               binascii.unhexlify(tokens[0])))
+    return addresses
+
+
+_local_addresses = None
+_local_addresses_lock = threading.Lock()
+
+
+def get_local_addresses():
+    """
+    Addresses of local network interfaces, read from kernel once per process.
+    Falls back to 'hostname -I' where /proc/net is not available.
+
+    Returns:
+    frozenset -- set of ip address strings
+    """
+    global _local_addresses
+    with _local_addresses_lock:
+        if _local_addresses is not None:
+            return _local_addresses
+
+        addresses = set()
+        for reader in (_read_proc_ipv4_addresses, _read_proc_ipv6_addresses):
+            try:
+                addresses.update(reader())
+            except Exception:
+                pass
+
+        if not addresses:
+            o, e = shell_command(["hostname -I"])
+            addresses.update(o.split())
+
+        _local_addresses = frozenset(addresses)
+        return _local_addresses
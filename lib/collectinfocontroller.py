@@ -684,6 +684,7 @@ class HealthCheckController(CollectinfoCommandController):
         '                      This parameter works if Query file path provided, otherwise health command will work in interactive mode.',
         '    -v              - Enable to display extra details of assert errors.',
         '    -d              - Enable to display extra details of exceptions.',
+        '    -p, --profile   - Enable to display time, values read and cache hits of slowest queries and per category.',
         '    -oc <string>    - Output filter Category. ',
         '                      This parameter works if Query file path provided, otherwise health command will work in interactive mode.',
         '                      Format : string of dot (.) separated category levels',
@@ -702,6 +703,12 @@ class HealthCheckController(CollectinfoCommandController):
         debug = util.check_arg_and_delete_from_mods(line=line, arg="-d",
                                                     default=False, modifiers=self.modifiers, mods=self.mods)
 
+        profile = util.check_arg_and_delete_from_mods(line=line, arg="-p",
+                                                      default=False, modifiers=self.modifiers, mods=self.mods)
+
+        profile = util.check_arg_and_delete_from_mods(line=line, arg="--profile",
+                                                      default=False, modifiers=self.modifiers, mods=self.mods) or profile
+
         output_filter_category = util.get_arg_and_delete_from_mods(line=line,
                                                                    arg="-oc", return_type=str, default=None,
                                                                    modifiers=self.modifiers, mods=self.mods)
@@ -826,7 +833,8 @@ class HealthCheckController(CollectinfoCommandController):
             self.health_checker.set_health_input_data(health_input)
             HealthCheckController.health_check_input_created = True
 
-        health_summary = self.health_checker.execute(query_file=query_file)
+        health_summary = self.health_checker.execute(query_file=query_file,
+                                                     profile=profile)
 
         if health_summary:
             try:
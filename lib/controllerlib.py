@@ -15,8 +15,8 @@
 import inspect
 import re
 import logging
+import threading
 
-from lib.health.healthchecker import HealthChecker
 from lib.utils import util
 from lib.utils.prefixdict import PrefixDict
 from lib.view import view, terminal
@@ -72,20 +72,29 @@ class ShellException(Exception):
 
 class BaseController(object):
     view = None
-    health_checker = None
+    _health_checker = None
+    _health_checker_lock = threading.Lock()
     asadm_version = ''
     logger = None
 
     def __init__(self, asadm_version=''):
-        # Create static instances of view / health_checker / asadm_version /
-        # logger
+        # Create static instances of view / asadm_version / logger
         BaseController.view = view.CliView()
-        BaseController.health_checker = HealthChecker()
         BaseController.asadm_version = asadm_version
         BaseController.logger = logging.getLogger("asadm")
         # instance vars
         self.modifiers = set()
 
+    @property
+    def health_checker(self):
+        # Static instance, created on first use as building health parser
+        # is costly and most commands do not need it
+        with BaseController._health_checker_lock:
+            if BaseController._health_checker is None:
+                from lib.health.healthchecker import HealthChecker
+                BaseController._health_checker = HealthChecker()
+        return BaseController._health_checker
+
     def _init_commands(self):
         command_re = re.compile("^(do_(.*))$")
         commands = map(lambda v:
@@ -19,7 +19,7 @@ from lib.utils import filesize
 
 
 def get_sindex_stats(cluster, nodes='all', for_mods=[]):
-    stats = cluster.info_sindex(nodes=nodes)
+    stats = cluster.info_all_sindex_statistics(nodes=nodes)
 
     sindex_stats = {}
     if stats:
@@ -42,14 +42,10 @@ def get_sindex_stats(cluster, nodes='all', for_mods=[]):
 
                 if sindex_key not in sindex_stats:
                     sindex_stats[sindex_key] = {}
-                sindex_stats[sindex_key] = cluster.info_sindex_statistics(
-                    ns, indexname, nodes=nodes)
-                for node in sindex_stats[sindex_key].keys():
-                    if (not sindex_stats[sindex_key][node]
-                            or isinstance(sindex_stats[sindex_key][node], Exception)):
-                        continue
-                    for key, value in stat.iteritems():
-                        sindex_stats[sindex_key][node][key] = value
+                if isinstance(stat.get('error'), Exception):
+                    sindex_stats[sindex_key][host] = stat['error']
+                else:
+                    sindex_stats[sindex_key][host] = stat
     return sindex_stats
 
 class GetDistributionController():
@@ -406,11 +402,17 @@ class GetStatisticsController():
             namespace_set.update(namespace)
         namespace_list = util.filter_list(list(namespace_set), for_mods)
 
+        # single batched request per node, regrouped by namespace
+        all_ns_stats = self.cluster.info_all_namespace_statistics(nodes=nodes)
+
         ns_stats = {}
         for namespace in namespace_list:
-            ns_stats[namespace] = util.Future(
-                self.cluster.info_namespace_statistics, namespace,
-                nodes=nodes).start().result()
+            ns_stats[namespace] = {}
+            for node, stats in all_ns_stats.iteritems():
+                if isinstance(stats, Exception):
+                    ns_stats[namespace][node] = stats
+                elif namespace in stats:
+                    ns_stats[namespace][node] = stats[namespace]
 
         return ns_stats
 
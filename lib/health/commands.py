@@ -56,11 +56,13 @@ assert_op_list = {
 
 
 def do_operation(op=None, arg1=None, arg2=None, group_by=None,
-                 result_comp_op=None, result_comp_val=None, on_common_only=False):
+                 result_comp_op=None, result_comp_val=None, on_common_only=False,
+                 group_by_fn=None):
 
     if op in op_list:
         return op_list[op](arg1, arg2, group_by, result_comp_op,
-                           result_comp_val, on_common_only=on_common_only)
+                           result_comp_val, on_common_only=on_common_only,
+                           group_by_fn=group_by_fn)
 
     if op == "%%" and (isinstance(arg1, int) or isinstance(arg1, float)):
         return op_list["*"](arg2, float(arg1) / 100, group_by,
@@ -69,15 +71,13 @@ def do_operation(op=None, arg1=None, arg2=None, group_by=None,
     return None
 
 
-def select_keys(data={}, select_keys=[], select_from_keys=[]):
-    if not data or not isinstance(data, dict):
-        raise HealthException("Wrong Input Data for select operation.")
-
-    if not select_keys:
-        raise HealthException("No key provided for select operation.")
-
-    if not select_from_keys:
-        select_from_keys = []
+def resolve_select_from_keys(data, select_from_keys):
+    """
+    Returns:
+    list -- from keys starting with snapshot key in format of input data
+            (latest snapshot if not given) or ALL
+    """
+    select_from_keys = list(select_from_keys) if select_from_keys else []
 
     if (not select_from_keys or (select_from_keys[0] != "ALL"
                                  and not select_from_keys[0].startswith(SNAPSHOT_KEY_PREFIX))):
@@ -85,8 +85,23 @@ def select_keys(data={}, select_keys=[], select_from_keys=[]):
     elif select_from_keys[0].startswith(SNAPSHOT_KEY_PREFIX):
         select_from_keys[0] = create_snapshot_key(int(re.search(SNAPSHOT_KEY_PATTERN, select_from_keys[0]).group(1)))
 
-    result = fetch_keys_from_dict(data=data, keys=select_keys,
-                                  from_keys=select_from_keys)
+    return select_from_keys
+
+
+def select_keys(data={}, select_keys=[], select_from_keys=[], index=None):
+    if not data or not isinstance(data, dict):
+        raise HealthException("Wrong Input Data for select operation.")
+
+    if not select_keys:
+        raise HealthException("No key provided for select operation.")
+
+    select_from_keys = resolve_select_from_keys(data, select_from_keys)
+
+    if index is not None and (False, "*", None) not in select_keys:
+        result = index.select(keys=select_keys, from_keys=select_from_keys)
+    else:
+        result = fetch_keys_from_dict(data=data, keys=select_keys,
+                                      from_keys=select_from_keys)
 
     if not result:
         raise HealthException(
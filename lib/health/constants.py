@@ -41,6 +41,17 @@ class HealthResultType(object):
     EXCEPTIONS_OTHER = "other"
     STATUS_COUNTERS = "status_counters"
     DEBUG_MESSAGES = "debug_messages"
+    PROFILE = "profile"
+
+
+class QueryProfileKey(object):
+    INDEX = "index"
+    QUERY = "query"
+    CATEGORY = "category"
+    PARSE_TIME = "parse_time"
+    EVAL_TIME = "eval_time"
+    ROWS = "rows"
+    CACHE_HITS = "cache_hits"
 
 
 class HealthResultCounter(object):
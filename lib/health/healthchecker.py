@@ -14,18 +14,26 @@
 
 import copy
 from distutils.version import LooseVersion
+import hashlib
 import re
 import logging
+import time
 
 from lib.view import terminal
-from lib.health.constants import ParserResultType, HealthResultType, HealthResultCounter, AssertResultKey
+from lib.health.constants import ParserResultType, HealthResultType, HealthResultCounter, AssertResultKey, QueryProfileKey
 from lib.health.exceptions import SyntaxException, HealthException
 from lib.health.parser import HealthParser
+from lib.health.planner import QueryPlan
+from lib.health.util import copy_dicts
 from lib.health.query import QUERIES
 from lib.utils.util import parse_queries
 
 VERSION_CONSTRAINT_PATTERN = "SET CONSTRAINT VERSION(.+)"
 
+# Number of query sources (inbuilt queries and query files) for which
+# compiled queries are kept
+MAX_COMPILED_SOURCES = 16
+
 
 class HealthChecker(object):
 
@@ -41,6 +49,12 @@ class HealthChecker(object):
         self.no_valid_version = False
         self.logger = logging.getLogger('asadm')
         self.filtered_data_set_to_parser = False
+        # version constraint -> health input data filtered for it
+        self.filtered_health_input_data = {}
+        # sha1 of query source content -> compiled queries
+        self.compiled_queries = {}
+        self.profile = False
+        self.query_profiles = []
 
     def _reset_counters(self):
         self.status_counters = {}
@@ -60,6 +74,7 @@ class HealthChecker(object):
         self.syntax_exceptions = []
         self.other_exceptions = []
         self.debug_outputs = []
+        self.query_profiles = []
 
     def _increment_counter(self, counter):
         if counter and counter in self.status_counters:
@@ -84,6 +99,9 @@ class HealthChecker(object):
             raise ValueError(
                 terminal.fg_red() + "Wrong Input Data for HealthChecker" + terminal.fg_clear())
 
+        self.filtered_health_input_data = {}
+        if self.health_parser:
+            self.health_parser.clear_health_input_cache()
         self._set_parser_input(data)
 
     def _create_health_result_dict(self):
@@ -102,6 +120,8 @@ class HealthChecker(object):
         res[HealthResultType.ASSERT] = copy.deepcopy(self.assert_outputs)
         res[HealthResultType.DEBUG_MESSAGES] = copy.deepcopy(
             self.debug_outputs)
+        if self.profile:
+            res[HealthResultType.PROFILE] = copy.deepcopy(self.query_profiles)
         return res
 
     def _is_assert_query(self, query):
@@ -247,7 +267,8 @@ class HealthChecker(object):
                     data.pop(_key)
 
     def _filter_health_input_data(self):
-        data = copy.deepcopy(self.health_input_data)
+        # only dicts get modified by node removal, values can be shared
+        data = copy_dicts(self.health_input_data)
         for sn in data.keys():
             # SNAPSHOT level
             remove_nodes = self._filter_nodes_to_remove(data[sn])
@@ -269,7 +290,12 @@ class HealthChecker(object):
             self._set_parser_input(self.health_input_data)
             self.filtered_data_set_to_parser = False
         else:
-            d = self._filter_health_input_data()
+            # same filtered data for constraint in every run, so parser
+            # finds its index and results again
+            v_str = re.search(VERSION_CONSTRAINT_PATTERN, line).group(1).strip()
+            if v_str not in self.filtered_health_input_data:
+                self.filtered_health_input_data[v_str] = self._filter_health_input_data()
+            d = self.filtered_health_input_data[v_str]
             if not d:
                 self.no_valid_version = True
             else:
@@ -277,8 +303,88 @@ class HealthChecker(object):
             self._set_parser_input(d)
             self.filtered_data_set_to_parser = True
 
-    def _execute_query(self, query):
-        return self.health_parser.parse(query)
+    def _read_query_source(self, query_source, is_source_file):
+        if not is_source_file:
+            return query_source
+        try:
+            with open(query_source, 'r') as f:
+                return f.read()
+        except Exception:
+            return None
+
+    def _get_compiled_queries(self, query_source, is_source_file=True):
+        """
+        Parse queries of source once, later calls for same source content
+        get cached result.
+
+        Returns:
+        list -- (query, compiled query, parse time) tuples. Compiled query
+                is None for queries handled by HealthChecker itself (version
+                constraint and exit) and exception for queries which failed
+                to compile.
+        """
+        content = self._read_query_source(query_source, is_source_file)
+        if not content:
+            return []
+
+        key = hashlib.sha1(content).hexdigest()
+        if key in self.compiled_queries:
+            return self.compiled_queries[key]
+
+        compiled_queries = []
+        for query in parse_queries(content, is_file=False):
+            if not query:
+                continue
+
+            if query.lower() == "exit" or self._is_version_set_query(query):
+                compiled_queries.append((query, None, 0))
+                continue
+
+            start_time = time.time()
+            try:
+                compiled_query = self.health_parser.compile(query)
+            except Exception as e:
+                compiled_query = e
+            compiled_queries.append((query, compiled_query,
+                                     time.time() - start_time))
+
+        if len(self.compiled_queries) >= MAX_COMPILED_SOURCES:
+            self.compiled_queries.clear()
+        self.compiled_queries[key] = compiled_queries
+        return compiled_queries
+
+    def _execute_query(self, compiled_query):
+        if isinstance(compiled_query, Exception):
+            raise compiled_query
+        return compiled_query()
+
+    def _get_rule_categories(self, queries):
+        """
+        Returns:
+        list -- category of rule for each query, that is category of first
+                ASSERT at or after query
+        """
+        categories = []
+        category = None
+        for query, compiled_query, _ in reversed(queries):
+            if getattr(compiled_query, "category", None):
+                category = compiled_query.category.upper()
+            categories.append(category)
+        categories.reverse()
+        return categories
+
+    def _add_query_profile(self, query, category, parse_time, eval_time,
+                           stats_before):
+        stats = self.health_parser.subexpression_stats
+        self.query_profiles.append({
+            QueryProfileKey.INDEX: self.status_counters[HealthResultCounter.QUERY_COUNTER],
+            QueryProfileKey.QUERY: query,
+            QueryProfileKey.CATEGORY: category,
+            QueryProfileKey.PARSE_TIME: parse_time,
+            QueryProfileKey.EVAL_TIME: eval_time,
+            QueryProfileKey.ROWS: stats["rows"] - stats_before["rows"],
+            QueryProfileKey.CACHE_HITS: stats["hits"] - stats_before["hits"],
+        })
 
     def _add_assert_output(self, assert_out):
         if not assert_out:
@@ -309,15 +415,17 @@ class HealthChecker(object):
             self.logger.error("Query input source is not valid")
             return False
 
-        queries = parse_queries(query_source, is_file=is_source_file)
+        queries = self._get_compiled_queries(query_source,
+                                             is_source_file=is_source_file)
         if not queries:
             self.logger.error("Wrong Health query source.")
             return False
 
+        if self.profile:
+            categories = self._get_rule_categories(queries)
+
         try:
-            for query in queries:
-                if not query:
-                    continue
+            for i, (query, compiled_query, parse_time) in enumerate(queries):
 
                 self._increment_counter(HealthResultCounter.QUERY_COUNTER)
 
@@ -343,8 +451,12 @@ class HealthChecker(object):
                     self._increment_counter(
                         HealthResultCounter.ASSERT_QUERY_COUNTER)
 
+                if self.profile:
+                    stats_before = dict(self.health_parser.subexpression_stats)
+                    start_time = time.time()
+
                 try:
-                    result = self._execute_query(query)
+                    result = self._execute_query(compiled_query)
                     self._increment_counter(
                         HealthResultCounter.QUERY_SUCCESS_COUNTER)
                 except SyntaxException as se:
@@ -363,6 +475,11 @@ class HealthChecker(object):
                     self.other_exceptions.append({"index": self.status_counters[
                                                  HealthResultCounter.QUERY_COUNTER], "query": query, "error": str(oe)})
 
+                if self.profile:
+                    self._add_query_profile(query, categories[i], parse_time,
+                                            time.time() - start_time,
+                                            stats_before)
+
                 if result:
                     try:
                         if isinstance(result, tuple):
@@ -383,8 +500,44 @@ class HealthChecker(object):
 
         return True
 
-    def execute(self, query_file=None):
+    def create_query_plan(self, query_file=None):
+        """
+        Returns:
+        QueryPlan -- health input needed by queries of query_file, or by
+                     inbuilt queries if query_file is not provided
+        """
+        try:
+            lexer = self.health_parser.lexer
+        except Exception:
+            lexer = None
+
+        plan = QueryPlan(lexer)
+        # version metadata is single info call and is needed by version
+        # constraints, always collect it
+        plan.add_path(["METADATA", "CLUSTER"])
+
+        if query_file is None:
+            queries = parse_queries(QUERIES, is_file=False)
+        else:
+            queries = parse_queries(query_file, is_file=True)
+
+        for query in queries:
+            if not query:
+                continue
+
+            if query.lower() == "exit":
+                break
+
+            if self._is_version_set_query(query):
+                continue
+
+            plan.add_query(query)
+
+        return plan
+
+    def execute(self, query_file=None, profile=False):
         health_summary = None
+        self.profile = profile
         try:
             if query_file is None:
                 if not self._execute_queries(query_source=QUERIES, is_source_file=False):
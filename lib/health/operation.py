@@ -20,9 +20,24 @@ from lib.health.constants import AssertResultKey, ParserResultType
 from lib.health.exceptions import HealthException
 from lib.health.util import deep_merge_dicts, get_kv, merge_key, make_map, make_key
 
+try:
+    import numpy
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 RESULT_TUPLE_HEADER = "RESULT"
 NOKEY = ""
 
+# Vectors shorter than this are evaluated in python, numpy call overhead
+# is more than gain for them
+NUMPY_MIN_VECTOR_SIZE = 32
+# Largest vector for which DIFF builds n x n matrix of differences
+NUMPY_MAX_PAIRWISE_SIZE = 2048
+INT64_MAX = 2 ** 63 - 1
+# integers up to this are exact in float64
+FLOAT64_EXACT_INT_MAX = 2 ** 53
+
 operators = {
     "+": operator.add,
     "-": operator.sub,
@@ -43,6 +58,63 @@ operators = {
 }
 
 
+NUMBER_TYPES = set([int, long, float])
+
+
+def _is_number(value):
+    return type(value) in NUMBER_TYPES
+
+
+def numeric_column(kv, int_only=False):
+    """
+    Passed Vector values
+
+    [ {(name, tag) : value}, {(name, tag) : value} ...
+
+    Return list of names and numpy array of values if numpy is available,
+    vector is long enough and all values are numbers which numpy can hold
+    and sum exactly, otherwise None
+    """
+
+    if (not HAS_NUMPY or not isinstance(kv, list)
+            or len(kv) < NUMPY_MIN_VECTOR_SIZE):
+        return None
+
+    try:
+        # vector items are single key dicts
+        items = [i.items()[0] for i in kv]
+    except Exception:
+        return None
+
+    values = [v for _, v in items]
+    value_types = set(map(type, values))
+    if not value_types <= NUMBER_TYPES:
+        return None
+
+    keys = [k[0] for k, _ in items]
+
+    if float in value_types:
+        if int_only:
+            return None
+        if value_types != set([float]):
+            ints = [v for v in values if type(v) is not float]
+            if max(max(ints), -min(ints)) > FLOAT64_EXACT_INT_MAX:
+                return None
+        return keys, numpy.array(values, dtype=numpy.float64)
+
+    if max(max(values), -min(values)) * len(values) > INT64_MAX:
+        return None
+    return keys, numpy.array(values, dtype=numpy.int64)
+
+
+# numpy array reductions matching vector operation of same operator
+numpy_reductions = {
+    operator.add: "sum",
+    max: "max",
+    min: "min",
+}
+
+
 def basic_vector_to_scalar_operation(op, kv, typecast=int, initial_value=None):
     """
     Passed Vector values and type of value
@@ -55,6 +127,12 @@ def basic_vector_to_scalar_operation(op, kv, typecast=int, initial_value=None):
     if not op or not kv or not isinstance(kv, list):
         raise HealthException("Insufficient input for vector operation ")
 
+    if typecast == int and not initial_value and op in numpy_reductions:
+        column = numeric_column(kv, int_only=True)
+        if column is not None:
+            values = column[1]
+            return getattr(values, numpy_reductions[op])().item(), len(values)
+
     if initial_value:
         found_first = True
         res = initial_value
@@ -139,6 +217,26 @@ def vector_to_vector_diff_operation(kv, op, a):
     if not kv or not a:
         raise HealthException("Insufficient input for Diff operation ")
 
+    column = numeric_column(kv) if _is_number(a) else None
+    if column is not None:
+        keys, values = column
+        if op in (operator.gt, operator.ge):
+            # largest difference of a value is from min or max value
+            flags = op(numpy.maximum(values - values.min(),
+                                     values.max() - values), a)
+        elif len(values) <= NUMPY_MAX_PAIRWISE_SIZE:
+            flags = op(numpy.abs(values[:, None] - values[None, :]), a)
+            numpy.fill_diagonal(flags, False)
+            flags = flags.any(axis=1)
+        else:
+            flags = None
+
+        if flags is not None:
+            for k, flag in zip(keys, flags.tolist()):
+                k = make_key(k)
+                res[k] = res.get(k, False) | flag
+            return res
+
     exception_found = False
     try:
         for x, y in itertools.combinations(kv, 2):
@@ -190,6 +288,18 @@ def vector_to_vector_sd_anomaly_operation(kv, op, a):
     if not kv or not a:
         raise HealthException("Insufficient input for SD_ANOMALY operation ")
 
+    column = numeric_column(kv) if _is_number(a) else None
+    if column is not None:
+        keys, values = column
+        n = len(values)
+        mean = float(values.sum()) / float(n)
+        sd = sqrt(float(((values - mean) ** 2).sum()) / float(n))
+        in_range = ((values >= mean - (a * sd))
+                    & (values <= mean + (a * sd)))
+        for k, flag in zip(keys, in_range.tolist()):
+            res[make_key(k)] = not flag
+        return res
+
     exception_found = False
     try:
         n = len(kv)
@@ -304,7 +414,7 @@ class SimpleOperation():
             return self._operate_each_key(arg1, arg2)
 
     def operate(self, arg1, arg2, group_by=None, result_comp_op=None,
-            result_comp_val=None, on_common_only=False):
+            result_comp_val=None, on_common_only=False, group_by_fn=None):
         if arg1 is None or arg2 is None:
             raise HealthException("Wrong operands for Simple operation.")
 
@@ -332,12 +442,12 @@ class AggOperation():
         self.op_fn = AggOperation.operator_and_function[op]
 
     def operate(self, arg1, arg2=None, group_by=None, result_comp_op=None,
-            result_comp_val=None, on_common_only=False):
+            result_comp_val=None, on_common_only=False, group_by_fn=None):
         if not arg1:
             raise HealthException("Wrong operand for Aggregation operation.")
 
         if group_by:
-            arg1 = do_multiple_group_by(arg1, group_by)
+            arg1 = (group_by_fn or do_multiple_group_by)(arg1, group_by)
 
         if not arg1:
             # if not valid group_by ids, we will get empty arg1
@@ -360,13 +470,13 @@ class ComplexOperation():
     def __init__(self, op):
         self.op_fn = ComplexOperation.operator_and_function[op]
 
-    def operate(self, arg1, arg2=None, group_by=None, result_comp_op=None, result_comp_val=None, on_common_only=False):
+    def operate(self, arg1, arg2=None, group_by=None, result_comp_op=None, result_comp_val=None, on_common_only=False, group_by_fn=None):
         if not arg1:
             # if empty opearand
             raise HealthException("Wrong operand for Complex operation.")
 
         if group_by:
-            arg1 = do_multiple_group_by(arg1, group_by)
+            arg1 = (group_by_fn or do_multiple_group_by)(arg1, group_by)
 
         if not arg1:
             # if not valid group_by ids, we will get empty arg1
@@ -12,14 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import copy
+import os
 import re
 
-from lib.health.commands import select_keys, do_assert, do_operation, do_assert_if_check
+from lib.health.commands import select_keys, do_assert, do_operation, do_assert_if_check, resolve_select_from_keys
 from lib.health.constants import AssertLevel
 from lib.health.exceptions import SyntaxException
 from lib.health.operation import do_multiple_group_by
-from lib.health.util import h_eval, create_snapshot_key
+from lib.health.util import h_eval, create_snapshot_key, HealthInputIndex, count_leaves
 
 try:
     from ply import lex, yacc
@@ -28,6 +28,106 @@ except Exception:
 
 HealthVars = {}
 
+# Generated LALR tables, kept next to this file and prebuilt by make for the
+# packaged asadm. PLY regenerates them only if grammar changes, and falls
+# back to in-memory tables if directory is not writable.
+PARSE_TABLE_MODULE = "lib.health.parsetab"
+PARSE_TABLE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _get_var(name):
+    # Operations build new results and do not modify their operands, so
+    # variable value is shared and not copied
+    if name not in HealthVars:
+        raise SyntaxException("Syntax error : Unknown variable " + str(name))
+    return HealthVars[name]
+
+
+def _const(value):
+    return lambda: value
+
+
+def _snapshot_keys(snapshot_vars):
+    keys = []
+    for name in snapshot_vars:
+        value = _get_var(name)
+        if not isinstance(value, str) or not re.match(
+                HealthLexer.SNAPSHOT_KEY_PATTERN, value):
+            raise SyntaxException("Wrong snapshot component " + str(value))
+        keys.append(value)
+    return keys
+
+
+def _normalize_select_keys(keys):
+    if any(new_name for _, _, new_name in keys):
+        # stat gets name of first select key which matches it
+        return tuple(keys)
+    return frozenset(keys)
+
+
+class SubexpressionCache(object):
+
+    """
+    Index and results of SELECT and GROUP BY subexpressions for one health
+    input data. Many queries repeat same select or group same variable, and
+    results are not modified by operations, so they are shared like
+    variable values.
+    """
+
+    def __init__(self, data, stats=None):
+        self.data = data
+        self.index = None
+        self.results = {}
+        # counters for profiling, can be shared by caches of a parser
+        self.stats = stats if stats is not None else {"hits": 0, "rows": 0}
+
+    def _add_result(self, key, result):
+        self.results[key] = result
+        if not isinstance(result, Exception):
+            self.stats["rows"] += count_leaves(result)
+
+    def _get_index(self):
+        if self.index is None and self.data:
+            self.index = HealthInputIndex(self.data)
+        return self.index
+
+    def select(self, keys, from_keys):
+        if not self.data or not isinstance(self.data, dict):
+            return select_keys(data=self.data, select_keys=keys,
+                               select_from_keys=from_keys)
+
+        key = ("SELECT", _normalize_select_keys(keys),
+               tuple(resolve_select_from_keys(self.data, from_keys)))
+        if key in self.results:
+            self.stats["hits"] += 1
+        else:
+            try:
+                self._add_result(key, select_keys(data=self.data,
+                                                  select_keys=keys,
+                                                  select_from_keys=from_keys,
+                                                  index=self._get_index()))
+            except Exception as e:
+                self._add_result(key, e)
+
+        if isinstance(self.results[key], Exception):
+            raise self.results[key]
+        return self.results[key]
+
+    def group_by(self, data, group_by):
+        # operand is kept with result, so its id can not get reused by other
+        # value while entry exists
+        key = ("GROUP BY", id(data), tuple(group_by))
+        if key in self.results and self.results[key][0] is data:
+            self.stats["hits"] += 1
+        else:
+            result = do_multiple_group_by(data, group_by)
+            self.results[key] = (data, result)
+            self.stats["rows"] += count_leaves(result)
+        return self.results[key][1]
+
+    def clear(self):
+        self.results = {}
+
 
 class HealthLexer(object):
     SNAPSHOT_KEY_PATTERN = r"SNAPSHOT(\d+)$"
@@ -134,7 +234,7 @@ class HealthLexer(object):
     }
 
     tokens = ['NUMBER',     'BOOL_VAL',
-              'VAR',        'NEW_VAR',
+              'VAR',
               'COMPONENT', 'GROUP_ID', 'COMPONENT_AND_GROUP_ID',
               'AGG_OP', 'COMPLEX_OP', 'ASSERT_OP', 'ASSERT_LEVEL',
               'STRING',
@@ -158,8 +258,8 @@ class HealthLexer(object):
     def t_VAR(self, t):
         r'[a-zA-Z_][a-zA-Z_0-9]*'
         # Check for reserved words
-        t.type = HealthLexer.reserved.get(t.value.lower(), 'NEW_VAR')
-        if not t.type == "NEW_VAR":
+        t.type = HealthLexer.reserved.get(t.value.lower(), 'VAR')
+        if not t.type == "VAR":
             return t
         elif t.value.lower() in HealthLexer.bool_vals.keys():
             t.type = "BOOL_VAL"
@@ -183,9 +283,6 @@ class HealthLexer(object):
         elif t.value in HealthLexer.assert_levels.keys():
             t.value = HealthLexer.assert_levels[t.value]
             t.type = "ASSERT_LEVEL"
-        elif t.value in HealthVars:
-            t.type = "VAR"
-            t.value = (t.value, copy.deepcopy(HealthVars[t.value]))
         return t
 
     def t_STRING(self, t):
@@ -233,8 +330,14 @@ class HealthLexer(object):
 
 class HealthParser(object):
 
+    """
+    Compiles health queries. Grammar actions do not touch data, they build
+    functions which evaluate query against current health input data and
+    variables when called. So query is parsed only once and can be run
+    again on new data.
+    """
+
     tokens = HealthLexer.tokens
-    health_input_data = {}
 
     precedence = (
         ('left', 'ASSIGN'),
@@ -246,26 +349,40 @@ class HealthParser(object):
         ('left', 'PCT')
     )
 
+    def __init__(self):
+        # SELECT and GROUP BY cache hits and values read on misses
+        self.subexpression_stats = {"hits": 0, "rows": 0}
+        self.health_input_data = {}
+        self.health_input_cache = SubexpressionCache(
+            self.health_input_data, self.subexpression_stats)
+        # id of health input data -> its SubexpressionCache
+        self.health_input_caches = {}
+
     def p_statement(self, p):
         """
         statement : VAR opt_assign_statement
-                   | NEW_VAR assign_statement
                    | assert_statement
         """
         if len(p) > 2 and p[2] is not None:
-            if isinstance(p[2], Exception):
-                val = None
-            elif isinstance(p[2], tuple):
-                val = p[2][1]
-            else:
-                val = p[2]
-            if isinstance(p[1], tuple):
-                HealthVars[p[1][0]] = val
-            else:
-                HealthVars[p[1]] = val
-            p[0] = val
-            if isinstance(p[2], Exception):
-                raise p[2]
+            name, cmd = p[1], p[2]
+
+            def statement():
+                res = cmd()
+                if isinstance(res, Exception):
+                    val = None
+                elif isinstance(res, tuple):
+                    val = res[1]
+                else:
+                    val = res
+                HealthVars[name] = val
+                if isinstance(res, Exception):
+                    raise res
+                return val
+
+            p[0] = statement
+        elif len(p) > 2:
+            name = p[1]
+            p[0] = lambda: (name, _get_var(name))
         else:
             p[0] = p[1]
 
@@ -304,10 +421,11 @@ class HealthParser(object):
                    | STRING
                    | BOOL_VAL
         """
-        if isinstance(p[1], tuple):
-            p[0] = p[1][1]
+        if p.slice[1].type == "VAR":
+            name = p[1]
+            p[0] = lambda: _get_var(name)
         else:
-            p[0] = h_eval(p[1])
+            p[0] = _const(h_eval(p[1]))
 
     def p_number(self, p):
         """
@@ -386,10 +504,16 @@ class HealthParser(object):
         """
         group_by_statement : group_by_clause VAR
         """
-        try:
-            p[0] = do_multiple_group_by(p[2][1], p[1])
-        except Exception as e:
-            p[0] = e
+        group_by, name = p[1], p[2]
+
+        def group_by_statement():
+            try:
+                return self.health_input_cache.group_by(_get_var(name),
+                                                        group_by)
+            except Exception as e:
+                return e
+
+        p[0] = group_by_statement
 
     def p_opt_assign_statement(self, p):
         """
@@ -421,11 +545,22 @@ class HealthParser(object):
                         | opt_group_by_clause DO agg_operation
                         | opt_group_by_clause DO complex_operation
         """
-        try:
-            p[0] = do_operation(op=p[3][0], arg1=p[3][1], arg2=p[3][2], group_by=p[
-                                1], result_comp_op=p[3][3], result_comp_val=p[3][4], on_common_only=p[3][5])
-        except Exception as e:
-            p[0] = e
+        group_by = p[1]
+        op, arg1, arg2, result_comp_op, result_comp_val, on_common_only = p[3]
+
+        def op_statement():
+            try:
+                return do_operation(op=op, arg1=arg1(),
+                                    arg2=arg2() if arg2 else None,
+                                    group_by=group_by,
+                                    result_comp_op=result_comp_op,
+                                    result_comp_val=result_comp_val() if result_comp_val else None,
+                                    on_common_only=on_common_only,
+                                    group_by_fn=self.health_input_cache.group_by)
+            except Exception as e:
+                return e
+
+        p[0] = op_statement
 
     def p_assert_statement(self, p):
         """
@@ -434,22 +569,21 @@ class HealthParser(object):
                              | ASSERT_OP LPAREN assert_arg COMMA assert_comparison_arg COMMA error_string COMMA assert_category COMMA ASSERT_LEVEL COMMA assert_desc_string RPAREN
                              | ASSERT_OP LPAREN assert_arg COMMA assert_comparison_arg COMMA error_string COMMA assert_category COMMA ASSERT_LEVEL RPAREN
         """
-        if len(p) < 14:
-            p[0] = do_assert(
-                op=p[1], data=p[3], check_val=p[5], error=p[7], category=p[9], level=p[11])
-        elif len(p) < 16:
-            p[0] = do_assert(
-                op=p[1], data=p[3], check_val=p[5], error=p[7], category=p[9], level=p[11], description=p[13])
-        elif len(p) < 18:
-            p[0] = do_assert(
-                op=p[1], data=p[3], check_val=p[5], error=p[7], category=p[9], level=p[11], description=p[13], success_msg=p[15])
-        else:
-            skip_assert, assert_filter_arg = p[17]
-            if skip_assert:
-                p[0] = None
-            else:
+        op, arg, check_val, error, category, level = p[1], p[3], p[5], p[7], p[9], p[11]
+        description = p[13] if len(p) > 14 else None
+        success_msg = p[15] if len(p) > 16 else None
+        if_condition = p[17] if len(p) > 18 else None
+
+        def assert_statement():
+            data = arg()
+
+            if if_condition:
+                skip_assert, assert_filter_arg = if_condition()
+                if skip_assert:
+                    return None
+
                 if assert_filter_arg is not None:
-                    data = do_operation(op="==", arg1=p[3], arg2=p[5])
+                    data = do_operation(op="==", arg1=data, arg2=check_val)
                     try:
                         # If key filtration throws exception (due to non-matching), it just passes that and executes main assert
                         new_data = do_operation(op="||", arg1=data, arg2=assert_filter_arg, on_common_only=True)
@@ -458,18 +592,23 @@ class HealthParser(object):
                     except Exception:
                         pass
 
-                    p[0] = do_assert(
-                        op=p[1], data=data, check_val=True, error=p[7], category=p[9], level=p[11], description=p[13], success_msg=p[15])
-                else:
-                    p[0] = do_assert(
-                        op=p[1], data=p[3], check_val=p[5], error=p[7], category=p[9], level=p[11], description=p[13], success_msg=p[15])
+                    return do_assert(
+                        op=op, data=data, check_val=True, error=error, category=category, level=level, description=description, success_msg=success_msg)
+
+            return do_assert(
+                op=op, data=data, check_val=check_val, error=error, category=category, level=level, description=description, success_msg=success_msg)
+
+        # rule category, for reports which group queries by rule
+        assert_statement.category = category
+        p[0] = assert_statement
 
     def p_assert_if_condition(self, p):
         """
         assert_if_condition : assert_arg opt_assert_if_arg2
         """
-        skip_assert, assert_filter_arg = do_assert_if_check(p[2][0], p[1], p[2][1])
-        p[0] = (skip_assert, assert_filter_arg)
+        arg1 = p[1]
+        op, arg2 = p[2]
+        p[0] = lambda: do_assert_if_check(op, arg1(), arg2() if arg2 else None)
 
     def p_opt_assert_if_arg2(self, p):
         """
@@ -488,10 +627,11 @@ class HealthParser(object):
                       | STRING
                       | BOOL_VAL
         """
-        if isinstance(p[1], tuple):
-            p[0] = p[1][1]
+        if p.slice[1].type == "VAR":
+            name = p[1]
+            p[0] = lambda: _get_var(name)
         else:
-            p[0] = p[1]
+            p[0] = _const(p[1])
 
     def p_assert_comparison_arg(self, p):
         """
@@ -534,11 +674,18 @@ class HealthParser(object):
                           | operand
         """
         if len(p) > 2:
-            try:
-                p[0] = select_keys(
-                    data=self.health_input_data, select_keys=p[2], select_from_keys=p[3])
-            except Exception as e:
-                p[0] = e
+            keys = p[2]
+            snapshot_vars, from_keys = p[3] if p[3] else ([], [])
+
+            def select_statement():
+                select_from_keys = _snapshot_keys(snapshot_vars) + from_keys
+                try:
+                    return self.health_input_cache.select(keys,
+                                                          select_from_keys)
+                except Exception as e:
+                    return e
+
+            p[0] = select_statement
         else:
             p[0] = p[1]
 
@@ -550,19 +697,18 @@ class HealthParser(object):
         if len(p) == 1:
             p[0] = None
         else:
-            p[0] = p[2] + p[3]
+            p[0] = (p[2], p[3])
 
     def p_opt_snapshot_var(self, p):
         """
         opt_snapshot_var : VAR opt_dot
                          |
         """
+        # variable is checked for snapshot key when query is run
         if len(p) == 1:
             p[0] = []
-        elif re.match(HealthLexer.SNAPSHOT_KEY_PATTERN, p[1][1]):
-            p[0] = [p[1][1]]
         else:
-            raise SyntaxException("Wrong snapshot component " + p[1][1])
+            p[0] = [p[1]]
 
     def p_opt_dot(self, p):
         """
@@ -644,16 +790,45 @@ class HealthParser(object):
 
     def build(self, **kwargs):
         self.parser = yacc.yacc(
-            module=self, debug=False, write_tables=False, errorlog=yacc.NullLogger(), **kwargs)
+            module=self, debug=False, write_tables=True,
+            tabmodule=PARSE_TABLE_MODULE, outputdir=PARSE_TABLE_DIR,
+            errorlog=yacc.NullLogger(), **kwargs)
         self.lexer = HealthLexer().build()
         return self.parser
 
     def set_health_data(self, health_input_data):
+        """
+        Set data for queries. Cache of earlier data is kept, so switching
+        back to it (for ex. after version constraint) finds its index and
+        subexpression results.
+        """
         self.health_input_data = health_input_data
+        cache = self.health_input_caches.get(id(health_input_data))
+        if cache is None or cache.data is not health_input_data:
+            cache = SubexpressionCache(health_input_data,
+                                       self.subexpression_stats)
+            self.health_input_caches[id(health_input_data)] = cache
+        self.health_input_cache = cache
+
+    def clear_health_input_cache(self):
+        # input data replaced, indexes of earlier data are not needed
+        self.health_input_caches = {}
+        self.set_health_data(self.health_input_data)
 
     def clear_health_cache(self):
         global HealthVars
         HealthVars = {}
+        # results are for variables of finished run, indexes stay till
+        # input data changes
+        for cache in self.health_input_caches.itervalues():
+            cache.clear()
 
-    def parse(self, text):
+    def compile(self, text):
+        """
+        Returns:
+        function -- runs query against current health input data
+        """
         return self.parser.parse(text, lexer=self.lexer)
+
+    def parse(self, text):
+        return self.compile(text)()
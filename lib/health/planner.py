@@ -0,0 +1,127 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+
+from lib.health.commands import SNAPSHOT_KEY_PATTERN
+
+# Component keys which system data gets below SYSTEM.<sub component> after
+# restructuring, queries can select from them directly.
+SYSTEM_SUB_COMPONENTS = {
+    ("SYSTEM", "FREE"): ["MEM", "SWAP", "BUFFERS/CACHE"],
+    ("SYSTEM", "TOP"): ["UPTIME", "TASKS", "CPU_UTILIZATION", "RAM", "SWAP",
+                        "ASD_PROCESS", "XDR_PROCESS"],
+    ("SYSTEM", "IOSTAT"): ["AVG-CPU", "DEVICE_STAT"],
+    ("SYSTEM", "INTERRUPTS"): ["DEVICE_INTERRUPTS"],
+}
+
+FROM_KEY_TOKENS = ("COMPONENT", "COMPONENT_AND_GROUP_ID")
+
+
+def _is_subsequence(keys, path):
+    it = iter(path)
+    return all(k in it for k in keys)
+
+
+class QueryPlan(object):
+
+    """
+    Health input needed by a set of queries, found from FROM clauses of
+    their SELECT statements before any data is collected.
+    """
+
+    def __init__(self, lexer=None):
+        self.lexer = lexer
+        # lexer not available or SELECT without FROM, all components needed
+        self.full = lexer is None
+        # component key paths of FROM clauses, without snapshot key
+        self.paths = []
+        # snapshot other than latest one referenced
+        self.all_snapshots = False
+
+    def add_path(self, path):
+        self.paths.append(list(path))
+
+    def _from_keys(self, query):
+        self.lexer.input(query)
+        tokens = list(iter(self.lexer.token, None))
+
+        for i, tok in enumerate(tokens):
+            if tok.type != "SELECT":
+                continue
+
+            from_keys = []
+            j = i + 1
+            while j < len(tokens) and tokens[j].type not in ("FROM",
+                                                             "SELECT"):
+                j += 1
+
+            if j < len(tokens) and tokens[j].type == "FROM":
+                j += 1
+                while (j < len(tokens)
+                       and tokens[j].type not in ("SELECT", "FROM")):
+                    if tokens[j].type in FROM_KEY_TOKENS:
+                        from_keys.append(tokens[j].value)
+                    elif tokens[j].type == "VAR":
+                        # snapshot given through variable
+                        self.all_snapshots = True
+                    j += 1
+
+            yield from_keys
+
+    def add_query(self, query):
+        if self.full and self.all_snapshots:
+            return
+
+        try:
+            from_key_list = list(self._from_keys(query))
+        except Exception:
+            # Query fails in parser with same error, nothing to fetch for it
+            return
+
+        for from_keys in from_key_list:
+            if from_keys and (from_keys[0] == "ALL"
+                              or re.match(SNAPSHOT_KEY_PATTERN, from_keys[0])):
+                self.all_snapshots = True
+                from_keys = from_keys[1:]
+
+            if not from_keys:
+                self.full = True
+            else:
+                self.add_path(from_keys)
+
+    def needs(self, path):
+        """
+        Check whether data stored under component key path (for ex.
+        ["NAMESPACE", "STATISTICS"]) can be selected by any query.
+        """
+        if self.full:
+            return True
+
+        candidates = [list(path)]
+        for sub_component in SYSTEM_SUB_COMPONENTS.get(tuple(path), []):
+            candidates.append(list(path) + [sub_component])
+
+        return any(_is_subsequence(p, c)
+                   for p in self.paths for c in candidates)
+
+    def snapshot_count(self, requested):
+        """
+        Returns:
+        int -- number of snapshots to collect, queries which do not refer
+               any snapshot read latest one only
+        """
+        if self.all_snapshots:
+            return requested
+        return min(1, requested)
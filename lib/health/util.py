@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections import OrderedDict
 import copy
 import re
 
@@ -116,6 +117,142 @@ def fetch_keys_from_dict(data={}, keys=[], from_keys=[]):
     return result_dict
 
 
+def copy_dicts(data):
+    """
+    Function takes nested dictionary
+
+    Returns copy of all nested dictionaries, non-dictionary values are not copied
+    """
+
+    if not isinstance(data, dict):
+        return data
+
+    return dict((_key, copy_dicts(data[_key])) for _key in data)
+
+
+def count_leaves(data):
+    """
+    Function takes nested dictionary
+
+    Returns number of non-dictionary values
+    """
+
+    if not isinstance(data, dict):
+        return 1
+
+    return sum(count_leaves(data[_key]) for _key in data)
+
+
+def _match_from_keys(component_keys, from_keys):
+    i = 0
+    for _key in component_keys:
+        if i == len(from_keys):
+            break
+        if from_keys[i] == "ALL" or _key == from_keys[i]:
+            i += 1
+    return i == len(from_keys)
+
+
+class HealthInputIndex(object):
+
+    """
+    Inverted index of health input from stat name to leaves with that name,
+    built once per input data. SELECT visits matching leaves only instead
+    of walking and copying whole input. Result is same as of
+    fetch_keys_from_dict but values are shared with input data, so it
+    must not be modified in place.
+    """
+
+    def __init__(self, data):
+        # stat name -> [(seq, parent id, component keys, tuple keys, value)]
+        self.leaves = {}
+        # LIKE pattern -> matching stat names
+        self.pattern_names = {}
+        self._seq = 0
+        self._add_leaves(data, (), ())
+
+    def _add_leaves(self, data, component_keys, tuple_keys):
+        for _key in data:
+            if isinstance(_key, tuple):
+                if _key[1] == "KEY":
+                    self.leaves.setdefault(_key[0], []).append(
+                        (self._seq, id(data), component_keys, tuple_keys,
+                         data[_key]))
+                    self._seq += 1
+                elif data[_key] and isinstance(data[_key], dict):
+                    self._add_leaves(data[_key], component_keys,
+                                     tuple_keys + (_key,))
+
+            elif data[_key] and isinstance(data[_key], dict):
+                # from keys can match static component keys only till
+                # first tuple key
+                if tuple_keys:
+                    child_component_keys = component_keys
+                else:
+                    child_component_keys = component_keys + (_key,)
+                self._add_leaves(data[_key], child_component_keys, tuple_keys)
+
+    def _get_names(self, check_substring, s_key):
+        if not check_substring:
+            return [s_key] if s_key in self.leaves else []
+
+        if s_key not in self.pattern_names:
+            self.pattern_names[s_key] = [name for name in self.leaves
+                                         if re.search(s_key, name)]
+        return self.pattern_names[s_key]
+
+    def select(self, keys=[], from_keys=[]):
+        """
+        Function takes list of keys to fetch, list of from_keys to filter scope
+
+        Returns dictionary of selected keys and values
+        """
+
+        if not keys:
+            raise HealthException("No key provided for select operation.")
+
+        # stat name -> result name, as per first select key matching it
+        result_names = {}
+        for check_substring, s_key, new_name in keys:
+            for name in self._get_names(check_substring, s_key):
+                if name not in result_names:
+                    result_names[name] = new_name if new_name else name
+
+        all_snapshots = bool(from_keys) and from_keys[0] == "ALL"
+        matched = {}
+        leaves = []
+        for name, result_name in result_names.iteritems():
+            for leaf in self.leaves[name]:
+                component_keys = leaf[2]
+                if component_keys not in matched:
+                    matched[component_keys] = _match_from_keys(component_keys,
+                                                               from_keys)
+                if matched[component_keys]:
+                    leaves.append((leaf, result_name))
+
+        # Same input order as walk of fetch_keys_from_dict. Within a dict,
+        # later key overwrites earlier one with same result name, across
+        # dicts results are merged with deep_merge_dicts.
+        leaves.sort(key=lambda l: l[0][0])
+        parents = OrderedDict()
+        for (_, parent, component_keys, tuple_keys, value), name in leaves:
+            if parent not in parents:
+                if all_snapshots:
+                    path = ((component_keys[0], "SNAPSHOT"),) + tuple_keys
+                else:
+                    path = tuple_keys
+                parents[parent] = (path, {})
+            parents[parent][1][(name, "KEY")] = value
+
+        result_dict = {}
+        for path, d in parents.itervalues():
+            for _key in reversed(path):
+                d = {_key: d}
+            result_dict = deep_merge_dicts(result_dict, d)
+
+        return result_dict
+
+
 def add_component_keys(data, component_key_list):
     if not component_key_list:
         return data
@@ -0,0 +1,274 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import mmap
+import multiprocessing
+import re
+import signal
+import threading
+
+# byte range scanned by one pool task
+GREP_CHUNK_BYTES = 8 * 1024 * 1024
+# lines are only checked one by one in blocks which may have a match
+PREFILTER_BLOCK_BYTES = 64 * 1024
+REGEX_META_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+# Process pool shared by all server logs, created on first grep.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    # Ctrl-C is handled by the shell process
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def get_pool():
+    """
+    Returns shared process pool, or None if one can not be created. Callers
+    then scan in process.
+    """
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = multiprocessing.Pool(initializer=_init_worker)
+            except Exception:
+                _pool = False
+    return _pool or None
+
+
+def _is_literal(s):
+    return not any(c in REGEX_META_CHARS for c in s)
+
+
+class LineMatcher(object):
+
+    """
+    Precompiled search and ignore terms of a grep. Same semantics as
+    ServerLog always had: case sensitive terms are literals, case insensitive
+    terms are regular expressions.
+
+    If all terms are literals (case insensitive terms without any regex
+    meta character), search terms are combined into one pattern. A block is
+    then scanned once for lines containing any search term, case folded
+    once if needed, and only those lines are classified.
+    """
+
+    def __init__(self, search_strs, ignore_strs=[], is_and=False,
+                 is_casesensitive=True):
+        self.search_strs = list(search_strs or [])
+        self.ignore_strs = list(ignore_strs or [])
+        self.is_and = is_and
+        self.is_casesensitive = is_casesensitive
+        self.fold_case = not is_casesensitive
+        self.scan_re = None
+
+        if self.fold_case and not all(
+                _is_literal(s) for s in self.search_strs + self.ignore_strs):
+            # MULTILINE keeps anchors working on whole blocks, lines have at
+            # most a trailing newline so it makes no difference to them
+            flags = re.IGNORECASE | re.MULTILINE
+            self.literal = False
+            self.search_res = [re.compile(s, flags) for s in self.search_strs]
+            self.ignore_res = [re.compile(s, flags) for s in self.ignore_strs]
+            return
+
+        self.literal = True
+        if self.fold_case:
+            self.search_terms = [s.lower() for s in self.search_strs]
+            self.ignore_terms = [s.lower() for s in self.ignore_strs]
+        else:
+            self.search_terms = self.search_strs
+            self.ignore_terms = self.ignore_strs
+
+        if self.search_terms:
+            if is_and:
+                # lines must have every term, scan for the longest which
+                # is likely the rarest
+                scan_terms = [max(self.search_terms, key=len)]
+            else:
+                scan_terms = set(self.search_terms)
+            # longest first, so a term is not shadowed by its prefix
+            self.scan_re = re.compile("|".join(
+                re.escape(t) for t in sorted(scan_terms, key=len,
+                                             reverse=True)))
+
+    def block_may_match(self, block):
+        if not self.search_strs:
+            return True
+        if self.literal:
+            if self.fold_case:
+                block = block.lower()
+            if self.is_and:
+                return all(t in block for t in self.search_terms)
+            return any(t in block for t in self.search_terms)
+        if self.is_and:
+            return all(r.search(block) for r in self.search_res)
+        return any(r.search(block) for r in self.search_res)
+
+    def _classify(self, line):
+        # line is case folded already, and has at least one search term
+        if self.is_and:
+            if not all(t in line for t in self.search_terms):
+                return False
+        return not any(t in line for t in self.ignore_terms)
+
+    def match(self, line):
+        if self.literal:
+            if self.fold_case:
+                line = line.lower()
+            if self.search_terms:
+                if self.is_and:
+                    if not all(t in line for t in self.search_terms):
+                        return False
+                elif not any(t in line for t in self.search_terms):
+                    return False
+            return not any(t in line for t in self.ignore_terms)
+
+        if self.search_strs:
+            if self.is_and:
+                found = all(r.search(line) for r in self.search_res)
+            else:
+                found = any(r.search(line) for r in self.search_res)
+            if not found:
+                return False
+
+        return not any(r.search(line) for r in self.ignore_res)
+
+    def _scan_block(self, block, lines):
+        text = block.lower() if self.fold_case else block
+        pos = 0
+        while pos < len(text):
+            m = self.scan_re.search(text, pos)
+            if not m:
+                return
+            line_start = text.rfind("\n", 0, m.start()) + 1
+            line_end = text.find("\n", m.end())
+            if line_end < 0:
+                line_end = len(text)
+            if self._classify(text[line_start:line_end]):
+                lines.append(block[line_start:line_end + 1])
+            pos = line_end + 1
+
+    def match_lines(self, buf, start, end):
+        """
+        Returns matching lines of buf[start:end]. start must be at the start
+        of a line.
+        """
+
+        lines = []
+        pos = start
+        while pos < end:
+            block_end = min(end, pos + PREFILTER_BLOCK_BYTES)
+            if block_end < end:
+                nl = buf.find("\n", block_end - 1, end)
+                block_end = end if nl < 0 else nl + 1
+
+            block = buf[pos:block_end]
+            pos = block_end
+            if self.scan_re:
+                self._scan_block(block, lines)
+                continue
+
+            if not self.block_may_match(block):
+                continue
+
+            block_lines = block.split("\n")
+            last_line = block_lines.pop()
+            for line in block_lines:
+                if self.match(line):
+                    lines.append(line + "\n")
+            if last_line and self.match(last_line):
+                lines.append(last_line)
+
+        return lines
+
+
+def _map_file(file_name):
+    with open(file_name, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def scan_range(args):
+    file_name, start, end, matcher = args
+    buf = _map_file(file_name)
+    try:
+        return matcher.match_lines(buf, start, end)
+    finally:
+        buf.close()
+
+
+def split_range(file_name, start, end, chunk_bytes=GREP_CHUNK_BYTES):
+    """
+    Splits byte range [start, end) of file_name into ranges of about
+    chunk_bytes each, ending on line boundaries.
+    """
+
+    ranges = []
+    if start >= end:
+        return ranges
+
+    buf = _map_file(file_name)
+    try:
+        end = min(end, len(buf))
+        while start < end:
+            nl = -1
+            if start + chunk_bytes < end:
+                nl = buf.find("\n", start + chunk_bytes - 1, end)
+            if nl < 0:
+                ranges.append((start, end))
+                break
+            ranges.append((start, nl + 1))
+            start = nl + 1
+    finally:
+        buf.close()
+
+    return ranges
+
+
+def grep_file(file_name, start, end, matcher, chunk_bytes=GREP_CHUNK_BYTES):
+    """
+    Generator of lists of lines of file_name in [start, end) which pass
+    matcher, in file order. Byte ranges are scanned in the shared process
+    pool. Only a few ranges per file are queued ahead of the reader, so an
+    abandoned grep does not keep the pool busy.
+    """
+
+    try:
+        ranges = split_range(file_name, start, end, chunk_bytes)
+    except Exception:
+        # empty or unreadable file
+        return
+
+    pool = get_pool() if len(ranges) > 1 else None
+    if not pool:
+        for r in ranges:
+            yield scan_range((file_name, r[0], r[1], matcher))
+        return
+
+    window = collections.deque()
+    ranges = iter(ranges)
+    max_ahead = multiprocessing.cpu_count() + 1
+    while True:
+        for r in ranges:
+            window.append(pool.apply_async(
+                scan_range, ((file_name, r[0], r[1], matcher),)))
+            if len(window) >= max_ahead:
+                break
+        if not window:
+            return
+        yield window.popleft().get()
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import heapq
 import os
 import re
 import hashlib
@@ -429,108 +430,88 @@ class Loghdlr(object):
         latency_end = {}
         result = {}
         merge_result = {}
-        tm_keys = {}
-        need_to_process = False
         keys_in_input = []
         result_count = 0
+        # (timestamp, file key) of the pending result of each stream, equal
+        # timestamps pop in file key order
+        tm_heap = []
 
-        for key in file_streams.keys():
-            if not return_strings:
-                merge_result[key] = {}
-
+        def fetch_next(file_key):
             try:
-                tm, res = file_streams[key].next()
+                tm, res = file_streams[file_key].next()
                 if not tm:
-                    continue
+                    return False
 
                 if tm == end_key:
-                    latency_end[key] = res
-                    continue
+                    latency_end[file_key] = res
+                    return False
 
             except Exception:
-                continue
+                return False
+
+            result[file_key] = res
+            heapq.heappush(tm_heap, (tm, file_key))
+            return True
 
-            need_to_process = True
-            result[key] = {}
-            tm_keys[key] = {}
+        for key in file_streams.keys():
             if not return_strings:
-                if not keys_in_input:
-                    keys_in_input = res.keys()
+                merge_result[key] = {}
 
-            tm_keys[key] = tm
-            result[key] = res
+            if fetch_next(key) and not return_strings:
+                if not keys_in_input:
+                    keys_in_input = result[key].keys()
 
         if return_strings:
             colors = self._get_fg_bg_color_index_list(len(file_streams))
+            bg_colors = {}
+            for i, key in enumerate(file_streams.keys()):
+                bg_colors[key] = self.bg_colors[colors[i][0]][1]
+            show_lines = []
 
-        while need_to_process:
-            need_to_process = False
+        while tm_heap:
             try:
-                min_keys = [
-                    k for k, x in tm_keys.items() if not any(y < x for y in tm_keys.values())]
+                current_tm, file_key = heapq.heappop(tm_heap)
+                min_keys = [file_key]
+                while tm_heap and tm_heap[0][0] == current_tm:
+                    min_keys.append(heapq.heappop(tm_heap)[1])
             except Exception:
                 break
 
-            if not min_keys:
-                break
+            for file_key in min_keys:
+                if return_strings:
+                    show_lines.append("%s  %s%s::" % (
+                        bg_colors[file_key](), terminal.reset(), file_key))
+                    show_lines.append(result[file_key])
 
-            current_tm = tm_keys[min_keys[0]]
-            for file_key in sorted(file_streams.keys()):
-                if file_key in min_keys:
-                    if return_strings:
-                        try:
-                            merge_result[SHOW_RESULT_KEY] += "%s  %s%s::" % (
-                                    self.bg_colors[colors[(
-                                        file_streams.keys().index(file_key))][0]][1](),
-                                    terminal.reset(), file_key)
-                        except Exception:
-                            merge_result[SHOW_RESULT_KEY] = "%s  %s%s::" %(
-                                    self.bg_colors[colors[(
-                                        file_streams.keys().index(file_key))][0]][1](),
-                                    terminal.reset(), file_key)
-
-                        merge_result[SHOW_RESULT_KEY] += result[file_key]
+                else:
+                    if merge_result[file_key]:
+                        for k in keys_in_input:
+                            merge_result[file_key][k].update(
+                                result[file_key][k])
 
                     else:
-                        if merge_result[file_key]:
-                            for k in keys_in_input:
-                                merge_result[file_key][k].update(
-                                    result[file_key][k])
-
-                        else:
-                            merge_result[file_key].update(result[file_key])
-
-                    del result[file_key]
-                    del tm_keys[file_key]
+                        merge_result[file_key].update(result[file_key])
 
-                    try:
-                        tm, res = file_streams[file_key].next()
-                        if not tm:
-                            continue
+                del result[file_key]
+                fetch_next(file_key)
 
-                        if tm == end_key:
-                            latency_end[file_key] = res
-                            continue
+            if return_strings:
+                merge_result[SHOW_RESULT_KEY] = merge_result.get(
+                    SHOW_RESULT_KEY, "") + "".join(show_lines)
+                show_lines = []
 
-                    except Exception:
-                        continue
-
-                    need_to_process = True
-                    tm_keys[file_key] = tm
-                    result[file_key] = res
-
-                else:
-                    if file_key in tm_keys and tm_keys[file_key]:
-                        need_to_process = True
-
-                    if return_strings:
+            else:
+                min_keys = set(min_keys)
+                current_tm_str = current_tm.strftime(DT_FMT)
+                for file_key in file_streams.keys():
+                    if file_key in min_keys:
                         continue
 
                     for k in keys_in_input:
                         if k not in merge_result[file_key]:
                             merge_result[file_key][k] = {}
                         merge_result[file_key][k][
-                            current_tm.strftime(DT_FMT)] = default_value
+                            current_tm_str] = default_value
 
             result_count += 1
             if result_count == output_page_size:
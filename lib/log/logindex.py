@@ -0,0 +1,125 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import logging
+import os
+
+INDEX_VERSION = 1
+INDEX_FILE_EXT = ".idx"
+
+
+def get_default_index_dir():
+    try:
+        return os.path.join(os.environ['HOME'], '.aerospike', 'log_index')
+    except Exception:
+        return None
+
+
+class LogIndexCache(object):
+
+    """
+    Persistent store of server log time indices, one file per log kept
+    under index_dir. An entry is keyed by the log's (path, inode, size,
+    mtime). A log which has only grown since it was indexed keeps its
+    entry and is reported as partially indexed so the caller can extend
+    the index from the last indexed position instead of rebuilding it.
+    """
+
+    logger = logging.getLogger('asadm')
+
+    def __init__(self, index_dir=None):
+        if index_dir is None:
+            index_dir = get_default_index_dir()
+        self.index_dir = index_dir
+
+    def _index_file(self, file_path):
+        key = hashlib.md5(file_path).hexdigest()
+        return os.path.join(self.index_dir, key + INDEX_FILE_EXT)
+
+    def file_id(self, file_path):
+        file_path = os.path.abspath(file_path)
+        st = os.stat(file_path)
+        return {"path": file_path, "inode": st.st_ino, "size": st.st_size,
+                "mtime": st.st_mtime}
+
+    def load(self, file_path):
+        """
+        Returns (indices, complete). indices is None if nothing usable is
+        stored for file_path. complete is False if the log has grown since
+        indices were stored.
+        """
+
+        if not self.index_dir or not file_path:
+            return None, False
+
+        try:
+            file_path = os.path.abspath(file_path)
+            current = self.file_id(file_path)
+            with open(self._index_file(file_path), 'r') as f:
+                stored = json.load(f)
+        except Exception:
+            return None, False
+
+        try:
+            if (stored["version"] != INDEX_VERSION
+                    or stored["path"] != current["path"]
+                    or stored["inode"] != current["inode"]
+                    or not stored["indices"]):
+                return None, False
+
+            if (stored["size"] == current["size"]
+                    and stored["mtime"] == current["mtime"]):
+                return stored["indices"], True
+
+            if (current["size"] > stored["size"]
+                    and current["mtime"] >= stored["mtime"]):
+                return stored["indices"], False
+
+        except Exception:
+            pass
+
+        return None, False
+
+    def save(self, file_path, indices, file_id=None):
+        """
+        Stores indices for file_path. file_id should be taken before
+        indexing started, so that lines appended while indexing are picked
+        up by the next extension.
+        """
+
+        if not self.index_dir or not file_path or not indices:
+            return False
+
+        try:
+            file_path = os.path.abspath(file_path)
+            data = dict(file_id or self.file_id(file_path))
+            data["version"] = INDEX_VERSION
+            data["indices"] = indices
+
+            if not os.path.isdir(self.index_dir):
+                os.makedirs(self.index_dir)
+
+            index_file = self._index_file(file_path)
+            tmp_file = "%s.%d.tmp" % (index_file, os.getpid())
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f)
+            os.rename(tmp_file, index_file)
+            return True
+
+        except Exception as e:
+            self.logger.debug("Could not store log index for %s: %s" %
+                              (file_path, str(e)))
+            return False
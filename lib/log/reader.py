@@ -17,6 +17,7 @@ import re
 import time
 import logging
 
+from lib.log.logindex import LogIndexCache
 from lib.utils.util import shell_command
 from lib.utils.constants import DT_FMT
 
@@ -34,8 +35,11 @@ HH = 0
 MM = 1
 SS = 2
 
-INDEX_DT_LEN = 4
+# server log indices are kept at minute granularity
+INDEX_DT_LEN = 5
 STEP = 1000
+SEEK_BLOCK_MIN_BYTES = 4096
+SEEK_BLOCK_MAX_BYTES = 65536
 
 SERVER_ID_FETCH_READ_SIZE = 10000
 FILE_READ_ENDS = ["tail", "head"]
@@ -48,6 +52,11 @@ class LogReader(object):
     server_log_file_identifier_pattern = "(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) \d{2} \d{4} \d{2}:\d{2}:\d{2} GMT([-+]\d+){0,1}: (?:INFO|WARNING|DEBUG|DETAIL) \([a-z_:]+\): \([A-Za-z_\.\[\]]+:{1,2}-?[\d]+\)"
     logger = logging.getLogger('asadm')
 
+    def __init__(self, index_cache=None):
+        if index_cache is None:
+            index_cache = LogIndexCache()
+        self.index_cache = index_cache
+
     def get_server_node_id(self, file, fetch_end="tail",
                            read_block_size=SERVER_ID_FETCH_READ_SIZE):
         if not fetch_end or fetch_end not in FILE_READ_ENDS:
@@ -189,17 +198,41 @@ class LogReader(object):
         return datetime.datetime(*(time.strptime(prefix, DT_FMT)[0:dt_len]))
 
     def _seek_to(self, f, c):
-        if f and c:
-            if f.tell() <= 0:
-                f.seek(0, 0)
-            else:
-                tmp = f.read(1)
-                while tmp != c:
-                    if f.tell() <= 1:
-                        f.seek(0, 0)
-                        break
-                    f.seek(-2, 1)
-                    tmp = f.read(1)
+        """
+        Moves f just past the last c at or before the current position, or
+        to the start of the file if there is none. At end of file, the last
+        byte is skipped so that f lands on the start of the last line.
+        Scans backwards in blocks growing from SEEK_BLOCK_MIN_BYTES to
+        SEEK_BLOCK_MAX_BYTES.
+        """
+
+        if not f or not c:
+            return
+
+        pos = f.tell()
+        if pos <= 0:
+            f.seek(0, 0)
+            return
+
+        f.seek(0, 2)
+        size = f.tell()
+        if pos >= size:
+            end = size - 1
+        else:
+            end = pos + 1
+
+        block_size = SEEK_BLOCK_MIN_BYTES
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start, 0)
+            i = f.read(end - start).rfind(c)
+            if i >= 0:
+                f.seek(start + i + 1, 0)
+                return
+            end = start
+            block_size = min(block_size * 2, SEEK_BLOCK_MAX_BYTES)
+
+        f.seek(0, 0)
 
     def set_next_line(self, file_stream, jump=STEP, whence=1):
         file_stream.seek(int(jump), whence)
@@ -245,19 +278,50 @@ class LogReader(object):
         else:
             return self._get_next_timestamp(f, min, last_read, last)
 
-    def generate_server_log_indices(self, file_path):
-        indices = {}
+    def generate_server_log_indices(self, file_path, indices=None):
+        """
+        Returns map of minute (DT_FMT string) to offset of the first line
+        logged in that minute. If indices of an earlier, shorter version of
+        the same file are passed, they are extended from the last indexed
+        minute instead of being rebuilt.
+        """
+
         try:
             f = open(file_path, 'r')
+        except Exception:
+            return {}
+
+        try:
             start_timestamp = self.parse_dt(self.read_line(f), dt_len=INDEX_DT_LEN)
+            start_key = start_timestamp.strftime(DT_FMT)
+
+            if indices and indices.get(start_key) == 0:
+                indices = dict(indices)
+                last_key = max(indices, key=lambda k: indices[k])
+                min_seek_pos = indices[last_key]
+                last_timestamp = datetime.datetime(
+                    *(time.strptime(last_key, DT_FMT)[0:INDEX_DT_LEN]))
+            else:
+                indices = {start_key: 0}
+                min_seek_pos = 0
+                last_timestamp = start_timestamp
 
-            indices[start_timestamp.strftime(DT_FMT)] = 0
-            min_seek_pos = 0
+            self._extend_server_log_indices(f, indices, min_seek_pos,
+                                            last_timestamp)
+        except Exception:
+            indices = {}
+        finally:
+            f.close()
+
+        return indices
+
+    def _extend_server_log_indices(self, f, indices, min_seek_pos,
+                                   last_timestamp):
+        try:
             f.seek(0, 2)
             self.set_next_line(f, 0)
             last_pos = f.tell()
-            f.seek(0, 0)
-            last_timestamp = start_timestamp
+            f.seek(min_seek_pos, 0)
 
             while True:
                 if last_pos < (min_seek_pos + STEP):
@@ -288,6 +352,24 @@ class LogReader(object):
                 last_timestamp = tm
         except Exception:
             pass
+
+    def get_server_log_indices(self, file_path):
+        """
+        Returns time indices of server log file_path, reusing and extending
+        indices persisted by an earlier session where possible.
+        """
+
+        try:
+            file_id = self.index_cache.file_id(file_path)
+        except Exception:
+            return self.generate_server_log_indices(file_path)
+
+        indices, complete = self.index_cache.load(file_path)
+        if indices and complete:
+            return indices
+
+        indices = self.generate_server_log_indices(file_path, indices)
+        self.index_cache.save(file_path, indices, file_id=file_id)
         return indices
 
     def read_line(self, f):
@@ -12,13 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import bisect
 import datetime
 import hashlib
+import os
 import pipes
 import re
 import subprocess
 
 from lib.utils.constants import COUNT_RESULT_KEY, TOTAL_ROW_HEADER, END_ROW_KEY, DT_FMT
+from lib.log.grepengine import LineMatcher, grep_file
 from lib.log.latency import LogLatency
 
 READ_BLOCK_BYTES = 4096
@@ -32,7 +35,12 @@ class ServerLog(object):
         self.display_name = display_name
         self.file_name = file_name
         self.reader = reader
-        self.indices = self.reader.generate_server_log_indices(self.file_name)
+        self.indices = self.reader.get_server_log_indices(self.file_name)
+        index_list = sorted(
+            (datetime.datetime.strptime(tm, DT_FMT), offset)
+            for tm, offset in self.indices.items())
+        self.index_tms = [tm for tm, _ in index_list]
+        self.index_offsets = [offset for _, offset in index_list]
         self.file_stream = open(self.file_name, "r")
         self.file_stream.seek(0, 0)
 
@@ -51,6 +59,8 @@ class ServerLog(object):
             del self.file_name
             del self.reader
             del self.indices
+            del self.index_tms
+            del self.index_offsets
             del self.file_stream
             del self.server_start_tm
             del self.server_end_tm
@@ -59,6 +69,8 @@ class ServerLog(object):
             del self.file_stream
             del self.search_strings
             del self.ignore_strs
+            del self.matcher
+            del self.grep_block_itr
             del self.is_and
             del self.is_casesensitive
             del self.slice_duration
@@ -119,30 +131,31 @@ class ServerLog(object):
                 # line.\n"
                 self.set_file_stream(system_grep=False)
         else:
-            self.start_hr_tm = self.neglect_minutes_seconds_time(
-                self.process_start_tm)
-            self.server_start_hr_tm = self.neglect_minutes_seconds_time(
-                self.server_start_tm)
-            self.server_end_hr_tm = self.neglect_minutes_seconds_time(
-                self.server_end_tm)
-
-            if self.start_hr_tm.strftime(DT_FMT) in self.indices:
-                self.file_stream.seek(
-                    self.indices[self.start_hr_tm.strftime(DT_FMT)])
-            elif self.start_hr_tm < self.server_start_hr_tm:
+            # indices hold the offset of the first line of each logged
+            # minute, start from the first indexed minute at or after
+            # process start
+            start_min_tm = self.neglect_seconds_time(self.process_start_tm)
+            i = bisect.bisect_left(self.index_tms, start_min_tm)
+            if not self.index_tms:
                 self.file_stream.seek(0)
-            elif self.start_hr_tm > self.server_end_hr_tm:
-                self.file_stream.seek(0, 2)
+            elif i < len(self.index_tms):
+                self.file_stream.seek(self.index_offsets[i])
             else:
-                while(self.start_hr_tm < self.server_end_hr_tm):
-                    if self.start_hr_tm.strftime(DT_FMT) in self.indices:
-                        self.file_stream.seek(
-                            self.indices[self.start_hr_tm.strftime(DT_FMT)])
-                        return
-                    self.start_hr_tm = self.start_hr_tm + \
-                        datetime.timedelta(hours=1)
                 self.file_stream.seek(0, 2)
 
+            self.grep_block_itr = None
+            if self.matcher and not self.read_all_lines:
+                # scan up to the first indexed minute after process end
+                end_min_tm = self.neglect_seconds_time(self.process_end_tm)
+                i = bisect.bisect_right(self.index_tms, end_min_tm)
+                if i < len(self.index_tms):
+                    scan_end = self.index_offsets[i]
+                else:
+                    scan_end = os.fstat(self.file_stream.fileno()).st_size
+                self.grep_block_itr = grep_file(
+                    self.file_name, self.file_stream.tell(), scan_end,
+                    self.matcher)
+
     # system_grep parameter added to test and compare with system_grep. We are
     # not using this but keeping it here for future reference.
     def set_input(self, search_strs, ignore_strs=[], is_and=False, is_casesensitive=True, start_tm="", duration="",
@@ -165,6 +178,16 @@ class ServerLog(object):
         self.read_block_size = 0
         self.read_block_count = 0
         self.system_grep = system_grep
+        self.grep_block_itr = None
+        self.matcher = None
+        if self.search_strings:
+            try:
+                self.matcher = LineMatcher(
+                    self.search_strings, ignore_strs=self.ignore_strs,
+                    is_and=self.is_and, is_casesensitive=self.is_casesensitive)
+            except Exception:
+                # invalid case insensitive pattern, read line by line
+                pass
         self.set_file_stream(system_grep=system_grep)
         self.diff_it = self.diff()
         self.show_it = self.show()
@@ -182,6 +205,18 @@ class ServerLog(object):
         self.prev_line = None
 
     def read_line_block(self):
+        if self.grep_block_itr:
+            # lines are already filtered by the grep engine
+            try:
+                self.read_block = []
+                while not self.read_block:
+                    self.read_block = self.grep_block_itr.next()
+            except Exception:
+                self.read_block = []
+            self.read_block_index = 0
+            self.read_block_size = len(self.read_block)
+            return
+
         try:
             while(True):
                 self.read_block = []
@@ -285,7 +320,7 @@ class ServerLog(object):
                 continue
             if self.read_all_lines:
                 return line
-            if not self.system_grep:
+            if not self.system_grep and not self.grep_block_itr:
                 if self.search_strings:
                     if self.is_and:
                         if self.is_casesensitive:
@@ -342,10 +377,10 @@ class ServerLog(object):
     def show_iterator(self):
         return self.show_it
 
-    def neglect_minutes_seconds_time(self, tm):
+    def neglect_seconds_time(self, tm):
         if not tm or type(tm) is not datetime.datetime:
             return None
-        return tm + datetime.timedelta(minutes=-tm.minute, seconds=-tm.second, microseconds=-tm.microsecond)
+        return tm + datetime.timedelta(seconds=-tm.second, microseconds=-tm.microsecond)
 
     def get_next_slice_start_and_end_tm(self, old_slice_start, old_slice_end, slice_duration, current_line_tm):
         slice_jump = 0
@@ -20,6 +20,8 @@ import pipes
 import sys
 import StringIO
 
+from lib.utils import workerpool
+
 # Dictionary to contain feature and related stats to identify state of that feature
 # Format : { feature1: ((service_stat1, service_stat2, ....), (namespace_stat1, namespace_stat2, ...), ...}
 
@@ -41,34 +43,45 @@ FEATURE_KEYS = {
 class Future(object):
 
     """
-    Very basic implementation of a async future.
+    Very basic implementation of a async future. Runs on the shared worker
+    pool if one is set, otherwise on a new thread.
     """
 
     def __init__(self, func, *args, **kwargs):
         self._result = None
-
-        args = list(args)
-        args.insert(0, func)
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
         self.exc = None
+        self._task = None
+        self._worker = None
 
-        def wrapper(func, *args, **kwargs):
-            self.exc = None
-            try:
-                self._result = func(*args, **kwargs)
-            except Exception as e:
-                self.exc = e
-
-        self._worker = threading.Thread(target=wrapper,
-                                        args=args, kwargs=kwargs)
+    def _run(self):
+        self.exc = None
+        try:
+            self._result = self._func(*self._args, **self._kwargs)
+        except Exception as e:
+            self.exc = e
 
     def start(self):
-        self._worker.start()
+        pool = workerpool.get_shared_pool()
+        if pool:
+            self._task = pool.submit(self._run)
+        else:
+            self._worker = threading.Thread(target=self._run)
+            self._worker.start()
         return self
 
     def result(self):
+        if self._task:
+            self._task.wait()
+        elif self._worker:
+            self._worker.join()
+        else:
+            # never started, run in calling thread
+            self._run()
         if self.exc:
             raise self.exc
-        self._worker.join()
         return self._result
 
 
@@ -0,0 +1,227 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import threading
+from time import time
+
+DEFAULT_MAX_WORKERS = 32
+
+PENDING = 0
+RUNNING = 1
+DONE = 2
+
+# Pool shared by cluster calls and util.Future, set by the Cluster which
+# owns it.
+_shared_pool = None
+
+
+def get_shared_pool():
+    return _shared_pool
+
+
+def set_shared_pool(pool):
+    global _shared_pool
+    _shared_pool = pool
+
+
+class Task(object):
+
+    """
+    Unit of work submitted to WorkerPool.
+    """
+
+    def __init__(self, pool, func, args, kwargs):
+        self._pool = pool
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._state = PENDING
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._result = None
+        self.exc = None
+        self.submit_time = time()
+
+    def _claim(self):
+        with self._lock:
+            if self._state != PENDING:
+                return False
+            self._state = RUNNING
+            return True
+
+    def is_pending(self):
+        return self._state == PENDING
+
+    def run(self):
+        """
+        Execute task if no other thread has picked it up already.
+
+        Returns:
+        bool -- True if task was run by this call
+        """
+        if not self._claim():
+            return False
+
+        start_time = time()
+        self._pool._task_started()
+        try:
+            self._result = self._func(*self._args, **self._kwargs)
+        except Exception as e:
+            self.exc = e
+        finally:
+            self._state = DONE
+            self._pool._task_done(self, start_time, time())
+            self._done.set()
+        return True
+
+    def cancel(self):
+        """
+        Drop task if no worker has started it yet.
+
+        Returns:
+        bool -- True if task will not run
+        """
+        if not self._claim():
+            return False
+        self.exc = RuntimeError("Task cancelled")
+        self._state = DONE
+        self._pool._task_started()
+        self._done.set()
+        return True
+
+    def wait(self):
+        # Run task in calling thread if no worker has started it yet. This
+        # keeps nested submits (tasks waiting on their own sub-tasks) from
+        # deadlocking a size capped pool.
+        self.run()
+        self._done.wait()
+
+    def result(self):
+        self.wait()
+        if self.exc:
+            raise self.exc
+        return self._result
+
+
+class WorkerPool(object):
+
+    """
+    Long lived, size capped pool of worker threads.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._queue = collections.deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._workers = []
+        self._idle_workers = 0
+        self._shutdown = False
+
+        # stats
+        self._stats_lock = threading.Lock()
+        self._submitted = 0
+        self._pending = 0
+        self._completed = 0
+        self._total_wait_time = 0.0
+        self._total_run_time = 0.0
+        self._max_wait_time = 0.0
+        self._max_run_time = 0.0
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._shutdown:
+                    self._idle_workers += 1
+                    self._cond.wait()
+                    self._idle_workers -= 1
+                if self._shutdown:
+                    return
+                task = self._queue.popleft()
+            task.run()
+
+    def submit(self, func, *args, **kwargs):
+        task = Task(self, func, args, kwargs)
+        with self._stats_lock:
+            self._submitted += 1
+            self._pending += 1
+
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit to a closed worker pool")
+            self._queue.append(task)
+            if (self._idle_workers < len(self._queue)
+                    and len(self._workers) < self.max_workers):
+                worker = threading.Thread(target=self._worker_loop)
+                worker.daemon = True
+                self._workers.append(worker)
+                worker.start()
+            self._cond.notify()
+        return task
+
+    def map(self, func, data):
+        """
+        Similar to util.concurrent_map, apply 'func' to each element of
+        'data' using pool workers. Result is None for calls which raised an
+        exception.
+        """
+        tasks = [self.submit(func, datum) for datum in data]
+        result = []
+        for task in tasks:
+            task.wait()
+            result.append(None if task.exc else task._result)
+        return result
+
+    def _task_started(self):
+        with self._stats_lock:
+            self._pending -= 1
+
+    def _task_done(self, task, start_time, end_time):
+        wait_time = start_time - task.submit_time
+        run_time = end_time - start_time
+        with self._stats_lock:
+            self._completed += 1
+            self._total_wait_time += wait_time
+            self._total_run_time += run_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+            self._max_run_time = max(self._max_run_time, run_time)
+
+    def get_stats(self):
+        """
+        Returns:
+        dict -- queue depth, worker count and task latency stats. Latencies
+                are in seconds, wait time is time spent in queue.
+        """
+        with self._cond:
+            workers = len(self._workers)
+        with self._stats_lock:
+            completed = self._completed
+            return {
+                'max_workers': self.max_workers,
+                'workers': workers,
+                'queue_depth': self._pending,
+                'submitted': self._submitted,
+                'completed': completed,
+                'avg_wait_time': (self._total_wait_time / completed
+                                  if completed else 0.0),
+                'max_wait_time': self._max_wait_time,
+                'avg_run_time': (self._total_run_time / completed
+                                 if completed else 0.0),
+                'max_run_time': self._max_run_time,
+            }
+
+    def close(self):
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
@@ -22,7 +22,7 @@ import time
 from cStringIO import StringIO
 import sys
 
-from lib.health.constants import HealthResultType, HealthResultCounter, AssertResultKey, AssertLevel
+from lib.health.constants import HealthResultType, HealthResultCounter, AssertResultKey, AssertLevel, QueryProfileKey
 from lib.health.util import print_dict
 from lib.utils import filesize
 from lib.utils.util import get_value_from_dict, set_value_in_dict
@@ -807,6 +807,21 @@ class CliView(object):
         CliView.print_result(
             t.__str__(horizontal_title_every_nth=title_every_nth))
 
+    @staticmethod
+    def show_worker_pool_stats(title, stats, like=None, **ignore):
+        column_names = sorted(stats.keys())
+        if like:
+            likes = CliView.compile_likes(like)
+            column_names = filter(likes.search, column_names)
+
+        if len(column_names) == 0:
+            return ''
+
+        t = Table(title, column_names,
+                  title_format=TitleFormats.no_change, style=Styles.VERTICAL)
+        t.insert_row(stats)
+        CliView.print_result(t)
+
     @staticmethod
     def show_grep_count(title, grep_result, title_every_nth=0, like=None, diff=None, **ignore):
         column_names = set()
@@ -1452,6 +1467,72 @@ class CliView(object):
 
         print "_" * H_width + "\n"
 
+    @staticmethod
+    def print_health_profile(query_profiles, top=10):
+        if not query_profiles:
+            return
+
+        to_ms = lambda t: "%.2f" % (t * 1000)
+        rank_width = len(str(top))
+
+        title = "Slowest Health Queries"
+        column_names = ('#', 'Index', 'Category', ('eval_ms', 'Eval (ms)'),
+                        ('parse_ms', 'Parse (ms)'), 'Rows', 'Cache Hits',
+                        'Query')
+        t = Table(title, column_names, title_format=TitleFormats.no_change)
+        slowest = sorted(query_profiles,
+                         key=lambda p: p[QueryProfileKey.EVAL_TIME],
+                         reverse=True)[:top]
+        for rank, p in enumerate(slowest, 1):
+            query = " ".join(p[QueryProfileKey.QUERY].split())
+            if len(query) > 60:
+                query = query[:57] + "..."
+
+            row = {}
+            # table sorts cells as strings
+            row['#'] = str(rank).rjust(rank_width)
+            row['Index'] = p[QueryProfileKey.INDEX]
+            row['Category'] = p[QueryProfileKey.CATEGORY] or "-"
+            row['eval_ms'] = to_ms(p[QueryProfileKey.EVAL_TIME])
+            row['parse_ms'] = to_ms(p[QueryProfileKey.PARSE_TIME])
+            row['Rows'] = p[QueryProfileKey.ROWS]
+            row['Cache Hits'] = p[QueryProfileKey.CACHE_HITS]
+            row['Query'] = query
+            t.insert_row(row)
+        CliView.print_result(t)
+
+        summed_keys = (QueryProfileKey.EVAL_TIME, QueryProfileKey.PARSE_TIME,
+                       QueryProfileKey.ROWS, QueryProfileKey.CACHE_HITS)
+        totals = {}
+        for p in query_profiles:
+            category = p[QueryProfileKey.CATEGORY] or "-"
+            if category not in totals:
+                totals[category] = dict((key, 0) for key in summed_keys)
+                totals[category]['Queries'] = 0
+            totals[category]['Queries'] += 1
+            for key in summed_keys:
+                totals[category][key] += p[key]
+
+        title = "Health Query Time per Category"
+        column_names = ('Category', 'Queries', ('eval_ms', 'Eval (ms)'),
+                        ('parse_ms', 'Parse (ms)'), 'Rows', 'Cache Hits')
+        t = Table(title, column_names, title_format=TitleFormats.no_change)
+        for category, total in totals.iteritems():
+            row = {}
+            row['Category'] = category
+            row['Queries'] = total['Queries']
+            row['eval_ms'] = to_ms(total[QueryProfileKey.EVAL_TIME])
+            row['parse_ms'] = to_ms(total[QueryProfileKey.PARSE_TIME])
+            row['Rows'] = total[QueryProfileKey.ROWS]
+            row['Cache Hits'] = total[QueryProfileKey.CACHE_HITS]
+            t.insert_row(row)
+        CliView.print_result(t)
+
+        print "Total: %d queries, eval %s ms, parse %s ms\n" % (
+            len(query_profiles),
+            to_ms(sum(p[QueryProfileKey.EVAL_TIME] for p in query_profiles)),
+            to_ms(sum(p[QueryProfileKey.PARSE_TIME] for p in query_profiles)))
+
     @staticmethod
     def print_health_output(ho, verbose=False, debug=False, output_file=None, output_filter_category=[], output_filter_warning_level=None):
         if not ho:
@@ -1473,6 +1554,8 @@ class CliView(object):
             ho[HealthResultType.STATUS_COUNTERS], verbose=verbose)
         CliView.print_assert_summary(ho[HealthResultType.ASSERT], verbose=verbose,
                                      output_filter_category=output_filter_category, output_filter_warning_level=output_filter_warning_level)
+        if HealthResultType.PROFILE in ho:
+            CliView.print_health_profile(ho[HealthResultType.PROFILE])
 
         if o_s:
             o_s.close()
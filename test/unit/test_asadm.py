@@ -0,0 +1,51 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from mock import patch
+import unittest2 as unittest
+
+import asadm
+
+
+class ParseCliArgsTest(unittest.TestCase):
+    def check_defaults(self, cli_args):
+        self.assertEqual(cli_args.host, "127.0.0.1")
+        self.assertIsNone(cli_args.command_timeout)
+        self.assertIsNone(cli_args.hedge_delay)
+        self.assertIsNone(cli_args.snapshot_ttl)
+
+    def check_flags(self, cli_args):
+        self.assertEqual(cli_args.command_timeout, 2.0)
+        self.assertEqual(cli_args.hedge_delay, 0.5)
+        self.assertEqual(cli_args.snapshot_ttl, 30.0)
+
+    def test_argparse(self):
+        _, cli_args = asadm.parse_cli_args([])
+        self.check_defaults(cli_args)
+
+        _, cli_args = asadm.parse_cli_args(
+            ["--command_timeout", "2", "--hedge_delay", "0.5",
+             "--snapshot_ttl", "30"])
+        self.check_flags(cli_args)
+
+    @patch('argparse.ArgumentParser', side_effect=ImportError)
+    def test_optparse(self, _):
+        parser, cli_args = asadm.parse_cli_args([])
+        self.assertFalse(hasattr(parser, "add_argument"))
+        self.check_defaults(cli_args)
+
+        _, cli_args = asadm.parse_cli_args(
+            ["--command_timeout", "2", "--hedge_delay", "0.5",
+             "--snapshot_ttl", "30"])
+        self.check_flags(cli_args)
@@ -0,0 +1,70 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from mock import Mock, patch
+import socket
+import time
+import unittest2 as unittest
+
+from lib.client.assocket import ASSocket
+
+
+class ASSocketTest(unittest.TestCase):
+    def get_socket(self, idle_timeout=55):
+        s = ASSocket(None, "127.0.0.1", 3000, idle_timeout=idle_timeout)
+        s.sock, peer = socket.socketpair()
+        return s, peer
+
+    def test_is_connected(self):
+        s, peer = self.get_socket()
+        self.assertTrue(s.is_connected())
+
+        # stale data left on socket
+        peer.send("x")
+        self.assertFalse(s.is_connected())
+
+    def test_is_connected_peer_closed(self):
+        s, peer = self.get_socket()
+        peer.close()
+        self.assertFalse(s.is_connected())
+
+    def test_is_connected_idle_timeout(self):
+        s, peer = self.get_socket(idle_timeout=10)
+        s.last_used = time.time() - 11
+        self.assertFalse(s.is_connected())
+
+    @patch('lib.client.assocket._session_reused')
+    def test_tls_handshake_session_reuse(self, session_reused):
+        node = Mock()
+        node.tls_session = None
+        s = ASSocket(node, "127.0.0.1", 3000)
+        sock = Mock()
+
+        # first connection does full handshake
+        s._tls_handshake(sock)
+        self.assertFalse(sock.set_session.called)
+        self.assertTrue(sock.do_handshake.called)
+        self.assertFalse(node._update_tls_session.call_args[0][2])
+
+        # later connections offer node's session
+        node.tls_session = "session"
+        node.tls_session_generation = \
+            sock.get_context().get_app_data().generation
+        session_reused.return_value = True
+        s._tls_handshake(sock)
+        sock.set_session.assert_called_with("session")
+        self.assertTrue(node._update_tls_session.call_args[0][2])
+
+if __name__ == "__main__":
+    unittest.main()
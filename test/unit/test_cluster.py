@@ -13,8 +13,29 @@
 # limitations under the License.
 
 from mock import patch
+import threading
+import time
 import unittest2 as unittest
+from lib.client.cluster import Cluster
+from lib.client.infoloop import NodeTimeoutError
 from lib.client.node import Node
+from lib.utils.workerpool import WorkerPool
+
+
+class FakeNode(object):
+    def __init__(self, key, delays):
+        self.key = key
+        self.ip = key
+        self.delays = list(delays)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def info(self, command):
+        with self.lock:
+            delay = self.delays[min(self.calls, len(self.delays) - 1)]
+            self.calls += 1
+        time.sleep(delay)
+        return "%s %s" % (self.key, command)
 
 class ClusterTest(unittest.TestCase):
     def get_info_mock(self, return_value):
@@ -28,3 +49,86 @@ class ClusterTest(unittest.TestCase):
 
     def test_init_cluster(self):
         pass
+
+    def test_get_node_for_alias(self):
+        c = Cluster.__new__(Cluster)
+        node = FakeNode("10.0.0.1:3000", [0])
+        c.nodes = {node.key: node}
+        c.aliases = {Node.create_key("10.0.0.2", 3000): node.key}
+
+        self.assertIs(c.get_node_for_alias("10.0.0.2", 3000), node)
+        self.assertIsNone(c.get_node_for_alias("10.0.0.3", 3000))
+
+    def get_cluster(self, command_timeout, hedge_delay=None, max_workers=8):
+        c = Cluster.__new__(Cluster)
+        c.worker_pool = WorkerPool(max_workers)
+        c.command_timeout = command_timeout
+        c.hedge_delay = hedge_delay
+        c._timed_out_nodes = set()
+        c._timed_out_nodes_lock = threading.Lock()
+        self.addCleanup(c.worker_pool.close)
+        return c
+
+    def test_call_node_method_with_deadline(self):
+        c = self.get_cluster(0.3)
+        fast, slow = FakeNode("fast", [0]), FakeNode("slow", [2])
+        start = time.time()
+        result = c._call_node_method_with_deadline([fast, slow], "info",
+                                                   ("build",), {})
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(result["fast"], "fast build")
+        self.assertIsInstance(result["slow"], NodeTimeoutError)
+        self.assertEqual(c.pop_timed_out_nodes(), ["slow"])
+        self.assertEqual(c.pop_timed_out_nodes(), [])
+
+    def test_call_node_method_hedged(self):
+        c = self.get_cluster(1, hedge_delay=0.1)
+        # first call hangs, hedged call answers quickly
+        n = FakeNode("n", [2, 0])
+        result = c._call_node_method_with_deadline([n], "info", ("build",),
+                                                   {})
+        self.assertEqual(result["n"], "n build")
+        self.assertEqual(n.calls, 2)
+
+        n = FakeNode("n", [2, 0])
+        c._call_node_method_with_deadline([n], "info", ("set-config:",), {})
+        self.assertEqual(n.calls, 1)
+
+    def test_call_node_method_with_deadline_saturated_pool(self):
+        c = self.get_cluster(1, max_workers=2)
+        nodes = [FakeNode("n1", [0]), FakeNode("n2", [0])]
+
+        # outer tasks hold every worker while waiting on their node calls
+        outer = [c.worker_pool.submit(c._call_node_method_with_deadline,
+                                      nodes, "info", ("build",), {})
+                 for _ in range(2)]
+
+        for task in outer:
+            result = task.result()
+            self.assertEqual(result, {"n1": "n1 build", "n2": "n2 build"})
+        self.assertEqual(c.pop_timed_out_nodes(), [])
+
+    def test_is_hedgeable(self):
+        for method_name, args in (("info_statistics", ()),
+                                  ("info", ("statistics",)),
+                                  ("info", ("namespace/test",)),
+                                  ("info", ("get-config:context=service",)),
+                                  ("info", ("latency:",)),
+                                  ("info_many", (["node", "statistics"],))):
+            self.assertTrue(Cluster._is_hedgeable(method_name, args),
+                            (method_name, args))
+
+        for method_name, args in (("info", ("set-config:context=service",)),
+                                  ("info", ("recluster:",)),
+                                  ("info", ("quiesce:",)),
+                                  ("info", ("roster-set:namespace=test",)),
+                                  ("info", ("tip:host=a;port=3002",)),
+                                  ("info", ("dun:nodes=BB9",)),
+                                  ("info", ("sindex-create:ns=test",)),
+                                  ("info", ("jobs:module=query;cmd=kill-job",)),
+                                  ("info", ()),
+                                  ("info_many", (["node", "recluster:"],)),
+                                  ("info_system_statistics", ()),
+                                  ("is_XDR_enabled", ())):
+            self.assertFalse(Cluster._is_hedgeable(method_name, args),
+                             (method_name, args))
@@ -90,6 +90,18 @@ class ControllerTest(unittest.TestCase):
         slc.pre_command([""])
         slc._do_default(["latency"])
         
+    def test_show_cache_controller(self):
+        scc = ShowCacheController()
+
+        scc.pre_command([""])
+        for future in scc._do_default(["cache"]):
+            future.start().result()
+
+        output = sys.stdout.getvalue()
+        self.assertIn("Worker Pool Statistics", output)
+        self.assertIn("queue_depth", output)
+        self.assertIn("avg_wait_ms", output)
+
     def test_ShowStatisticsController(self):
         ssc = ShowStatisticsController()
 
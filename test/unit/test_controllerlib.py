@@ -171,3 +171,11 @@ class ControllerLibTest(unittest.TestCase):
                 # print "actual:   ", c.mods
                 self.assertEqual(c.mods, expected)
                 self.assertEqual(retval[0], 'fake1')
+
+    def test_health_checker_lazy(self):
+        BaseController._health_checker = None
+        r = FakeRoot()
+        self.assertIsNone(BaseController._health_checker)
+        health_checker = r.health_checker
+        self.assertIsNotNone(health_checker)
+        self.assertIs(FakeCommand1().health_checker, health_checker)
@@ -0,0 +1,96 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest2 as unittest
+
+from lib.log.grepengine import LineMatcher, grep_file, split_range
+
+
+class GrepEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.log = os.path.join(self.tmp_dir, "aerospike.log")
+        self.lines = ["line %d %s %s\n" % (i, "even" if i % 2 else "odd",
+                                           "Fizz" if i % 3 == 0 else "")
+                      for i in range(5000)]
+        with open(self.log, "w") as f:
+            f.write("".join(self.lines))
+        self.size = os.path.getsize(self.log)
+
+    def grep(self, matcher, start=0, end=None, chunk_bytes=1000):
+        if end is None:
+            end = self.size
+        lines = []
+        for block in grep_file(self.log, start, end, matcher,
+                               chunk_bytes=chunk_bytes):
+            lines.extend(block)
+        return lines
+
+    def test_split_range(self):
+        ranges = split_range(self.log, 0, self.size, chunk_bytes=1000)
+
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], self.size)
+        with open(self.log) as f:
+            data = f.read()
+        for (s1, e1), (s2, e2) in zip(ranges, ranges[1:]):
+            self.assertEqual(e1, s2)
+            self.assertEqual(data[e1 - 1], "\n")
+
+    def test_grep_or(self):
+        matcher = LineMatcher(["line 12 ", "line 4999 "])
+
+        self.assertEqual(self.grep(matcher),
+                         [self.lines[12], self.lines[4999]])
+
+    def test_grep_and_ignore(self):
+        matcher = LineMatcher(["even", "Fizz"], ignore_strs=["line 3"],
+                              is_and=True)
+        expected = [l for l in self.lines if "even" in l and "Fizz" in l
+                    and "line 3" not in l]
+
+        self.assertEqual(self.grep(matcher), expected)
+
+    def test_grep_case_insensitive(self):
+        matcher = LineMatcher(["fizz"], ignore_strs=["EVEN"],
+                              is_casesensitive=False)
+        expected = [l for l in self.lines if "Fizz" in l and "even" not in l]
+
+        self.assertEqual(self.grep(matcher), expected)
+
+    def test_grep_range(self):
+        start = sum(len(l) for l in self.lines[:100])
+        end = sum(len(l) for l in self.lines[:200])
+        matcher = LineMatcher(["line"])
+
+        self.assertEqual(self.grep(matcher, start, end), self.lines[100:200])
+
+    def test_grep_many_terms(self):
+        terms = ["line %d " % i for i in range(0, 5000, 250)] + ["line 1"]
+        matcher = LineMatcher(terms, ignore_strs=["Fizz"])
+        expected = [l for l in self.lines if any(t in l for t in terms)
+                    and "Fizz" not in l]
+
+        self.assertIsNotNone(matcher.scan_re)
+        self.assertEqual(self.grep(matcher), expected)
+
+    def test_grep_case_insensitive_regex(self):
+        matcher = LineMatcher(["^LINE 4[0-9] "], is_casesensitive=False)
+
+        self.assertIsNone(matcher.scan_re)
+        self.assertEqual(self.grep(matcher), self.lines[40:50])
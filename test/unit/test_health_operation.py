@@ -0,0 +1,61 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from mock import patch
+import operator
+import random
+import unittest2 as unittest
+
+from lib.health import operation
+from lib.health.util import make_map
+
+
+def get_vector(values):
+    return [make_map("1.1.1.%d:3000/stat" % (i), v)
+            for i, v in enumerate(values)]
+
+
+@unittest.skipUnless(operation.HAS_NUMPY, "numpy not installed")
+class NumpyOperationTest(unittest.TestCase):
+    def assert_same_as_python(self, fn, *args):
+        result = fn(*args)
+        with patch('lib.health.operation.HAS_NUMPY', False):
+            expected = fn(*args)
+        self.assertEqual(result, expected)
+
+    def test_aggregation(self):
+        random.seed(1)
+        v = get_vector([random.randint(0, 10 ** 12) for _ in range(100)])
+        for op in ("+", "MAX", "MIN"):
+            self.assert_same_as_python(
+                operation.int_vector_to_scalar_operation,
+                operation.operators[op], v)
+        self.assert_same_as_python(operation.vector_to_scalar_avg_operation,
+                                   operation.operators["+"], v)
+
+    def test_diff_and_sd_anomaly(self):
+        random.seed(2)
+        v = get_vector([random.randint(0, 100) for _ in range(60)] + [900.5])
+        for op in (operator.gt, operator.ge, operator.lt, operator.eq):
+            self.assert_same_as_python(
+                operation.vector_to_vector_diff_operation, v, op, 50)
+        self.assert_same_as_python(
+            operation.vector_to_vector_sd_anomaly_operation, v, operator.eq, 3)
+
+    def test_non_numeric_fallback(self):
+        v = get_vector(range(40) + ["N/E"])
+        self.assertIsNone(operation.numeric_column(v))
+
+if __name__ == "__main__":
+    unittest.main()
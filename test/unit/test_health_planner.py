@@ -0,0 +1,55 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2 as unittest
+
+from lib.health.parser import HealthLexer
+from lib.health.planner import QueryPlan
+
+
+class QueryPlanTest(unittest.TestCase):
+    def get_plan(self, *queries):
+        plan = QueryPlan(HealthLexer().build())
+        for query in queries:
+            plan.add_query(query)
+        return plan
+
+    def test_from_clause(self):
+        plan = self.get_plan('s = select "migrate_rx" from NAMESPACE.STATISTICS',
+                             's = select "top" from SYSTEM.CPU_UTILIZATION')
+
+        self.assertFalse(plan.full)
+        self.assertTrue(plan.needs(["NAMESPACE", "STATISTICS"]))
+        self.assertFalse(plan.needs(["SERVICE", "STATISTICS"]))
+        self.assertFalse(plan.needs(["NAMESPACE", "CONFIG"]))
+        self.assertTrue(plan.needs(["SYSTEM", "TOP"]))
+        self.assertFalse(plan.needs(["SYSTEM", "IOSTAT"]))
+        self.assertEqual(plan.snapshot_count(3), 1)
+
+    def test_select_without_from(self):
+        plan = self.get_plan('s = select "system_free_mem_pct"')
+
+        self.assertTrue(plan.full)
+        self.assertTrue(plan.needs(["SYSTEM", "DF"]))
+        self.assertEqual(plan.snapshot_count(3), 1)
+
+    def test_snapshot_reference(self):
+        plan = self.get_plan('s = select "uptime" from SNAPSHOT1.SERVICE')
+
+        self.assertTrue(plan.needs(["SERVICE", "STATISTICS"]))
+        self.assertFalse(plan.needs(["XDR", "STATISTICS"]))
+        self.assertEqual(plan.snapshot_count(3), 3)
+
+if __name__ == "__main__":
+    unittest.main()
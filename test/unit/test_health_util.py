@@ -0,0 +1,70 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2 as unittest
+
+from lib.health.util import fetch_keys_from_dict, HealthInputIndex
+
+CLUSTER = ("C1", "CLUSTER")
+NODE1 = ("1.1.1.1:3000", "NODE")
+NODE2 = ("2.2.2.2:3000", "NODE")
+NS = ("test", "NAMESPACE")
+
+
+def get_snapshot(uptime):
+    return {
+        "SERVICE": {
+            "STATISTICS": {CLUSTER: {
+                NODE1: {("uptime", "KEY"): uptime, ("objects", "KEY"): 7},
+                NODE2: {("uptime", "KEY"): uptime + 1}}},
+            "CONFIG": {"service": {CLUSTER: {
+                NODE1: {("proto-fd-max", "KEY"): 15000}}}}},
+        "NAMESPACE": {
+            "STATISTICS": {CLUSTER: {NODE1: {NS: {
+                ("objects", "KEY"): 10, ("device_free_pct", "KEY"): 40,
+                ("free-pct-disk", "KEY"): 0}}}}},
+    }
+
+HEALTH_INPUT = {"SNAPSHOT000": get_snapshot(10),
+                "SNAPSHOT001": get_snapshot(20)}
+
+
+class HealthInputIndexTest(unittest.TestCase):
+    def assert_select(self, keys, from_keys):
+        index = HealthInputIndex(HEALTH_INPUT)
+        expected = fetch_keys_from_dict(HEALTH_INPUT, keys, list(from_keys))
+        self.assertTrue(expected)
+        self.assertEqual(index.select(keys, list(from_keys)), expected)
+
+    def test_select(self):
+        self.assert_select([(False, "uptime", None)], ["SNAPSHOT001"])
+        self.assert_select([(False, "objects", None)],
+                           ["SNAPSHOT000", "NAMESPACE"])
+        self.assert_select([(False, "objects", "count")], ["ALL"])
+        self.assert_select([(True, "^proto.*$", None),
+                            (False, "uptime", None)],
+                           ["SNAPSHOT001", "SERVICE"])
+
+    def test_select_renamed_keys(self):
+        self.assert_select([(False, "device_free_pct", "free_disk"),
+                            (False, "free-pct-disk", "free_disk")],
+                           ["SNAPSHOT000", "NAMESPACE", "STATISTICS"])
+
+    def test_select_no_match(self):
+        index = HealthInputIndex(HEALTH_INPUT)
+        self.assertEqual(index.select([(False, "uptime", None)],
+                                      ["SNAPSHOT000", "NAMESPACE"]), {})
+
+if __name__ == "__main__":
+    unittest.main()
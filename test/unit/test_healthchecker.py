@@ -0,0 +1,104 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from mock import patch
+import unittest2 as unittest
+
+from lib.health.constants import HealthResultCounter, HealthResultType, QueryProfileKey
+from lib.health.healthchecker import HealthChecker
+from lib.health.parser import HealthInputIndex, HealthParser
+
+QUERIES = '''
+s = select "uptime" from SERVICE.STATISTICS;
+r = do s > 10;
+ASSERT(r, True, "Low uptime.", "OPERATIONS", WARNING, "Uptime check.");
+'''
+
+
+def get_health_input(uptime):
+    return {"SNAPSHOT000": {"SERVICE": {"STATISTICS": {
+        ("C1", "CLUSTER"): {("1.1.1.1:3000", "NODE"): {
+            ("uptime", "KEY"): uptime}}}}}}
+
+
+class HealthCheckerTest(unittest.TestCase):
+    def get_summary(self, health_checker, uptime, profile=False):
+        health_checker.set_health_input_data(get_health_input(uptime))
+        with patch('lib.health.healthchecker.QUERIES', QUERIES):
+            return health_checker.execute(profile=profile)
+
+    def get_counters(self, health_checker, uptime):
+        summary = self.get_summary(health_checker, uptime)
+        return summary[HealthResultType.STATUS_COUNTERS]
+
+    def test_compiled_queries_reused(self):
+        health_checker = HealthChecker()
+
+        with patch.object(health_checker.health_parser, 'compile',
+                          wraps=health_checker.health_parser.compile) as compile:
+            counters = self.get_counters(health_checker, 100)
+            self.assertEqual(compile.call_count, 3)
+            self.assertEqual(
+                counters[HealthResultCounter.ASSERT_PASSED_COUNTER], 1)
+
+            # same queries run on new data without parsing again
+            counters = self.get_counters(health_checker, 5)
+            self.assertEqual(compile.call_count, 3)
+            self.assertEqual(
+                counters[HealthResultCounter.ASSERT_FAILED_COUNTER], 1)
+
+    def test_profile(self):
+        health_checker = HealthChecker()
+        summary = self.get_summary(health_checker, 100)
+        self.assertNotIn(HealthResultType.PROFILE, summary)
+
+        summary = self.get_summary(health_checker, 100, profile=True)
+        profiles = summary[HealthResultType.PROFILE]
+        self.assertEqual([p[QueryProfileKey.INDEX] for p in profiles],
+                         [1, 2, 3])
+        # queries of rule get category of its ASSERT
+        self.assertEqual([p[QueryProfileKey.CATEGORY] for p in profiles],
+                         ["OPERATIONS"] * 3)
+        self.assertEqual([p[QueryProfileKey.ROWS] for p in profiles],
+                         [1, 0, 0])
+
+
+class SubexpressionCacheTest(unittest.TestCase):
+    def test_shared_results(self):
+        parser = HealthParser()
+        parser.build()
+        data = get_health_input(100)
+        parser.set_health_data(data)
+
+        s1 = parser.parse('s1 = select "uptime" from SERVICE.STATISTICS')
+        s2 = parser.parse('s2 = select "uptime" from SNAPSHOT0.SERVICE.STATISTICS')
+        self.assertIs(s1, s2)
+
+        g1 = parser.parse('g1 = group by NODE s1')
+        g2 = parser.parse('g2 = group by NODE s2')
+        self.assertIs(g1, g2)
+
+        with patch('lib.health.parser.HealthInputIndex',
+                   wraps=HealthInputIndex) as index:
+            parser.clear_health_cache()
+            parser.set_health_data(get_health_input(5))
+            parser.parse('s = select "uptime" from SERVICE')
+            parser.set_health_data(data)
+            self.assertIsNot(
+                parser.parse('s = select "uptime" from SERVICE.STATISTICS'), s1)
+            # index of first data is kept
+            self.assertEqual(index.call_count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+import struct
+import time
+import unittest2 as unittest
+
+from lib.client.infoloop import (InfoLoop, NodeTimeoutError, WANT_READ,
+                                 _InfoRequest)
+
+
+class FakeSocket(object):
+    def __init__(self, sock):
+        self.sock = sock
+        self.closed = False
+
+    def close(self, force=False):
+        self.closed = True
+
+
+class FakeNode(object):
+    def __init__(self, key, response=None):
+        self.key = key
+        self.ip = key
+        self.port = 3000
+        self.alive = True
+        self.sock, self.peer = socket.socketpair()
+        if response is not None:
+            # queue the server response before the request is sent
+            self.peer.sendall(struct.pack("! Q", (2 << 56) | (1 << 48) |
+                                          len(response)) + response)
+
+    def _get_pooled_connection(self, port):
+        return FakeSocket(self.sock)
+
+
+class SlowNode(object):
+    """
+    Node without pooled connections, connects to a local listener.
+    """
+
+    def __init__(self, key, port):
+        self.key = key
+        self.ip = "127.0.0.1"
+        self.port = port
+        self.alive = True
+        self.socket_pool = {port: set()}
+        self.socket_pool_size = 3
+        self.socket_idle_timeout = 55
+        self.ssl_context = None
+        self.tls_name = None
+        self.user = None
+
+    def _get_pooled_connection(self, port):
+        return None
+
+    def _get_connection(self, ip, port):
+        # blocking connect, must not be used by the loop
+        time.sleep(1)
+        return None
+
+
+def listener(backlog=16):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(backlog)
+    return sock, sock.getsockname()[1]
+
+
+class InfoLoopTest(unittest.TestCase):
+    def test_run(self):
+        n1 = FakeNode("n1", "build\t3.14.0\n")
+        n2 = FakeNode("n2", "build\t3.15.0\n")
+        result = InfoLoop().run([(n.key, n, "build", n.port)
+                                 for n in (n1, n2)])
+        self.assertEqual(result, {"n1": "3.14.0", "n2": "3.15.0"})
+        self.assertEqual(n1.peer.recv(100),
+                         struct.pack("! Q", (2 << 56) | (1 << 48) | 6) +
+                         "build\n")
+
+    def test_run_timeout(self):
+        n1 = FakeNode("n1", "build\t3.14.0\n")
+        n2 = FakeNode("n2")
+        result = InfoLoop(timeout=0.2).run([(n.key, n, "build", n.port)
+                                            for n in (n1, n2)])
+        self.assertEqual(result["n1"], "3.14.0")
+        self.assertIsInstance(result["n2"], IOError)
+        self.assertIsInstance(result["n2"], NodeTimeoutError)
+        self.assertTrue(n1.alive)
+        self.assertTrue(n2.alive)
+
+    def test_run_deadline_includes_connect(self):
+        server, port = listener()
+        self.addCleanup(server.close)
+        nodes = [SlowNode("n%d" % i, port) for i in range(4)]
+
+        start_time = time.time()
+        result = InfoLoop(timeout=0.5).run([(n.key, n, "build", n.port)
+                                            for n in nodes])
+
+        self.assertLess(time.time() - start_time, 0.9)
+        for n in nodes:
+            self.assertIsInstance(result[n.key], NodeTimeoutError)
+            self.assertTrue(n.alive)
+
+    def test_run_connect_pending(self):
+        # accept queue of the listener is full, connect never completes
+        server, port = listener(backlog=0)
+        self.addCleanup(server.close)
+        queued = socket.create_connection(("127.0.0.1", port))
+        self.addCleanup(queued.close)
+        n1 = SlowNode("n1", port)
+
+        result = InfoLoop(timeout=0.3).run([("n1", n1, "build", n1.port)])
+
+        self.assertIsInstance(result["n1"], NodeTimeoutError)
+        self.assertTrue(n1.alive)
+
+    def test_run_connect_refused(self):
+        server, port = listener()
+        server.close()
+        n1 = SlowNode("n1", port)
+
+        result = InfoLoop(timeout=0.5).run([("n1", n1, "build", n1.port)])
+
+        self.assertIsInstance(result["n1"], IOError)
+        self.assertNotIsInstance(result["n1"], NodeTimeoutError)
+        self.assertFalse(n1.alive)
+
+    def test_tls_want_read_on_send(self):
+        try:
+            from OpenSSL import SSL
+        except ImportError:
+            self.skipTest("pyOpenSSL not installed")
+
+        class WantReadSocket(object):
+            def send(self, data):
+                raise SSL.WantReadError()
+
+        n1 = FakeNode("n1")
+        request = _InfoRequest("n1", n1, "build", n1.port)
+        request.start()
+        request.sock.sock = WantReadSocket()
+        request.on_ready()
+
+        self.assertFalse(request.done)
+        self.assertEqual(request.wants, WANT_READ)
+
+if __name__ == "__main__":
+    unittest.main()
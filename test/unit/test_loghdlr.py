@@ -0,0 +1,68 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import re
+import unittest2 as unittest
+
+from lib.log.loghdlr import Loghdlr
+from lib.utils.constants import SHOW_RESULT_KEY, END_ROW_KEY, DT_FMT
+
+
+def stream(items):
+    for item in items:
+        yield item
+    while True:
+        yield None, None
+
+
+def tm(minute):
+    return datetime.datetime(2017, 1, 1, 0, minute)
+
+
+class LoghdlrMergerTest(unittest.TestCase):
+    def setUp(self):
+        self.loghdlr = Loghdlr("")
+
+    def test_merge_strings(self):
+        streams = {
+            "B": stream([(tm(1), "b1\n"), (tm(3), "b3\n")]),
+            "A": stream([(tm(1), "a1\n"), (tm(2), "a2\n")]),
+        }
+
+        pages = list(self.loghdlr._server_log_output_merger(
+            streams, output_page_size=2, return_strings=True))
+
+        lines = [re.sub(r".*::", "", l) for page in pages
+                 for l in page[SHOW_RESULT_KEY].splitlines()]
+        self.assertEqual(lines, ["a1", "b1", "a2", "b3"])
+        self.assertEqual(len(pages), 2)
+
+    def test_merge_results_default_value(self):
+        streams = {
+            "A": stream([(tm(1), {"count": {tm(1).strftime(DT_FMT): 5}}),
+                         (END_ROW_KEY, {"count": {"Total": 5}})]),
+            "B": stream([(tm(2), {"count": {tm(2).strftime(DT_FMT): 7}}),
+                         (END_ROW_KEY, {"count": {"Total": 7}})]),
+        }
+
+        pages = list(self.loghdlr._server_log_output_merger(
+            streams, output_page_size=10, default_value=0))
+
+        self.assertEqual(pages, [{
+            "A": {"count": {tm(1).strftime(DT_FMT): 5,
+                            tm(2).strftime(DT_FMT): 0, "Total": 5}},
+            "B": {"count": {tm(1).strftime(DT_FMT): 0,
+                            tm(2).strftime(DT_FMT): 7, "Total": 7}},
+        }])
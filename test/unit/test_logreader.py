@@ -0,0 +1,101 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest2 as unittest
+
+from lib.log.logindex import LogIndexCache
+from lib.log.reader import LogReader
+from lib.utils.constants import DT_FMT
+
+
+def write_log(path, start_tm, count, step_seconds=7):
+    tm = start_tm
+    with open(path, "a") as f:
+        for i in range(count):
+            f.write("%s GMT: INFO (info): (thr_info.c:101) line %d %s\n" % (
+                tm.strftime(DT_FMT), i, "x" * (i % 50)))
+            tm += datetime.timedelta(seconds=step_seconds)
+    return tm
+
+
+def minute_offsets(path):
+    offsets = {}
+    pos = 0
+    with open(path) as f:
+        for line in f:
+            tm = datetime.datetime.strptime(line[:20], DT_FMT)
+            offsets.setdefault(tm.replace(second=0).strftime(DT_FMT), pos)
+            pos += len(line)
+    return offsets
+
+
+class LogIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.log = os.path.join(self.tmp_dir, "aerospike.log")
+        self.cache = LogIndexCache(os.path.join(self.tmp_dir, "index"))
+        self.reader = LogReader(self.cache)
+
+    def test_generate_minute_indices(self):
+        write_log(self.log, datetime.datetime(2017, 3, 1, 10, 0, 0), 3000)
+        self.assertEqual(self.reader.generate_server_log_indices(self.log),
+                         minute_offsets(self.log))
+
+    def test_indices_persisted(self):
+        write_log(self.log, datetime.datetime(2017, 3, 1, 10, 0, 0), 3000)
+        indices = self.reader.get_server_log_indices(self.log)
+
+        self.assertEqual(self.cache.load(self.log), (indices, True))
+        self.assertEqual(LogReader(self.cache).get_server_log_indices(
+            self.log), indices)
+
+    def test_indices_extended_on_growth(self):
+        end_tm = write_log(self.log, datetime.datetime(2017, 3, 1, 10, 0, 0),
+                           3000)
+        self.reader.get_server_log_indices(self.log)
+        write_log(self.log, end_tm, 2000)
+
+        indices, complete = self.cache.load(self.log)
+        self.assertIsNotNone(indices)
+        self.assertFalse(complete)
+        self.assertEqual(self.reader.get_server_log_indices(self.log),
+                         minute_offsets(self.log))
+
+    def test_indices_rebuilt_on_rewrite(self):
+        write_log(self.log, datetime.datetime(2017, 3, 1, 10, 0, 0), 3000)
+        self.reader.get_server_log_indices(self.log)
+        with open(self.log, "w"):
+            pass
+        write_log(self.log, datetime.datetime(2017, 3, 2, 10, 0, 0), 100)
+
+        self.assertEqual(self.reader.get_server_log_indices(self.log),
+                         minute_offsets(self.log))
+
+    def test_seek_to_newline(self):
+        with open(self.log, "w") as f:
+            f.write("ab\n" + "c" * 10000 + "\nd\n")
+        size = os.path.getsize(self.log)
+
+        with open(self.log) as f:
+            for pos, expected in ((0, 0), (1, 0), (2, 3), (3, 3), (5000, 3),
+                                  (10003, 10004), (size - 1, size),
+                                  (size, 10004)):
+                f.seek(pos)
+                self.reader._seek_to(f, "\n")
+                self.assertEqual(f.tell(), expected)
@@ -17,6 +17,7 @@ import socket
 import unittest2 as unittest
 
 import lib
+from lib.client import resolver
 from lib.client.node import Node
 
 class NodeTest(unittest.TestCase):
@@ -31,19 +32,20 @@ class NodeTest(unittest.TestCase):
     def setUp(self):
         info_cinfo = patch('lib.client.node.Node._info_cinfo')
         info_telnet = patch('lib.client.node.Node._info_telnet')
-        getfqdn = patch('lib.client.node.getfqdn')
+        getfqdn = patch('lib.client.resolver.getfqdn')
         getaddrinfo = patch('socket.getaddrinfo')
 
         self.addCleanup(patch.stopall)
 
         lib.client.node.Node._info_cinfo = info_cinfo.start()
         Node._info_telnet = info_telnet.start()
-        lib.client.node.getfqdn = getfqdn.start()
+        lib.client.resolver.getfqdn = getfqdn.start()
         socket.getaddrinfo = getaddrinfo.start()
 
         Node._info_cinfo.return_value = ""
         Node._info_telnet.return_value = ""
-        lib.client.node.getfqdn.return_value = "host.domain.local"
+        lib.client.resolver.getfqdn.return_value = "host.domain.local"
+        resolver.set_resolver(resolver.Resolver())
         socket.getaddrinfo.return_value = [(2, 1, 6, '', ('192.1.1.1', 3000))]
 
     #@unittest.skip("Known Failure")
@@ -126,6 +128,68 @@ class NodeTest(unittest.TestCase):
         self.assertEqual(stats, expected,
             "info_namespace_statistics error:\n_expected:\t%s\n_found:\t%s"%(expected,stats))
     
+    def test_info_many(self):
+        n = self.get_info_mock("A00000000000000")
+        n._info_cinfo.return_value = {"namespaces": "test;bar",
+                                      "node": "A00000000000000"}
+        result = n.info_many(["namespaces", "node", "build"])
+        n._info_cinfo.assert_called_with(("namespaces", "node", "build"),
+                                         n.ip)
+        self.assertEqual(result["namespaces"], "test;bar")
+        self.assertEqual(result["node"], "A00000000000000")
+        self.assertIsInstance(result["build"], IOError)
+
+    def test_info_all_namespace_statistics(self):
+        n = self.get_info_mock("test;bar")
+        n.info_many = Mock()
+        n.info_many.return_value = {"namespace/test": "a=1;b=2",
+                                    "namespace/bar": "c=3"}
+        stats = n.info_all_namespace_statistics()
+        n.info_many.assert_called_once_with(["namespace/test",
+                                             "namespace/bar"])
+        expected = {"test": {"a": "1", "b": "2"}, "bar": {"c": "3"}}
+        self.assertEqual(stats, expected,
+            "info_all_namespace_statistics error:\n_expected:\t%s\n_found:\t%s"%(expected,stats))
+
+    def test_info_all_sindex_statistics(self):
+        n = self.get_info_mock("ns=test:set=demo:indexname=idx1;"
+                               "ns=test:set=demo:indexname=idx2;")
+        error = IOError("test error")
+        n.info_many = Mock()
+        n.info_many.return_value = {"sindex/test/idx1": "keys=10",
+                                    "sindex/test/idx2": error}
+        stats = n.info_all_sindex_statistics()
+        n.info_many.assert_called_once_with(["sindex/test/idx1",
+                                             "sindex/test/idx2"])
+        expected = [{"keys": "10", "ns": "test", "set": "demo",
+                     "indexname": "idx1"},
+                    {"error": error, "ns": "test", "set": "demo",
+                     "indexname": "idx2"}]
+        self.assertEqual(stats, expected,
+            "info_all_sindex_statistics error:\n_expected:\t%s\n_found:\t%s"%(expected,stats))
+
+    def test_refresh_connection(self):
+        n = self.get_info_mock("A00000000000000")
+        n.alive = True
+        n.use_peers_list = True
+        n.peers_generation = "5"
+        n.cluster_key = "ABCD"
+        n.connect = Mock()
+        n.info_many = Mock()
+
+        n.info_many.return_value = {"node": "A00000000000000",
+                                    "peers-generation": "5",
+                                    "cluster-key": "ABCD"}
+        n.refresh_connection()
+        self.assertFalse(n.connect.called,
+            "connect should not be called if peers-generation is unchanged")
+
+        n.info_many.return_value = {"node": "A00000000000000",
+                                    "peers-generation": "6",
+                                    "cluster-key": "ABCD"}
+        n.refresh_connection()
+        n.connect.assert_called_once_with(n.ip, n.port)
+
     @unittest.skip("unknown Failure")
     def test_info_get_config(self):
         # todo call getconfig with various formats
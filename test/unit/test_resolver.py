@@ -0,0 +1,70 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from mock import patch
+import socket
+import time
+import unittest2 as unittest
+
+from lib.client.resolver import Resolver
+
+
+class ResolverTest(unittest.TestCase):
+    def setUp(self):
+        getaddrinfo = patch('socket.getaddrinfo')
+        getfqdn = patch('lib.client.resolver.getfqdn')
+        self.addCleanup(patch.stopall)
+        self.getaddrinfo = getaddrinfo.start()
+        self.getfqdn = getfqdn.start()
+        self.getaddrinfo.return_value = [(2, 1, 6, '', ('192.1.1.1', 3000))]
+        self.getfqdn.return_value = "host.domain.local"
+
+    def test_resolve_cached(self):
+        r = Resolver(ttl=10)
+        for _ in range(3):
+            self.assertEqual(r.resolve("host", 3000),
+                             ("192.1.1.1", "host.domain.local"))
+        self.assertEqual(self.getaddrinfo.call_count, 1)
+        self.assertEqual(self.getfqdn.call_count, 1)
+
+        r.ttl = 0
+        r.clear()
+        r.resolve("host", 3000)
+        r.resolve("host", 3000)
+        self.assertEqual(self.getaddrinfo.call_count, 3)
+
+    def test_negative_cache(self):
+        r = Resolver(negative_ttl=10)
+        self.getaddrinfo.side_effect = socket.gaierror(-2, "Name unknown")
+        for _ in range(2):
+            self.assertRaises(socket.gaierror, r.getaddrinfo, "bad", 3000)
+        self.assertEqual(self.getaddrinfo.call_count, 1)
+
+        r.mark_unreachable("192.1.1.2", 3000)
+        self.assertTrue(r.is_unreachable("192.1.1.2", 3000))
+        self.assertFalse(r.is_unreachable("192.1.1.1", 3000))
+        r.negative_ttl = 0
+        r.mark_unreachable("192.1.1.3", 3000)
+        time.sleep(0.01)
+        self.assertFalse(r.is_unreachable("192.1.1.3", 3000))
+
+    def test_prefetch(self):
+        r = Resolver()
+        r.prefetch([("a", 3000, None),
+                    (("b", 3000, None), ("c", 3000, None))])
+        hosts = sorted(c[0][0] for c in self.getaddrinfo.call_args_list)
+        self.assertEqual(hosts, ["a", "b", "c"])
+
+if __name__ == "__main__":
+    unittest.main()
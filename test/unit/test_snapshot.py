@@ -0,0 +1,76 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from mock import Mock
+import unittest2 as unittest
+
+from lib.client.snapshot import ClusterSnapshot
+
+
+class ClusterSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.cluster = Mock()
+        self.cluster.info_statistics.return_value = {"n1": {"a": "1"}}
+        self.cluster.info.return_value = {"n1": "ok"}
+
+    def test_reuse_within_command(self):
+        snapshot = ClusterSnapshot(self.cluster)
+
+        with snapshot.command():
+            snapshot.info_statistics(nodes="all")
+            snapshot.info_statistics()
+        self.assertEqual(self.cluster.info_statistics.call_count, 1)
+
+        # next command fetches fresh data
+        with snapshot.command():
+            snapshot.info_statistics()
+        self.assertEqual(self.cluster.info_statistics.call_count, 2)
+
+    def test_reuse_within_ttl(self):
+        snapshot = ClusterSnapshot(self.cluster, ttl=60)
+
+        with snapshot.command():
+            snapshot.info_statistics()
+        with snapshot.command():
+            snapshot.info_statistics()
+        self.assertEqual(self.cluster.info_statistics.call_count, 1)
+
+        snapshot.invalidate()
+        with snapshot.command():
+            snapshot.info_statistics()
+        self.assertEqual(self.cluster.info_statistics.call_count, 2)
+
+    def test_result_is_copied(self):
+        snapshot = ClusterSnapshot(self.cluster)
+
+        with snapshot.command():
+            stats = snapshot.info_statistics()
+            stats["n1"]["a"] = "changed"
+            self.assertEqual(snapshot.info_statistics(), {"n1": {"a": "1"}})
+
+    def test_info_passthrough(self):
+        snapshot = ClusterSnapshot(self.cluster)
+
+        with snapshot.command():
+            snapshot.info("build")
+            snapshot.info("build")
+            self.assertEqual(self.cluster.info.call_count, 1)
+
+            # uncacheable commands always go to cluster
+            snapshot.info("set-config:context=service;x=1")
+            snapshot.info("set-config:context=service;x=1")
+            self.assertEqual(self.cluster.info.call_count, 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+# Copyright 2013-2017 Aerospike, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from mock import Mock
+import os
+import shutil
+import tempfile
+import unittest2 as unittest
+
+from lib.client.ssl_context import SSLContext, HAVE_PYOPENSSL
+
+if HAVE_PYOPENSSL:
+    from OpenSSL import crypto
+
+
+def get_cert(serial):
+    key = crypto.PKey()
+    key.generate_key(crypto.TYPE_RSA, 1024)
+    cert = crypto.X509()
+    cert.set_serial_number(serial)
+    cert.get_subject().CN = "asd.aerospike.com"
+    cert.set_issuer(cert.get_subject())
+    cert.gmtime_adj_notBefore(0)
+    cert.gmtime_adj_notAfter(3600)
+    cert.set_pubkey(key)
+    cert.sign(key, "sha256")
+    return cert
+
+
+@unittest.skipUnless(HAVE_PYOPENSSL, "pyOpenSSL not installed")
+class SSLContextTest(unittest.TestCase):
+    def get_context(self, blacklist):
+        ctx = SSLContext(enable_tls=True, encrypt_only=True)
+        ctx._crl_check = False
+        ctx._crl_check_all = False
+        ctx._crl_index = set()
+        ctx._cert_blacklist = blacklist
+        ctx._match_tlsname = Mock()
+        return ctx
+
+    def test_verify_cb_memoized(self):
+        ctx = self.get_context(set([(None, 0x2a)]))
+        check = Mock(wraps=ctx._cert_blacklist_check)
+        ctx._cert_blacklist_check = check
+        conn = Mock()
+
+        good_cert = get_cert(0x10)
+        self.assertTrue(ctx._verify_cb(conn, good_cert, 0, 0, True))
+        self.assertTrue(ctx._verify_cb(conn, good_cert, 0, 0, True))
+        self.assertEqual(check.call_count, 1)
+        self.assertEqual(ctx._match_tlsname.call_count, 2)
+
+        bad_cert = get_cert(0x2a)
+        for _ in range(2):
+            self.assertRaisesRegexp(Exception, "blacklist", ctx._verify_cb,
+                                    conn, bad_cert, 0, 0, True)
+        self.assertEqual(check.call_count, 2)
+
+    def test_blacklist_reload(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        blacklist = os.path.join(tmp_dir, "blacklist")
+        with open(blacklist, "w") as f:
+            f.write("# revoked\n2A\n")
+
+        ctx = SSLContext(enable_tls=True, cert_blacklist=blacklist)
+        self.assertEqual(ctx._cert_blacklist, set([(None, 0x2a)]))
+        self.assertFalse(ctx.reload_if_changed())
+
+        with open(blacklist, "w") as f:
+            f.write("10 /CN=asd.aerospike.com\n")
+        mtime = os.path.getmtime(blacklist) + 10
+        os.utime(blacklist, (mtime, mtime))
+        self.assertTrue(ctx.reload_if_changed())
+        self.assertEqual(ctx.generation, 1)
+
+        ctx._match_tlsname = Mock()
+        ctx._verify_cb(Mock(), get_cert(0x2a), 0, 0, True)
+        self.assertRaisesRegexp(Exception, "blacklist", ctx._verify_cb,
+                                Mock(), get_cert(0x10), 0, 0, True)
+
+if __name__ == "__main__":
+    unittest.main()
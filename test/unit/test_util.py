@@ -12,11 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import shutil
+import socket
+import tempfile
 import unittest2 as unittest
 import time
 
 from lib.utils import timeout
+from lib.utils.workerpool import WorkerPool
 from lib.client import util
+from lib.client.info import receivedata
 
 class UtilTest(unittest.TestCase):
     def test_info_to_dict(self):
@@ -52,12 +58,85 @@ class UtilTest(unittest.TestCase):
         result = util.info_to_tuple(value)
         self.assertEqual(result, expected)
 
+    def test_receivedata(self):
+        sock, peer = socket.socketpair()
+        data = "a=1;b=2;" * 1000
+        peer.sendall(data)
+        self.assertEqual(receivedata(sock, len(data)), data)
+        peer.close()
+        self.assertRaises(IOError, receivedata, sock, 1)
+
     def test_concurrent_map(self):
         value = range(10)
         expected = map(lambda v: v*v, value)
         result = util.concurrent_map(lambda v: v*v, value)
         self.assertEqual(result, expected)
 
+    def test_worker_pool_map(self):
+        pool = WorkerPool(max_workers=2)
+        value = range(10)
+        expected = map(lambda v: v*v, value)
+        # nested maps must not deadlock a pool smaller than the fan-out
+        result = pool.map(lambda v: pool.map(lambda x: x*x, [v])[0], value)
+        self.assertEqual(result, expected)
+        stats = pool.get_stats()
+        self.assertEqual(stats['completed'], 20)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertLessEqual(stats['workers'], 2)
+        pool.close()
+
+    def test_cached_policy(self):
+        calls = []
+
+        def tester(owner, command):
+            calls.append(command)
+            return command
+
+        policy = {"build": None, "latency:": 0}
+        tester = util.cached(tester, ttl_policy=lambda k: policy.get(k[1], 5.0),
+                             max_size=2)
+        tester("n1", "build")
+        tester("n1", "build")
+        tester("n1", "latency:")
+        tester("n1", "latency:")
+        self.assertEqual(calls, ["build", "latency:", "latency:"])
+        stats = tester.get_stats(owner="n1")
+        self.assertEqual((stats['hits'], stats['misses']), (1, 3))
+
+        # LRU eviction, "build" was used last so "stats" gets evicted
+        tester("n1", "stats")
+        tester("n1", "build")
+        tester("n1", "config")
+        self.assertEqual(tester.cache.keys(),
+                         [("n1", "build"), ("n1", "config")])
+        self.assertEqual(tester.get_stats()['evictions'], 1)
+
+        tester.invalidate(lambda k: k[1] == "build")
+        tester("n1", "build")
+        self.assertEqual(calls.count("build"), 2)
+
+    def test_read_proc_addresses(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        fib_trie = os.path.join(tmp_dir, "fib_trie")
+        with open(fib_trie, "w") as f:
+            f.write("Main:\n"
+                    "  +-- 10.0.0.0/24 2 0 2\n"
+                    "     |-- 10.0.0.0\n"
+                    "        /24 link UNICAST\n"
+                    "     |-- 10.0.0.5\n"
+                    "        /32 host LOCAL\n"
+                    "     |-- 10.0.0.255\n"
+                    "        /32 link BROADCAST\n")
+        if_inet6 = os.path.join(tmp_dir, "if_inet6")
+        with open(if_inet6, "w") as f:
+            f.write("fd000000000000000000000000000002 04 40 00 82 eth0\n")
+
+        self.assertEqual(util._read_proc_ipv4_addresses(fib_trie),
+                         set(["10.0.0.5"]))
+        self.assertEqual(util._read_proc_ipv6_addresses(if_inet6),
+                         set(["fd00::2"]))
+
     def test_cached(self):
         def tester(arg1, arg2, sleep):
             time.sleep(sleep)